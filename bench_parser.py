@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of requirements parsing on pip-compile style output.
+
+Compares the old single-regex parser with the PEP 508 parser on a
+synthetic 10k-line requirements file (pins, hashes, "# via" comments,
+extras and markers). Run with: python bench_parser.py [lines] [repeat]
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Add current directory to path for import modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.parser import DependencyParser, parse_requirement
+
+LEGACY_PATTERN = re.compile(r'^([a-zA-Z0-9._-]+)\s*([<>=!~]+)\s*([0-9.]+)$')
+
+
+def legacy_parse(content):
+    """Parser as it was before PEP 508 support (regex plus "else" branch)."""
+    dependencies = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '#' in line:
+            line = line.split('#')[0].strip()
+        match = LEGACY_PATTERN.match(line)
+        if match:
+            dependencies.append((match.group(1).lower(), match.group(2) + match.group(3)))
+        else:
+            dependencies.append((line.lower(), ""))
+    return dependencies
+
+
+def generate_pip_compile(lines):
+    """Generates pip-compile output with roughly the given number of lines."""
+    output = ["#", "# This file is autogenerated by pip-compile", "#"]
+    index = 0
+    while len(output) < lines:
+        name = f"package-{index % 400}"
+        if index % 10 == 0:
+            output.append(f"{name}[extra]=={index % 7}.{index % 13}.0 ; python_version >= \"3.8\" \\")
+        else:
+            output.append(f"{name}=={index % 7}.{index % 13}.{index % 5} \\")
+        output.append(f"    --hash=sha256:{index:064x} \\")
+        output.append(f"    --hash=sha256:{index + 1:064x}")
+        output.append(f"    # via package-{(index + 1) % 400}")
+        index += 1
+    return "\n".join(output[:lines]) + "\n"
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    content = generate_pip_compile(lines)
+    parser = DependencyParser()
+    
+    legacy = legacy_parse(content)
+    current = parser.parse_requirements_content(content)
+    bogus = sum(1 for name, _ in legacy if not re.match(r'^[a-z0-9._-]+$', name))
+    print(f"{lines} lines: legacy parser found {len(legacy)} entries ({bogus} bogus names), "
+          f"PEP 508 parser found {len(current)} requirements")
+    
+    legacy_time = min(timeit.repeat(lambda: legacy_parse(content), number=1, repeat=repeat))
+    
+    parse_requirement.cache_clear()
+    cold_time = timeit.timeit(lambda: parser.parse_requirements_content(content), number=1)
+    warm_time = min(timeit.repeat(lambda: parser.parse_requirements_content(content), number=1, repeat=repeat))
+    
+    print(f"legacy regex:          {legacy_time * 1000:8.2f} ms")
+    print(f"PEP 508 (cold cache):  {cold_time * 1000:8.2f} ms")
+    print(f"PEP 508 (warm cache):  {warm_time * 1000:8.2f} ms  ({legacy_time / warm_time:.2f}x)")
+    
+    return 0 if warm_time <= legacy_time * 1.05 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
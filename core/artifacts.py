@@ -0,0 +1,247 @@
+"""
+Inspection of built artifacts (wheels and sdists) without installing them.
+"""
+
+import os
+import re
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .environment import parse_egg_requires, read_metadata_headers
+from .parser import DependencyParser, parse_requirement, process_pool
+
+WHEEL_SUFFIXES = (".whl",)
+SDIST_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar", ".zip")
+
+# Below this number of artifacts a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+# Upper bound for a single metadata file read out of an archive
+MAX_MEMBER_SIZE = 4 * 1024 * 1024
+
+# "<name>-<version>" from an artifact file name
+ARTIFACT_NAME = re.compile(r'^(?P<name>.+?)-(?P<version>\d[^-]*)')
+
+
+# A Requires-Dist string, or (name, spec) as parsed from an sdist's pyproject.toml / setup.py
+Requirement = Union[str, Tuple[str, str]]
+
+
+class ArtifactMetadata(NamedTuple):
+    """Name, version and Requires-Dist of a wheel or sdist."""
+    name: str
+    version: str
+    requires: Tuple[Requirement, ...]
+
+
+def is_artifact(file_name: str) -> bool:
+    """Checks if file name looks like a wheel or sdist."""
+    return file_name.endswith(WHEEL_SUFFIXES + SDIST_SUFFIXES)
+
+
+def find_artifacts(paths: Iterable[Path]) -> List[Path]:
+    """Expands directories into the artifacts they contain."""
+    artifacts = []
+    for path in paths:
+        if path.is_dir():
+            artifacts.extend(sorted(
+                Path(entry.path) for entry in os.scandir(path)
+                if entry.is_file() and is_artifact(entry.name)
+            ))
+        else:
+            artifacts.append(path)
+    return artifacts
+
+
+def inspect_artifact(path: Path) -> ArtifactMetadata:
+    """Reads metadata of a wheel or sdist, choosing the reader by suffix."""
+    if path.name.endswith(WHEEL_SUFFIXES):
+        return read_wheel(path)
+    if path.name.endswith(".zip"):
+        return read_zip_sdist(path)
+    if path.name.endswith(SDIST_SUFFIXES):
+        return read_tar_sdist(path)
+    raise ValueError(f"Unsupported artifact: {path.name}")
+
+
+def read_wheel(path: Path) -> ArtifactMetadata:
+    """Reads <name>.dist-info/METADATA of a wheel straight from the zip."""
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            parts = member.filename.split("/")
+            if len(parts) == 2 and parts[0].endswith(".dist-info") and parts[1] == "METADATA":
+                with archive.open(member) as raw:
+                    name, version, requires = read_metadata_headers(_text(raw))
+                return _metadata(path, name, version, requires)
+    raise ValueError(f"{path.name} has no .dist-info/METADATA")
+
+
+def read_tar_sdist(path: Path) -> ArtifactMetadata:
+    """Reads sdist metadata in one sequential pass over the tarball.
+    
+    The archive is opened in streaming mode, so nothing is unpacked and
+    only the few small metadata files are held in memory.
+    """
+    sources = _SdistSources()
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or member.size > MAX_MEMBER_SIZE:
+                continue
+            kind = sources.kind(member.name)
+            if kind is None:
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None and sources.add(kind, stream):
+                break
+    return sources.metadata(path)
+
+
+def read_zip_sdist(path: Path) -> ArtifactMetadata:
+    """Reads metadata of a zip sdist."""
+    sources = _SdistSources()
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            if member.is_dir() or member.file_size > MAX_MEMBER_SIZE:
+                continue
+            kind = sources.kind(member.filename)
+            if kind is None:
+                continue
+            with archive.open(member) as stream:
+                if sources.add(kind, stream):
+                    break
+    return sources.metadata(path)
+
+
+class _SdistSources:
+    """Collects what an sdist says about its dependencies.
+    
+    PKG-INFO wins when it lists Requires-Dist; older sdists fall back to
+    egg-info requires.txt, then pyproject.toml, then setup.py.
+    """
+    
+    def __init__(self):
+        self.name = None
+        self.version = ""
+        self.requires: Dict[str, List[Requirement]] = {}
+    
+    def kind(self, member_name: str) -> Optional[str]:
+        """Returns which metadata source an archive member is, if any."""
+        parts = member_name.split("/")
+        if len(parts) == 2:
+            if parts[1] in ("PKG-INFO", "pyproject.toml", "setup.py"):
+                return parts[1]
+        elif len(parts) == 3 and parts[1].endswith(".egg-info") and parts[2] == "requires.txt":
+            return "requires.txt"
+        elif len(parts) == 4 and parts[1] == "src" and parts[2].endswith(".egg-info") and parts[3] == "requires.txt":
+            return "requires.txt"
+        return None
+    
+    def add(self, kind: str, stream) -> bool:
+        """Reads one source; returns True when nothing better can follow."""
+        if kind == "PKG-INFO":
+            name, version, requires = read_metadata_headers(_text(stream))
+            self.name, self.version = name, version
+            self.requires[kind] = requires
+            return bool(requires)
+        
+        content = stream.read().decode("utf-8", errors="replace")
+        parser = DependencyParser()
+        if kind == "requires.txt":
+            self.requires[kind] = parse_egg_requires(content.splitlines())
+        elif kind == "pyproject.toml":
+            # Kept as parsed: Poetry constraints such as "^2.0" are not PEP 508
+            self.requires[kind] = parser.parse_pyproject_content(content)
+        else:
+            self.requires[kind] = parser.parse_setup_content(content)
+        return False
+    
+    def metadata(self, path: Path) -> ArtifactMetadata:
+        """Builds the result from the best source seen."""
+        for kind in ("PKG-INFO", "requires.txt", "pyproject.toml", "setup.py"):
+            if self.requires.get(kind):
+                return _metadata(path, self.name, self.version, self.requires[kind])
+        return _metadata(path, self.name, self.version, [])
+
+
+def requires_dependencies(requires: Iterable[Requirement]) -> List[Tuple[str, str]]:
+    """Turns Requires-Dist values into (name, spec), skipping optional extras.
+    
+    Already parsed (name, spec) pairs are taken as they are.
+    """
+    dependencies = []
+    for requirement in requires:
+        if isinstance(requirement, tuple):
+            dependencies.append(requirement)
+            continue
+        _, _, marker = requirement.partition(";")
+        if "extra" in marker:
+            continue
+        dependency = parse_requirement(requirement)
+        if dependency:
+            dependencies.append(dependency)
+    return dependencies
+
+
+def inspect_artifacts(paths: List[Path], jobs: Optional[int] = None) -> Dict[str, Union[ArtifactMetadata, str]]:
+    """Inspects many artifacts on a worker pool, keyed by artifact_keys.
+    
+    Unreadable artifacts map to the error message. Each worker streams one archive at
+    a time, so memory stays bounded however large the batch is.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    
+    if jobs <= 1 or len(paths) < PARALLEL_THRESHOLD:
+        inspected = [_inspect_safely(str(path)) for path in paths]
+    else:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with process_pool(jobs) as executor:
+            inspected = list(executor.map(_inspect_safely, [str(path) for path in paths], chunksize=chunksize))
+    
+    return dict(zip(artifact_keys(paths), inspected))
+
+
+def artifact_keys(paths: List[Path]) -> List[str]:
+    """Names artifacts by their path below the deepest directory holding all of them.
+    
+    Artifacts from one directory are named by file name; same-named files
+    from different directories (dist/ of two projects) stay apart.
+    """
+    if not paths:
+        return []
+    resolved = [path.resolve() for path in paths]
+    try:
+        root = os.path.commonpath([str(path.parent) for path in resolved])
+    except ValueError:
+        # Different drives on Windows
+        return [str(path) for path in paths]
+    return [Path(os.path.relpath(path, root)).as_posix() for path in resolved]
+
+
+def _inspect_safely(path: str) -> Union[ArtifactMetadata, str]:
+    """Inspects an artifact inside a worker process; returns the error message if it fails."""
+    try:
+        return inspect_artifact(Path(path))
+    except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+        return f"Error reading artifact: {e}"
+
+
+def _text(stream) -> Iterator[str]:
+    """Decodes a binary member line by line (tar streams are not seekable)."""
+    for line in iter(stream.readline, b""):
+        yield line.decode("utf-8", errors="replace")
+
+
+def _metadata(path: Path, name: Optional[str], version: str, requires: List[Requirement]) -> ArtifactMetadata:
+    if not name:
+        stem = path.name
+        for suffix in WHEEL_SUFFIXES + SDIST_SUFFIXES:
+            if stem.endswith(suffix):
+                stem = stem[:-len(suffix)]
+                break
+        match = ARTIFACT_NAME.match(stem)
+        name = match.group("name") if match else stem
+        version = version or (match.group("version") if match else "")
+    return ArtifactMetadata(name, version, tuple(requires))
@@ -0,0 +1,201 @@
+"""
+Asyncio counterparts of the checker, repository analyzer and data collector.
+
+File reads and parsing run in the event loop's executor and PyPI metadata
+comes over non-blocking HTTP, so an embedding service's loop never blocks
+and many checks can run in it side by side.
+"""
+
+import time
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .checker import CheckResult, DeprecatedChecker
+from .parser import DependencyParser
+from .pypi_client import AsyncPyPIClient
+from .repository_analyzer import RepositoryAnalyzer
+from .data_collector import DataCollector
+
+logger = logging.getLogger(__name__)
+
+
+async def parse_manifests(parser: DependencyParser, project_path: Path, recursive: bool = False,
+                          executor: Optional[Executor] = None) -> List[Tuple[str, List[tuple]]]:
+    """Parses a project's manifests (every one below it when recursive) off the loop.
+    
+    Each manifest is one executor job, so cancelling the caller drops the
+    jobs that have not started yet.
+    """
+    loop = asyncio.get_running_loop()
+    if recursive:
+        manifests = await loop.run_in_executor(executor, parser.find_manifest_files, project_path)
+        names = [path.relative_to(project_path).as_posix() for path in manifests]
+    else:
+        manifests = await loop.run_in_executor(executor, parser.project_manifest_files, project_path)
+        names = [path.name for path in manifests]
+    
+    parsed = await asyncio.gather(*(loop.run_in_executor(executor, parser.parse_file, path)
+                                    for path in manifests))
+    return list(zip(names, parsed))
+
+
+class AsyncChecker:
+    """Checks projects without blocking the event loop.
+    
+    Wraps a DeprecatedChecker: manifests are read and parsed in the
+    executor (the loop's default one unless given), database lookups run
+    on the loop. Concurrent checks share the executor's threads.
+    """
+    
+    def __init__(self, checker: Optional[DeprecatedChecker] = None, executor: Optional[Executor] = None):
+        self.checker = checker or DeprecatedChecker()
+        self.executor = executor
+    
+    async def check_project(self, project_path: Path, recursive: bool = False, transitive: bool = False,
+                            timeout: Optional[float] = None) -> CheckResult:
+        """Checks project like DeprecatedChecker.check_project.
+        
+        Raises asyncio.TimeoutError if the check takes longer than timeout
+        seconds; the check is cancelled then.
+        """
+        return await asyncio.wait_for(self._check_project(Path(project_path), recursive, transitive), timeout)
+    
+    async def _check_project(self, project_path: Path, recursive: bool, transitive: bool) -> CheckResult:
+        checker = self.checker
+        if not project_path.exists():
+            raise FileNotFoundError(f"Path {project_path} does not exist")
+        
+        key = await self._run(checker.result_cache_key, project_path, recursive, transitive)
+        if key is not None:
+            cached = await self._run(checker.result_cache.get, key)
+            if cached is not None:
+                return CheckResult.from_dict(cached)
+        
+        if transitive:
+            # The graph comes from one lockfile or site-packages scan
+            graph = await self._run(checker.transitive_graph, project_path)
+            result = checker.collect(checker.iter_check_graph(graph))
+        else:
+            parsed = await parse_manifests(checker.parser, project_path, recursive, self.executor)
+            result = checker.collect(checker.iter_check_parsed(parsed))
+        
+        if key is not None:
+            await self._run(checker.result_cache.put, key, asdict(result))
+        return result
+    
+    async def _run(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+
+class AsyncRepositoryAnalyzer:
+    """Analyzes repositories like RepositoryAnalyzer, fetching metadata on the loop.
+    
+    Shares the wrapped analyzer's verdict cache and persistent HTTP cache.
+    """
+    
+    def __init__(self, analyzer: Optional[RepositoryAnalyzer] = None,
+                 client: Optional[AsyncPyPIClient] = None):
+        self.analyzer = analyzer or RepositoryAnalyzer()
+        self.client = client or AsyncPyPIClient(cache=self.analyzer.client.cache)
+    
+    async def analyze_repository(self, project_path: Path, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Analyzes repository and builds database for found dependencies.
+        
+        Raises asyncio.TimeoutError if it takes longer than timeout seconds.
+        """
+        return await asyncio.wait_for(self._analyze_repository(Path(project_path)), timeout)
+    
+    async def _analyze_repository(self, project_path: Path) -> Dict[str, Any]:
+        analyzer = self.analyzer
+        logger.info(f"Analyzing repository: {project_path}")
+        
+        dependencies_by_file = dict(await parse_manifests(analyzer.parser, project_path))
+        unique_packages = analyzer.extract_unique_packages(dependencies_by_file)
+        logger.info(f"Found {len(unique_packages)} unique packages in repository")
+        
+        database, to_check = analyzer.cached_verdicts(unique_packages)
+        async for package_name, package_data in self.client.fetch_many(to_check):
+            analyzer.record_verdict(database, package_name, package_data)
+        
+        await asyncio.get_running_loop().run_in_executor(None, analyzer.save_verdicts, database)
+        return database
+    
+    async def close(self) -> None:
+        """Closes the client's pooled connections."""
+        await self.client.close()
+
+
+class AsyncDataCollector:
+    """Collects data like DataCollector, fetching PyPI metadata on the loop.
+    
+    Only the PyPI source does network I/O; the other sources are run
+    as they are.
+    """
+    
+    def __init__(self, collector: Optional[DataCollector] = None,
+                 client: Optional[AsyncPyPIClient] = None):
+        self.collector = collector or DataCollector()
+        config = self.collector.config
+        self.client = client or AsyncPyPIClient(
+            timeout=config.pypi_timeout,
+            rate_limit=config.pypi_rate_limit,
+            max_connections=config.pypi_max_workers,
+            cache=self.collector.pypi_client.cache
+        )
+        
+        # Sources with an async implementation
+        self.sources = {
+            "pypi": self._collect_from_pypi
+        }
+    
+    async def collect_all_data(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Collects data from all sources.
+        
+        Raises asyncio.TimeoutError if it takes longer than timeout seconds.
+        """
+        return await asyncio.wait_for(self._collect_all_data(), timeout)
+    
+    async def _collect_all_data(self) -> Dict[str, Any]:
+        all_data = {}
+        
+        for source_name, collector_func in self.collector.sources.items():
+            try:
+                logger.info(f"Collecting data from {source_name}...")
+                self.collector.progress = {"source": source_name, "checked": 0, "total": 0}
+                if source_name in self.sources:
+                    data = await self.sources[source_name]()
+                else:
+                    data = collector_func()
+                if data:
+                    all_data.update(data)
+                    logger.info(f"Collected {len(data)} packages from {source_name}")
+            except Exception as e:
+                logger.error(f"Error collecting from {source_name}: {e}")
+        
+        return all_data
+    
+    async def _collect_from_pypi(self) -> Dict[str, Any]:
+        """Collects deprecated packages from PyPI API."""
+        collector = self.collector
+        data, packages_to_check = collector.pypi_packages_to_check()
+        
+        started = time.monotonic()
+        requests_before = self.client.requests_made
+        
+        checked = 0
+        async for package, package_data in self.client.fetch_many(packages_to_check):
+            checked += 1
+            collector.log_pypi_progress(checked, len(packages_to_check), started,
+                                         self.client.requests_made - requests_before)
+            collector.record_pypi_package(data, package, package_data)
+        
+        await asyncio.get_running_loop().run_in_executor(None, collector.finish_pypi_collection, data)
+        return data
+    
+    async def close(self) -> None:
+        """Closes the client's pooled connections."""
+        await self.client.close()
@@ -0,0 +1,283 @@
+"""
+Minimal asyncio HTTP/1.1 client for the JSON APIs the collectors talk to.
+"""
+
+import ssl
+import json
+import zlib
+import base64
+import asyncio
+import urllib.request
+from email.parser import BytesParser
+from http.client import HTTPMessage
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
+
+USER_AGENT = 'deprecated-checker/1.0'
+
+MAX_REDIRECTS = 5
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+
+# (scheme, host, port)
+ConnectionKey = Tuple[str, str, int]
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+def origin(parts: SplitResult) -> ConnectionKey:
+    """Returns (scheme, host, port) of a URL."""
+    return parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+
+def proxy_auth_headers(proxy: SplitResult) -> List[str]:
+    """Returns the Proxy-Authorization header line for a proxy URL with credentials."""
+    if proxy.username is None:
+        return []
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return [f"Proxy-Authorization: Basic {base64.b64encode(credentials.encode()).decode('ascii')}"]
+
+
+class AsyncResponse:
+    """Response with the attributes HTTPCache reads from a requests.Response."""
+    
+    def __init__(self, status_code: int, content: bytes, headers: HTTPMessage, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+    
+    def json(self) -> Any:
+        """Decodes body as JSON."""
+        return json.loads(self.content)
+
+
+class AsyncHTTPClient:
+    """GET-only client on asyncio streams, keeping idle connections per host.
+    
+    At most max_connections requests are in flight at once; the rest wait
+    on a semaphore rather than holding a thread each. A request cancelled
+    or timed out mid-flight closes its connection instead of returning it
+    to the pool.
+    
+    Proxies come from HTTP_PROXY / HTTPS_PROXY / NO_PROXY like for
+    requests; https goes through a CONNECT tunnel. Redirects are followed
+    within the requested origin only.
+    """
+    
+    def __init__(self, max_connections: int = 8, timeout: float = 10,
+                 headers: Optional[Dict[str, str]] = None):
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **(headers or {})}
+        self.proxies = urllib.request.getproxies()
+        self._idle: Dict[ConnectionKey, List[Connection]] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None
+    
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None) -> AsyncResponse:
+        """Performs a GET request, following redirects.
+        
+        Raises asyncio.TimeoutError when one request takes longer than
+        timeout seconds, and ConnectionError for network or protocol errors.
+        """
+        # Created lazily so the semaphore belongs to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        timeout = self.timeout if timeout is None else timeout
+        
+        async with self._slots:
+            for _ in range(MAX_REDIRECTS + 1):
+                response = await asyncio.wait_for(self._request(url, headers or {}), timeout)
+                location = response.headers.get("Location")
+                if response.status_code not in REDIRECT_STATUS_CODES or not location:
+                    return response
+                redirect_url = urljoin(url, location)
+                # Neither a downgrade to http nor another host may see the request
+                if origin(urlsplit(redirect_url)) != origin(urlsplit(url)):
+                    raise ConnectionError(f"Refusing redirect from {url} to {redirect_url}")
+                url = redirect_url
+        raise ConnectionError(f"Too many redirects for {url}")
+    
+    async def close(self) -> None:
+        """Closes idle connections."""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+    
+    async def _request(self, url: str, headers: Dict[str, str]) -> AsyncResponse:
+        """Sends one request over a pooled or new connection."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        key = origin(parts)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        
+        proxy = self._proxy_for(parts)
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        if proxy is not None and parts.scheme == "http":
+            # Plain http goes to the proxy with the absolute URL
+            lines[0] = f"GET {parts.scheme}://{parts.netloc}{target} HTTP/1.1"
+            lines.extend(proxy_auth_headers(proxy))
+        lines.extend(f"{name}: {value}" for name, value in {**self.headers, **headers}.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        
+        while True:
+            connection = self._checkout(key)
+            reused = connection is not None
+            if connection is None:
+                connection = await self._open(key, proxy)
+            reader, writer = connection
+            
+            try:
+                writer.write(request)
+                await writer.drain()
+                response, keep_alive = await self._read_response(reader, url)
+            except (OSError, EOFError, asyncio.LimitOverrunError) as e:
+                writer.close()
+                if reused:
+                    # The server dropped a connection that sat idle in the pool
+                    continue
+                raise ConnectionError(f"Request to {url} failed: {e}") from e
+            except BaseException:
+                writer.close()
+                raise
+            
+            if keep_alive:
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                writer.close()
+            return response
+    
+    def _checkout(self, key: ConnectionKey) -> Optional[Connection]:
+        """Takes an idle connection to the host, if one is still open."""
+        connections = self._idle.get(key)
+        while connections:
+            reader, writer = connections.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+    
+    def _proxy_for(self, parts: SplitResult) -> Optional[SplitResult]:
+        """Returns the proxy to reach the URL through, None to connect directly."""
+        proxy_url = self.proxies.get(parts.scheme)
+        if not proxy_url or urllib.request.proxy_bypass(parts.hostname):
+            return None
+        if "://" not in proxy_url:
+            proxy_url = f"http://{proxy_url}"
+        proxy = urlsplit(proxy_url)
+        if proxy.scheme != "http" or not proxy.hostname:
+            raise ConnectionError(f"Unsupported proxy: {proxy_url}")
+        return proxy
+    
+    async def _open(self, key: ConnectionKey, proxy: Optional[SplitResult] = None) -> Connection:
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        
+        if proxy is None:
+            address = (host, port)
+        else:
+            address = (proxy.hostname, proxy.port or 80)
+        try:
+            if proxy is None or ssl_context is None:
+                return await asyncio.open_connection(*address, ssl=ssl_context)
+            reader, writer = await asyncio.open_connection(*address)
+        except OSError as e:
+            raise ConnectionError(f"Could not connect to {address[0]}:{address[1]}: {e}") from e
+        
+        try:
+            return await self._tunnel(reader, writer, key, proxy, ssl_context)
+        except BaseException:
+            writer.close()
+            raise
+    
+    async def _tunnel(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, key: ConnectionKey,
+                      proxy: SplitResult, ssl_context: ssl.SSLContext) -> Connection:
+        """Opens a CONNECT tunnel through the proxy and starts TLS in it."""
+        _, host, port = key
+        lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+        lines.extend(proxy_auth_headers(proxy))
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        try:
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (OSError, EOFError, asyncio.LimitOverrunError) as e:
+            raise ConnectionError(f"Proxy {proxy.hostname} failed to connect to {host}:{port}: {e}") from e
+        status_line = head.partition(b"\r\n")[0].decode("latin-1")
+        if status_line.split(" ", 2)[1:2] != ["200"]:
+            raise ConnectionError(f"Proxy {proxy.hostname} refused to connect to {host}:{port}: {status_line}")
+        
+        try:
+            if hasattr(writer, "start_tls"):
+                await writer.start_tls(ssl_context, server_hostname=host)
+                return reader, writer
+            # Python 3.10: upgrade the transport and wrap it in a new writer
+            loop = asyncio.get_running_loop()
+            protocol = writer.transport.get_protocol()
+            transport = await loop.start_tls(writer.transport, protocol, ssl_context, server_hostname=host)
+            return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+        except OSError as e:
+            raise ConnectionError(f"TLS to {host}:{port} through proxy failed: {e}") from e
+    
+    async def _read_response(self, reader: asyncio.StreamReader, url: str) -> Tuple[AsyncResponse, bool]:
+        """Reads status line, headers and body; returns the response and whether to keep the connection."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, _, header_block = head.partition(b"\r\n")
+        try:
+            http_version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+            status_code = int(status)
+        except ValueError:
+            raise ConnectionError(f"Malformed status line from {url}: {status_line[:100]!r}")
+        headers = BytesParser(_class=HTTPMessage).parsebytes(header_block)
+        
+        keep_alive = http_version == "HTTP/1.1" and headers.get("Connection", "").lower() != "close"
+        if status_code in (204, 304):
+            body = b""
+        elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+            body = await self._read_chunked(reader)
+        elif headers.get("Content-Length") is not None:
+            try:
+                body = await reader.readexactly(int(headers["Content-Length"]))
+            except ValueError:
+                raise ConnectionError(f"Invalid Content-Length from {url}")
+        else:
+            # Body runs until the server closes the connection
+            body = await reader.read()
+            keep_alive = False
+        
+        if headers.get("Content-Encoding", "").lower() == "gzip":
+            try:
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            except zlib.error as e:
+                raise ConnectionError(f"Invalid gzip body from {url}: {e}")
+        
+        return AsyncResponse(status_code, body, headers, url), keep_alive
+    
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            try:
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise ConnectionError(f"Invalid chunk size: {size_line[:100]!r}")
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        
+        # Trailers end with an empty line
+        while await reader.readuntil(b"\r\n") != b"\r\n":
+            pass
+        return b"".join(chunks)
@@ -0,0 +1,107 @@
+"""
+Atomic writes and LRU eviction shared by the on-disk caches.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+def atomic_write(path: Path, data: bytes) -> int:
+    """Writes data to path so concurrent readers never see a partial file.
+    
+    The data goes to a temporary file next to path, which then replaces
+    it. Returns the number of bytes written; raises OSError.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return len(data)
+
+
+class LRUDirectoryCache:
+    """Base of caches kept as files in directories, with hit counters.
+    
+    Once the files in cache_dirs together grow past max_bytes (None for no
+    limit), the least recently modified ones are evicted; _touch() marks
+    an entry as used. _record_write() runs the eviction scan after every
+    max_bytes // 16 bytes written rather than on every write, which would
+    make filling a cold cache quadratic.
+    """
+    
+    def __init__(self, cache_dirs: Iterable[Path], max_bytes: Optional[int] = None):
+        self.cache_dirs = [Path(directory) for directory in cache_dirs]
+        for directory in self.cache_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        # Bytes stored since the last eviction pass
+        self._written = 0
+    
+    def evict(self) -> int:
+        """Removes least recently used files until the cache fits max_bytes."""
+        if self.max_bytes is None:
+            return 0
+        
+        files = []
+        total = 0
+        for directory in self.cache_dirs:
+            try:
+                with os.scandir(directory) as scanned:
+                    for item in scanned:
+                        # Temporary files belong to writes in progress
+                        if item.name.endswith(".tmp"):
+                            continue
+                        try:
+                            stat = item.stat()
+                        except OSError:
+                            continue
+                        files.append((stat.st_mtime_ns, stat.st_size, item.path))
+                        total += stat.st_size
+            except OSError:
+                continue
+        
+        removed = 0
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                # Another process may have evicted it already
+                continue
+            total -= size
+            removed += 1
+        return removed
+    
+    def _record_write(self, size: int) -> None:
+        """Counts bytes stored and evicts once enough have been written."""
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            self._written += size
+            due = self._written >= self.max_bytes // 16
+            if due:
+                self._written = 0
+        if due:
+            self.evict()
+    
+    def _touch(self, path: Path) -> None:
+        """Marks an entry as recently used for eviction."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+    
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
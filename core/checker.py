@@ -2,13 +2,21 @@
 Main module for checking deprecated dependencies.
 """
 
+import io
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Any, Optional, TextIO, Tuple, Union
+from dataclasses import asdict, dataclass, field
 from packaging import version
 
 from .parser import DependencyParser
-from .database import DeprecatedPackageDB
+from .parse_cache import ParseCache
+from .database import DeprecatedPackageDB, canonical_name
+from .dependency_graph import DependencyGraph, find_lockfile
+from .environment import scan_environments
+from .artifacts import find_artifacts, inspect_artifacts, requires_dependencies
+from .image_scanner import scan_image
+from .report_writers import build_summary, get_report_writer, report_summary
+from .result_cache import ResultCache, result_key
 
 
 @dataclass
@@ -22,6 +30,7 @@ class DeprecatedPackage:
     alternatives: List[Dict[str, str]]
     needs_update: bool = False
     required_version: Optional[str] = None
+    dependency_path: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -32,80 +41,343 @@ class CheckResult:
     total_deprecated: int
     total_safe: int
     files_checked: List[str]
+    projects: Dict[str, List[str]] = field(default_factory=dict)
+    # Sources that could not be checked at all, with the reason
+    errors: Dict[str, str] = field(default_factory=dict)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CheckResult":
+        """Rebuilds a result stored with dataclasses.asdict()."""
+        data = dict(data)
+        data["deprecated_packages"] = [DeprecatedPackage(**pkg) for pkg in data["deprecated_packages"]]
+        return cls(**data)
+
+
+@dataclass
+class FileChecked:
+    """Event: a manifest (or graph source) was parsed."""
+    file_name: str
+    dependencies: int
+
+
+@dataclass
+class DeprecatedFinding:
+    """Event: a dependency is deprecated."""
+    package: DeprecatedPackage
+
+
+@dataclass
+class SafeFinding:
+    """Event: a dependency is not deprecated."""
+    package: Dict[str, str]
+
+
+CheckEvent = Union[FileChecked, DeprecatedFinding, SafeFinding]
 
 
 class DeprecatedChecker:
     """Main class for checking deprecated dependencies."""
     
-    def __init__(self, db_path: Optional[Path] = None):
-        self.parser = DependencyParser()
-        self.db = DeprecatedPackageDB(db_path)
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False,
+                 parse_cache: Optional[ParseCache] = None,
+                 result_cache: Optional[ResultCache] = None):
+        self.parser = DependencyParser(parse_cache)
+        self.db = DeprecatedPackageDB(db_path, read_only=read_only)
+        self.result_cache = result_cache
+    
+    def check_project(self, project_path: Path, recursive: bool = False,
+                      jobs: Optional[int] = None, transitive: bool = False) -> CheckResult:
+        """Checks project for deprecated dependencies.
+        
+        With recursive=True every manifest below project_path is parsed on a
+        pool of `jobs` worker processes and results are grouped per project.
+        With transitive=True the resolved dependency graph is checked instead
+        (see check_transitive).
+        
+        With a result cache, a project whose manifests and database are
+        unchanged is answered without parsing or looking anything up.
+        """
+        key = self.result_cache_key(project_path, recursive, transitive)
+        if key is not None:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return CheckResult.from_dict(cached)
+        
+        result = self.collect(self.iter_check_project(project_path, recursive, jobs, transitive))
+        
+        if key is not None:
+            self.result_cache.put(key, asdict(result))
+        return result
+    
+    def result_cache_key(self, project_path: Path, recursive: bool, transitive: bool) -> Optional[str]:
+        """Returns result cache key of a project check, or None if it cannot be cached."""
+        # Without a versioned database (or with a graph from the running
+        # environment) the result depends on more than the manifests
+        if self.result_cache is None or not self.db.db_version or not project_path.is_dir():
+            return None
+        if transitive and find_lockfile(project_path) is None:
+            return None
+        
+        if recursive:
+            manifests = [
+                (path.relative_to(project_path).as_posix(), path)
+                for path in self.parser.find_manifest_files(project_path)
+            ]
+        else:
+            manifests = [(path.name, path) for path in self.parser.project_manifest_files(project_path)]
+        
+        mode = f"recursive={recursive},transitive={transitive}"
+        return result_key(manifests, self.db.db_version, mode)
     
-    def check_project(self, project_path: Path) -> CheckResult:
-        """Checks project for deprecated dependencies."""
+    def iter_check_project(self, project_path: Path, recursive: bool = False,
+                           jobs: Optional[int] = None, transitive: bool = False) -> Iterator[CheckEvent]:
+        """Checks project like check_project, yielding events as they are known.
+        
+        A FileChecked event comes as soon as a manifest is parsed, followed by
+        one DeprecatedFinding / SafeFinding per dependency in it. Manifests
+        are parsed lazily, so closing the generator early (e.g. on the first
+        deprecated package) skips the rest of the work.
+        """
         if not project_path.exists():
             raise FileNotFoundError(f"Path {project_path} does not exist")
         
-        # Parse all dependency files
-        dependencies_by_file = self.parser.parse_all_files(project_path)
+        if transitive:
+            yield from self.iter_check_graph(self.transitive_graph(project_path))
+            return
+        
+        # Parse dependency files one by one
+        if recursive:
+            yield from self.iter_check_parsed(self.parser.iter_tree(project_path, jobs))
+        else:
+            yield from self.iter_check_parsed(self.parser.iter_all_files(project_path))
+    
+    def check_manifests(self, files: Dict[str, str]) -> CheckResult:
+        """Checks manifest contents keyed by path, e.g. sent by a client.
+        
+        The parser is chosen by each path's file name, nothing is read
+        from disk.
+        """
+        return self.collect(self.iter_check_manifests(files))
+    
+    def iter_check_manifests(self, files: Dict[str, str]) -> Iterator[CheckEvent]:
+        """Checks manifest contents like check_manifests, yielding events."""
+        parsed_files = (
+            (file_name, self.parser.parse_content(file_name.rpartition("/")[2], content))
+            for file_name, content in files.items()
+        )
+        return self.iter_check_parsed(parsed_files)
+    
+    def check_environments(self, env_paths: List[Path], jobs: Optional[int] = None) -> CheckResult:
+        """Checks what is installed in virtualenvs / prefixes.
+        
+        Only dist-info / egg-info metadata headers are read, nothing is
+        imported from the environments. Environments are scanned in parallel.
+        """
+        for env_path in env_paths:
+            if not env_path.exists():
+                raise FileNotFoundError(f"Path {env_path} does not exist")
         
+        dependencies_by_env = {
+            env: [(distribution.name.lower(), f"=={distribution.version}" if distribution.version else "")
+                  for distribution in distributions]
+            for env, distributions in scan_environments(env_paths, jobs).items()
+        }
+        
+        result = self._check_dependencies(dependencies_by_env)
+        result.projects = {env: [env] for env in dependencies_by_env}
+        return result
+    
+    def check_artifacts(self, artifact_paths: List[Path], jobs: Optional[int] = None) -> CheckResult:
+        """Checks Requires-Dist of wheels / sdists without installing them.
+        
+        Directories are expanded into the artifacts they contain. Archives
+        are streamed on a pool of `jobs` worker processes; unreadable ones
+        end up in result.errors, so they never pass unnoticed.
+        """
+        for artifact_path in artifact_paths:
+            if not artifact_path.exists():
+                raise FileNotFoundError(f"Path {artifact_path} does not exist")
+        
+        dependencies_by_artifact = {}
+        errors = {}
+        for artifact, metadata in inspect_artifacts(find_artifacts(artifact_paths), jobs).items():
+            if isinstance(metadata, str):
+                errors[artifact] = metadata
+            else:
+                dependencies_by_artifact[artifact] = requires_dependencies(metadata.requires)
+        
+        result = self._check_dependencies(dependencies_by_artifact)
+        result.projects = {artifact: [artifact] for artifact in dependencies_by_artifact}
+        result.errors = errors
+        return result
+    
+    def check_image(self, image_path: Path) -> CheckResult:
+        """Checks Python packages installed in a saved container image.
+        
+        Takes a `docker save` / OCI layout tarball (or unpacked directory);
+        layers are streamed in order and whiteouts are respected.
+        """
+        if not image_path.exists():
+            raise FileNotFoundError(f"Path {image_path} does not exist")
+        
+        dependencies_by_image = {
+            image: [(distribution.name.lower(), f"=={distribution.version}" if distribution.version else "")
+                    for distribution in distributions]
+            for image, distributions in scan_image(image_path).items()
+        }
+        
+        result = self._check_dependencies(dependencies_by_image)
+        result.projects = {image: [image] for image in dependencies_by_image}
+        return result
+    
+    def _check_dependencies(self, dependencies_by_file: Dict[str, List[tuple]]) -> CheckResult:
+        """Checks parsed (name, spec) dependencies grouped by source file."""
+        return self.collect(self.iter_check_parsed(dependencies_by_file.items()))
+    
+    def iter_check_parsed(self, parsed_files: Iterable[Tuple[str, List[tuple]]]) -> Iterator[CheckEvent]:
+        """Yields events for (file name, dependencies) pairs as they come in."""
+        # Versions are extracted once per distinct specification string and every
+        # distinct (package, version) is looked up once, in one batch per file
+        versions: Dict[str, str] = {}
+        known: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        
+        for file_name, dependencies in parsed_files:
+            pairs = []
+            for package_name, package_version in dependencies:
+                version_str = versions.get(package_version)
+                if version_str is None:
+                    version_str = versions[package_version] = self.extract_version(package_version)
+                pairs.append((package_name, version_str))
+            
+            missing = [pair for pair in dict.fromkeys(pairs) if pair not in known]
+            if missing:
+                results = self.db.check_many(missing)
+                for pair in missing:
+                    known[pair] = results.get(pair)
+            
+            yield FileChecked(file_name, len(pairs))
+            for package_name, version_str in pairs:
+                yield self._finding(package_name, version_str, known[(package_name, version_str)], file_name)
+    
+    def _finding(self, package_name: str, version_str: str, dep_info: Optional[Dict[str, Any]],
+                 file_source: str, dependency_path: Optional[List[str]] = None) -> CheckEvent:
+        """Turns a lookup result into a DeprecatedFinding or SafeFinding."""
+        if dep_info:
+            return DeprecatedFinding(DeprecatedPackage(
+                name=package_name,
+                current_version=version_str or "not specified",
+                file_source=file_source,
+                deprecated_since=dep_info.get("deprecated_since", "unknown"),
+                reason=dep_info.get("reason", "not specified"),
+                alternatives=dep_info.get("alternatives", []),
+                needs_update=dep_info.get("needs_update", False),
+                required_version=dep_info.get("required_version"),
+                dependency_path=dependency_path or []
+            ))
+        return SafeFinding({
+            "name": package_name,
+            "version": version_str or "not specified",
+            "file_source": file_source
+        })
+    
+    def collect(self, events: Iterable[CheckEvent]) -> CheckResult:
+        """Builds a CheckResult from check events."""
         deprecated_packages = []
         safe_packages = []
+        files_checked = []
         
-        # Check each dependency
-        for file_name, dependencies in dependencies_by_file.items():
-            for package_name, package_version in dependencies:
-                # Extract version from version specification string
-                version_str = self._extract_version(package_version)
-                
-                # Check if package is deprecated
-                dep_info = self.db.check_version_compatibility(package_name, version_str)
-                
-                if dep_info["is_deprecated"]:
-                    deprecated_pkg = DeprecatedPackage(
-                        name=package_name,
-                        current_version=version_str or "not specified",
-                        file_source=file_name,
-                        deprecated_since=dep_info.get("deprecated_since", "unknown"),
-                        reason=dep_info.get("reason", "not specified"),
-                        alternatives=dep_info.get("alternatives", []),
-                        needs_update=dep_info.get("needs_update", False),
-                        required_version=dep_info.get("required_version")
-                    )
-                    deprecated_packages.append(deprecated_pkg)
-                else:
-                    safe_packages.append({
-                        "name": package_name,
-                        "version": version_str or "not specified",
-                        "file_source": file_name
-                    })
+        for event in events:
+            if isinstance(event, DeprecatedFinding):
+                deprecated_packages.append(event.package)
+            elif isinstance(event, SafeFinding):
+                safe_packages.append(event.package)
+            else:
+                files_checked.append(event.file_name)
         
         return CheckResult(
             deprecated_packages=deprecated_packages,
             safe_packages=safe_packages,
             total_deprecated=len(deprecated_packages),
             total_safe=len(safe_packages),
-            files_checked=list(dependencies_by_file.keys())
+            files_checked=files_checked,
+            projects=self._group_by_project(files_checked)
         )
     
-    def _extract_version(self, version_spec: str) -> str:
-        """Extracts version from version specification string."""
+    def check_transitive(self, project_path: Path,
+                         site_packages: Optional[List[Path]] = None) -> CheckResult:
+        """Checks every resolved dependency, direct or transitive.
+        
+        The graph comes from the project's lockfile, or from installed
+        distributions (site_packages, or the running environment) when there
+        is none. Manifest dependencies are the roots of the walk.
+        """
+        return self.check_graph(self.transitive_graph(project_path, site_packages))
+    
+    def iter_check_transitive(self, project_path: Path,
+                              site_packages: Optional[List[Path]] = None) -> Iterator[CheckEvent]:
+        """Checks like check_transitive, yielding events."""
+        return self.iter_check_graph(self.transitive_graph(project_path, site_packages))
+    
+    def transitive_graph(self, project_path: Path,
+                          site_packages: Optional[List[Path]] = None) -> DependencyGraph:
+        """Builds the graph check_transitive walks."""
+        lock_file = find_lockfile(project_path) if site_packages is None else None
+        if lock_file is not None:
+            graph = DependencyGraph.from_lockfile(lock_file)
+        else:
+            graph = DependencyGraph.from_environment(site_packages)
+        
+        if not graph.roots:
+            declared = [
+                package_name
+                for file_name, dependencies in self.parser.parse_all_files(project_path).items()
+                if self.parser.manifest_kind(file_name) not in ("lock", "pipfile-lock")
+                for package_name, _ in dependencies
+            ]
+            graph.set_roots(declared)
+        
+        return graph
+    
+    def check_graph(self, graph: DependencyGraph) -> CheckResult:
+        """Checks each node of a dependency graph exactly once."""
+        return self.collect(self.iter_check_graph(graph))
+    
+    def iter_check_graph(self, graph: DependencyGraph) -> Iterator[CheckEvent]:
+        """Yields events for each node of a dependency graph, in walk order."""
+        parents = graph.walk()
+        results = self.db.check_many((package_name, graph.versions[package_name]) for package_name in parents)
+        
+        yield FileChecked(graph.source, len(parents))
+        for package_name in parents:
+            version_str = graph.versions[package_name]
+            dep_info = results.get((package_name, version_str))
+            yield self._finding(package_name, version_str, dep_info, graph.source,
+                                graph.path_to(parents, package_name) if dep_info else None)
+    
+    def _group_by_project(self, file_names) -> Dict[str, List[str]]:
+        """Groups manifest paths by the directory (project) that contains them."""
+        projects: Dict[str, List[str]] = {}
+        for file_name in file_names:
+            project = file_name.rpartition("/")[0] or "."
+            projects.setdefault(project, []).append(file_name)
+        return projects
+    
+    def extract_version(self, version_spec: str) -> str:
+        """Extracts version from version specification string ("==2.0", ">=1.4,<2", "2.0")."""
         if not version_spec:
             return ""
         
-        # Remove comparison operators
-        version_str = version_spec.lstrip("<>!=~")
+        parts = [part.strip() for part in version_spec.split(",") if part.strip()]
+        if not parts:
+            return ""
         
-        # If version contains range, take minimum
-        if "," in version_str:
-            parts = version_str.split(",")
+        # Prefer a pin, then a compatible release, then the minimum of a range
+        for operator in ("===", "==", "~=", ">="):
             for part in parts:
-                part = part.strip()
-                if part.startswith(">=") or not part.startswith(("<", ">")):
-                    return part.lstrip("<>!=~")
-            return parts[0].strip().lstrip("<>!=~")
+                if part.startswith(operator):
+                    return part[len(operator):].strip()
         
-        return version_str
+        return parts[0].lstrip("<>!=~^").strip()
     
     def get_recommendations(self, result: CheckResult) -> List[Dict[str, Any]]:
         """Generates recommendations for updating."""
@@ -127,7 +399,7 @@ class DeprecatedChecker:
                     "migration_guide": alt.get("migration_guide", "")
                 }
                 
-                if pkg.needs_update and alt["name"].lower() == pkg.name.lower():
+                if pkg.needs_update and canonical_name(alt["name"]) == canonical_name(pkg.name):
                     alt_info["action"] = f"Update to version {pkg.required_version}+"
                 else:
                     alt_info["action"] = "Replace with"
@@ -140,101 +412,65 @@ class DeprecatedChecker:
     
     def generate_report(self, result: CheckResult, format_type: str = "text") -> str:
         """Generates report in specified format."""
-        if format_type == "json":
-            return self._generate_json_report(result)
-        elif format_type == "yaml":
-            return self._generate_yaml_report(result)
-        else:
-            return self._generate_text_report(result)
-    
-    def _generate_text_report(self, result: CheckResult) -> str:
-        """Generates text report."""
-        report = []
-        report.append("Report on checking deprecated dependencies")
-        report.append("=" * 50)
-        report.append(f"Checked files: {', '.join(result.files_checked)}")
-        report.append(f"Total packages: {result.total_deprecated + result.total_safe}")
-        report.append(f"Deprecated: {result.total_deprecated}")
-        report.append(f"Safe: {result.total_safe}")
-        report.append("")
-        
-        if result.deprecated_packages:
-            report.append("Found deprecated packages:")
-            for pkg in result.deprecated_packages:
-                report.append(f"  • {pkg.name}=={pkg.current_version} ({pkg.file_source})")
-                report.append(f"    Reason: {pkg.reason}")
-                if pkg.alternatives:
-                    report.append("    Alternatives:")
-                    for alt in pkg.alternatives:
-                        report.append(f"      - {alt['name']}: {alt['reason']}")
-                        if alt.get('migration_guide'):
-                            report.append(f"        Guide: {alt['migration_guide']}")
-                report.append("")
-        else:
-            report.append("No deprecated packages found!")
-            report.append("")
-        
-        if result.safe_packages:
-            report.append("Safe packages:")
-            for pkg in result.safe_packages:
-                report.append(f"  • {pkg['name']}=={pkg['version']} ({pkg['file_source']})")
-        
-        return "\n".join(report)
-    
-    def _generate_json_report(self, result: CheckResult) -> str:
-        """Generates JSON report."""
-        import json
-        
-        report_data = {
-            "summary": {
-                "total_packages": result.total_deprecated + result.total_safe,
-                "deprecated_count": result.total_deprecated,
-                "safe_count": result.total_safe,
-                "files_checked": result.files_checked
-            },
-            "deprecated_packages": [
-                {
-                    "name": pkg.name,
-                    "current_version": pkg.current_version,
-                    "file_source": pkg.file_source,
-                    "deprecated_since": pkg.deprecated_since,
-                    "reason": pkg.reason,
-                    "alternatives": pkg.alternatives,
-                    "needs_update": pkg.needs_update,
-                    "required_version": pkg.required_version
-                }
-                for pkg in result.deprecated_packages
-            ],
-            "safe_packages": result.safe_packages
-        }
+        buffer = io.StringIO()
+        self.write_report(result, buffer, format_type)
+        return buffer.getvalue()
+    
+    def write_report(self, result: CheckResult, stream: TextIO, format_type: str = "text") -> None:
+        """Writes report to a file handle package by package (see report_writers)."""
+        get_report_writer(format_type, stream).write_result(result)
+    
+    def write_events(self, events: Iterable[CheckEvent], stream: TextIO,
+                     format_type: str = "text") -> Dict[str, Any]:
+        """Writes report straight from check events, without building a CheckResult.
         
-        return json.dumps(report_data, indent=2, ensure_ascii=False)
-    
-    def _generate_yaml_report(self, result: CheckResult) -> str:
-        """Generates YAML report."""
-        import yaml
-        
-        report_data = {
-            "summary": {
-                "total_packages": result.total_deprecated + result.total_safe,
-                "deprecated_count": result.total_deprecated,
-                "safe_count": result.total_safe,
-                "files_checked": result.files_checked
-            },
-            "deprecated_packages": [
-                {
-                    "name": pkg.name,
-                    "current_version": pkg.current_version,
-                    "file_source": pkg.file_source,
-                    "deprecated_since": pkg.deprecated_since,
-                    "reason": pkg.reason,
-                    "alternatives": pkg.alternatives,
-                    "needs_update": pkg.needs_update,
-                    "required_version": pkg.required_version
-                }
-                for pkg in result.deprecated_packages
-            ],
-            "safe_packages": result.safe_packages
-        }
+        Each finding goes to the writer as soon as it is known, so only the
+        list of checked files is kept. The summary comes at the end of the
+        report; it is also returned.
+        """
+        writer = get_report_writer(format_type, stream)
+        writer.begin()
+        files_checked = []
+        for event in events:
+            if isinstance(event, DeprecatedFinding):
+                writer.deprecated(event.package)
+            elif isinstance(event, SafeFinding):
+                writer.safe(event.package)
+            else:
+                files_checked.append(event.file_name)
+        
+        summary = build_summary(writer.deprecated_count, writer.safe_count, files_checked,
+                                self._group_by_project(files_checked))
+        writer.end(summary)
+        return summary
+    
+    def write_project_report(self, project_path: Path, stream: TextIO, format_type: str = "text",
+                             recursive: bool = False, jobs: Optional[int] = None,
+                             transitive: bool = False) -> Dict[str, Any]:
+        """Checks project like check_project, writing the report while it runs.
+        
+        Returns the report summary. A result cache hit is written as is; on a
+        miss the findings are only kept when the cache needs them stored.
+        """
+        key = self.result_cache_key(project_path, recursive, transitive)
+        if key is not None:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                result = CheckResult.from_dict(cached)
+                self.write_report(result, stream, format_type)
+                return report_summary(result)
+        
+        events = self.iter_check_project(project_path, recursive, jobs, transitive)
+        if key is None:
+            return self.write_events(events, stream, format_type)
+        
+        kept: List[CheckEvent] = []
+        
+        def keep(events: Iterable[CheckEvent]) -> Iterator[CheckEvent]:
+            for event in events:
+                kept.append(event)
+                yield event
         
-        return yaml.dump(report_data, default_flow_style=False, allow_unicode=True) 
\ No newline at end of file
+        summary = self.write_events(keep(events), stream, format_type)
+        self.result_cache.put(key, asdict(self.collect(kept)))
+        return summary
@@ -14,7 +14,9 @@ class CollectorConfig:
     pypi_enabled: bool = True
     pypi_packages: list = None
     pypi_timeout: int = 10
-    pypi_rate_limit: float = 0.1
+    pypi_rate_limit: float = 0.1  # Minimum average seconds between requests
+    pypi_max_workers: int = 8
+    verdict_ttl_hours: dict = None  # Per-source lifetime of cached verdicts
     
     github_enabled: bool = True
     github_queries: list = None
@@ -93,6 +95,8 @@ class ConfigManager:
             pypi_packages=sources.get("pypi", {}).get("packages_to_check", []),
             pypi_timeout=sources.get("pypi", {}).get("timeout", 10),
             pypi_rate_limit=sources.get("pypi", {}).get("rate_limit", 0.1),
+            pypi_max_workers=sources.get("pypi", {}).get("max_workers", 8),
+            verdict_ttl_hours=collector_data.get("verdict_ttl_hours", {}),
             
             github_enabled=sources.get("github", {}).get("enabled", True),
             github_queries=sources.get("github", {}).get("search_queries", []),
@@ -0,0 +1,233 @@
+"""
+Long-running daemon on a Unix socket and the thin client that forwards to it.
+
+The client side imports only the standard library, so a command answered
+by a running daemon costs little more than starting the interpreter.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import tempfile
+import threading
+import socketserver
+from pathlib import Path
+from stat import S_ISDIR
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROTOCOL_VERSION = 2
+
+# Commands the client forwards when a daemon is listening
+FORWARDED_COMMANDS = ("check", "search")
+
+SOCKET_ENV = "DEPRECATED_CHECKER_SOCKET"
+NO_DAEMON_ENV = "DEPRECATED_CHECKER_NO_DAEMON"
+
+# A live daemon accepts at once; anything slower is treated as not running
+CONNECT_TIMEOUT = 0.5
+
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# (command arguments, request) -> (output, exit code)
+CommandHandler = Callable[[List[str], Dict[str, Any]], Tuple[str, int]]
+
+
+def default_socket_path(name: str = "daemon", env: str = SOCKET_ENV) -> Path:
+    """Returns the path of the named service's socket ($env overrides it).
+    
+    The daemon uses "daemon" and $DEPRECATED_CHECKER_SOCKET, the scheduler
+    "scheduler" and $DEPRECATED_CHECKER_SCHEDULER_SOCKET.
+    """
+    if os.environ.get(env):
+        return Path(os.environ[env])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / f"deprecated-checker-{os.getuid()}" / f"{name}.sock"
+    # The shared temp directory is writable by everyone, so the socket gets a private one
+    return Path(tempfile.gettempdir()) / f"deprecated-checker-{os.getuid()}" / f"{name}.sock"
+
+
+def socket_dir_error(socket_path: Path) -> Optional[str]:
+    """Explains why the socket's directory is unsafe, None if only this user controls it.
+    
+    The directory has to be owned by the current user and closed to
+    everyone else (mode 0700), or another user could put their own
+    socket in its place.
+    """
+    try:
+        stat = os.lstat(socket_path.parent)
+    except OSError as e:
+        return f"Cannot access {socket_path.parent}: {e}"
+    if not S_ISDIR(stat.st_mode):
+        return f"{socket_path.parent} is not a directory"
+    if stat.st_uid != os.getuid():
+        return f"{socket_path.parent} is owned by another user"
+    if stat.st_mode & 0o077:
+        return f"{socket_path.parent} is accessible to other users (mode {stat.st_mode & 0o777:o}, needs 700)"
+    return None
+
+
+def is_trusted_socket(socket_path: Path) -> bool:
+    """Checks the socket is owned by the current user, in a directory only they control."""
+    try:
+        owner = os.stat(socket_path).st_uid
+    except OSError:
+        return False
+    return owner == os.getuid() and socket_dir_error(socket_path) is None
+
+
+def send_request(request: Dict[str, Any], socket_path: Optional[Path] = None,
+                 timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Sends one request to the daemon; returns None when no daemon answers."""
+    socket_path = socket_path or default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not is_trusted_socket(socket_path):
+        return None
+    
+    request = dict(request, version=PROTOCOL_VERSION)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(socket_path))
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile('rb') as f:
+                line = f.readline()
+    except OSError:
+        return None
+    
+    try:
+        response = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(response, dict) or response.get("version") != PROTOCOL_VERSION:
+        return None
+    return response
+
+
+def forward_to_daemon(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """Runs a CLI command on the daemon, printing its output.
+    
+    Returns the exit code, or None when the command has to run locally
+    (not forwardable, daemon disabled, or no daemon listening).
+    """
+    if not argv or argv[0] not in FORWARDED_COMMANDS or os.environ.get(NO_DAEMON_ENV):
+        return None
+    if "--help" in argv:
+        return None
+    
+    response = send_request({
+        "argv": argv,
+        "cwd": os.getcwd(),
+        # --transitive without a lockfile walks this interpreter's packages, not the daemon's
+        "sys_path": [entry for entry in sys.path if entry and os.path.isdir(entry)],
+        "isatty": sys.stdout.isatty(),
+        "width": shutil.get_terminal_size().columns
+    }, socket_path)
+    if response is None or "exit_code" not in response:
+        return None
+    
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stdout.flush()
+    return response["exit_code"]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON line, answers with one JSON line."""
+    
+    def handle(self) -> None:
+        line = self.rfile.readline(MAX_REQUEST_SIZE)
+        try:
+            request = json.loads(line)
+            response = self.server.respond(request)
+        except ValueError:
+            response = {"exit_code": 2, "stdout": "Invalid request\n"}
+        except Exception as e:
+            response = {"exit_code": 1, "stdout": f"Error: {e}\n"}
+        response["version"] = PROTOCOL_VERSION
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class CheckDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Answers forwarded commands from state kept warm between requests.
+    
+    Each command name maps to a handler that renders the command's output
+    into a string. Connections are served on their own threads, and the
+    socket is only accessible to the user running the daemon: it is created
+    with mode 0600 inside a directory only they control.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, handlers: Dict[str, CommandHandler], socket_path: Optional[Path] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.handlers = handlers
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        
+        self._claim_socket()
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+    
+    def _claim_socket(self) -> None:
+        """Prepares a private socket directory and removes a socket left behind by a daemon that is gone."""
+        try:
+            self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        except OSError as e:
+            raise RuntimeError(f"Cannot create socket directory {self.socket_path.parent}: {e}")
+        error = socket_dir_error(self.socket_path)
+        if error:
+            raise RuntimeError(f"Refusing to listen on {self.socket_path}: {error}")
+        
+        if not os.path.lexists(self.socket_path):
+            return
+        if send_request({"control": "status"}, self.socket_path) is not None:
+            raise RuntimeError(f"Daemon already running on {self.socket_path}")
+        self.socket_path.unlink()
+    
+    def serve(self) -> None:
+        """Serves until stopped, then removes the socket."""
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+    
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handles one decoded request."""
+        control = request.get("control")
+        if control == "status":
+            return self.status()
+        if control == "stop":
+            # shutdown() blocks until the serve loop exits, so it runs off this thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"stopping": True}
+        
+        argv = request.get("argv") or []
+        handler = self.handlers.get(argv[0]) if argv else None
+        if handler is None:
+            return {"exit_code": 2, "stdout": f"Unsupported command: {' '.join(argv[:1])}\n"}
+        
+        output, exit_code = handler(argv[1:], request)
+        with self._lock:
+            self.requests_served += 1
+        return {"exit_code": exit_code, "stdout": output}
+    
+    def status(self) -> Dict[str, Any]:
+        """Returns pid, uptime and number of commands served."""
+        with self._lock:
+            requests_served = self.requests_served
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "requests": requests_served,
+            "socket": str(self.socket_path)
+        }
@@ -2,16 +2,20 @@
 Data collector for deprecated packages from various sources.
 """
 
-import requests
 import yaml
 import json
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
 
+from .config_manager import CollectorConfig
+from .pypi_client import get_default_client, is_deprecated_metadata
+from .verdict_cache import VerdictCache
+from .sqlite_store import SQLitePackageStore, is_sqlite_path
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,12 +35,24 @@ class PackageInfo:
 class DataCollector:
     """Collects data about deprecated packages from various sources."""
     
-    def __init__(self, cache_dir: Optional[Path] = None):
+    def __init__(self, cache_dir: Optional[Path] = None, config: Optional[CollectorConfig] = None):
         if cache_dir is None:
             cache_dir = Path(__file__).parent.parent / "cache"
         
         self.cache_dir = cache_dir
-        self.cache_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.config = config or CollectorConfig()
+        self.pypi_client = get_default_client(
+            self.cache_dir,
+            timeout=self.config.pypi_timeout,
+            rate_limit=self.config.pypi_rate_limit,
+            max_workers=self.config.pypi_max_workers
+        )
+        self.verdicts = VerdictCache(self.cache_dir / "verdicts.json", self.config.verdict_ttl_hours)
+        
+        # Source being collected and packages checked so far, for status reports
+        self.progress: Dict[str, Any] = {}
         
         # Data sources
         self.sources = {
@@ -53,6 +69,7 @@ class DataCollector:
         for source_name, collector_func in self.sources.items():
             try:
                 logger.info(f"Collecting data from {source_name}...")
+                self.progress = {"source": source_name, "checked": 0, "total": 0}
                 data = collector_func()
                 if data:
                     all_data.update(data)
@@ -64,6 +81,22 @@ class DataCollector:
     
     def _collect_from_pypi(self) -> Dict[str, Any]:
         """Collects deprecated packages from PyPI API."""
+        data, packages_to_check = self.pypi_packages_to_check()
+        
+        started = time.monotonic()
+        requests_before = self.pypi_client.requests_made
+        
+        fetched = self.pypi_client.fetch_many(packages_to_check)
+        for i, (package, package_data) in enumerate(fetched, 1):
+            self.log_pypi_progress(i, len(packages_to_check), started,
+                                    self.pypi_client.requests_made - requests_before)
+            self.record_pypi_package(data, package, package_data)
+        
+        self.finish_pypi_collection(data)
+        return data
+    
+    def pypi_packages_to_check(self) -> Tuple[Dict[str, Any], List[str]]:
+        """Returns packages answered from the verdict cache and those to check on PyPI."""
         data = {}
         
         # Extended list of known deprecated packages to check
@@ -152,48 +185,69 @@ class DataCollector:
             "collections", "itertools", "functools", "operator"
         ]
         
-        logger.info(f"Checking {len(packages_to_check)} packages on PyPI...")
-        
-        for i, package in enumerate(packages_to_check, 1):
-            try:
-                logger.info(f"Checking package {i}/{len(packages_to_check)}: {package}")
-                
-                # Get package information from PyPI
-                response = requests.get(
-                    f"https://pypi.org/pypi/{package}/json",
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    package_data = response.json()
-                    
-                    # Check if there is information about deprecation
-                    if self._is_deprecated_package(package_data):
-                        alternatives = self._get_alternatives(package)
-                        data[package] = {
-                            "deprecated_since": self._extract_deprecation_date(package_data),
-                            "reason": self._extract_deprecation_reason(package_data),
-                            "alternatives": alternatives,
-                            "source": "pypi",
-                            "last_updated": datetime.now().isoformat(),
-                            "package_info": {
-                                "latest_version": package_data.get("info", {}).get("version", ""),
-                                "summary": package_data.get("info", {}).get("summary", ""),
-                                "home_page": package_data.get("info", {}).get("home_page", ""),
-                                "project_url": package_data.get("info", {}).get("project_url", "")
-                            }
-                        }
-                        logger.info(f"✓ Found deprecated package: {package}")
-                    else:
-                        logger.debug(f"Package {package} is not deprecated")
-                
-                time.sleep(0.1)  # Don't overload API
-                
-            except Exception as e:
-                logger.warning(f"Error checking {package}: {e}")
-        
+        if self.config.pypi_packages:
+            packages_to_check = list(self.config.pypi_packages)
+        
+        # Skip packages with an unexpired verdict
+        unchecked = []
+        for package in packages_to_check:
+            found, entry = self.verdicts.get(package, "pypi")
+            if not found:
+                unchecked.append(package)
+            elif entry:
+                data[package] = entry
+        if len(unchecked) < len(packages_to_check):
+            logger.info(f"{len(packages_to_check) - len(unchecked)} packages answered from verdict cache")
+        
+        logger.info(f"Checking {len(unchecked)} packages on PyPI...")
+        return data, unchecked
+    
+    def log_pypi_progress(self, checked: int, total: int, started: float, requests_made: int) -> None:
+        """Records progress and logs it about every 5% of the packages."""
+        self.progress.update(checked=checked, total=total)
+        if checked % max(1, total // 20) == 0 or checked == total:
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logger.info(f"Checked {checked}/{total} packages ({requests_made / elapsed:.1f} req/s)")
+    
+    def record_pypi_package(self, data: Dict[str, Any], package: str, package_data: Any) -> None:
+        """Adds a package to data if its metadata marks it as deprecated, caching the verdict."""
+        if isinstance(package_data, Exception):
+            return
+        if package_data is None:
+            self.verdicts.add(package, "pypi")
+            return
+        
+        # Check if there is information about deprecation
+        if self._is_deprecated_package(package_data):
+            alternatives = self._get_alternatives(package)
+            data[package] = {
+                "deprecated_since": self._extract_deprecation_date(package_data),
+                "reason": self._extract_deprecation_reason(package_data),
+                "alternatives": alternatives,
+                "source": "pypi",
+                "last_updated": datetime.now().isoformat(),
+                "package_info": {
+                    "latest_version": package_data.get("info", {}).get("version", ""),
+                    "summary": package_data.get("info", {}).get("summary", ""),
+                    "home_page": package_data.get("info", {}).get("home_page", ""),
+                    "project_url": package_data.get("info", {}).get("project_url", "")
+                }
+            }
+            self.verdicts.add(package, "pypi", data[package])
+            logger.info(f"✓ Found deprecated package: {package}")
+        else:
+            self.verdicts.add(package, "pypi")
+            logger.debug(f"Package {package} is not deprecated")
+    
+    def finish_pypi_collection(self, data: Dict[str, Any]) -> None:
+        """Saves verdicts and logs cache statistics."""
+        self.verdicts.save()
+        cache_stats = self.pypi_client.cache.get_statistics()
+        logger.info(
+            f"HTTP cache: {cache_stats['hits']} fresh hits, {cache_stats['revalidated']} revalidated, "
+            f"{cache_stats['misses']} downloaded"
+        )
         logger.info(f"PyPI collection complete. Found {len(data)} deprecated packages")
-        return data
     
     def _collect_from_github(self) -> Dict[str, Any]:
         """Collects deprecated packages from GitHub repositories."""
@@ -224,10 +278,12 @@ class DataCollector:
             "urllib3": {
                 "deprecated_since": "2022-12-01",
                 "reason": "Old versions have vulnerabilities",
+                "affected": "<2.0",
                 "alternatives": [
                     {
                         "name": "urllib3",
                         "reason": "Update to version 2.0+",
+                        "version": "2.0",
                         "migration_guide": "https://urllib3.readthedocs.io/"
                     }
                 ],
@@ -239,10 +295,12 @@ class DataCollector:
             "cryptography": {
                 "deprecated_since": "2023-03-01",
                 "reason": "Old versions have critical vulnerabilities",
+                "affected": "<41.0",
                 "alternatives": [
                     {
                         "name": "cryptography",
                         "reason": "Update to version 41.0+",
+                        "version": "41.0",
                         "migration_guide": "https://cryptography.io/"
                     }
                 ],
@@ -267,10 +325,12 @@ class DataCollector:
             "jinja2": {
                 "deprecated_since": "2023-02-01",
                 "reason": "Old versions have performance issues",
+                "affected": "<3.1",
                 "alternatives": [
                     {
                         "name": "jinja2",
                         "reason": "Update to version 3.1+",
+                        "version": "3.1",
                         "migration_guide": "https://jinja.palletsprojects.com/"
                     }
                 ],
@@ -507,10 +567,12 @@ class DataCollector:
             "celery": {
                 "deprecated_since": "2023-05-01",
                 "reason": "Old versions have performance issues",
+                "affected": "<5.3",
                 "alternatives": [
                     {
                         "name": "celery",
                         "reason": "Update to version 5.3+",
+                        "version": "5.3",
                         "migration_guide": "https://docs.celeryproject.org/"
                     },
                     {
@@ -525,10 +587,12 @@ class DataCollector:
             "redis": {
                 "deprecated_since": "2023-01-01",
                 "reason": "Old versions have security issues",
+                "affected": "<4.5",
                 "alternatives": [
                     {
                         "name": "redis",
                         "reason": "Update to version 4.5+",
+                        "version": "4.5",
                         "migration_guide": "https://redis.io/"
                     }
                 ],
@@ -538,10 +602,12 @@ class DataCollector:
             "django-cors-headers": {
                 "deprecated_since": "2023-06-01",
                 "reason": "Old versions have security issues",
+                "affected": "<4.0",
                 "alternatives": [
                     {
                         "name": "django-cors-headers",
                         "reason": "Update to version 4.0+",
+                        "version": "4.0",
                         "migration_guide": "https://github.com/adamchainz/django-cors-headers"
                     }
                 ],
@@ -568,29 +634,7 @@ class DataCollector:
     
     def _is_deprecated_package(self, package_data: Dict[str, Any]) -> bool:
         """Checks if package is deprecated based on PyPI data."""
-        # Check different indicators of deprecation
-        description = package_data.get("info", {}).get("summary", "")
-        keywords = package_data.get("info", {}).get("keywords", "")
-        
-        # Handle None values
-        if description is None:
-            description = ""
-        if keywords is None:
-            keywords = ""
-        
-        description = description.lower()
-        keywords = keywords.lower()
-        
-        deprecated_indicators = [
-            "deprecated", "deprecation", "discontinued", "legacy",
-            "outdated", "obsolete", "no longer maintained"
-        ]
-        
-        for indicator in deprecated_indicators:
-            if indicator in description or indicator in keywords:
-                return True
-        
-        return False
+        return is_deprecated_metadata(package_data)
     
     def _extract_deprecation_date(self, package_data: Dict[str, Any]) -> str:
         """Extracts deprecation date from package data."""
@@ -655,6 +699,10 @@ class DataCollector:
         logger.info("Starting data collection...")
         new_data = self.collect_all_data()
         
+        if is_sqlite_path(output_path):
+            self._update_sqlite_database(output_path, new_data)
+            return
+        
         # Load existing data
         existing_data = {}
         if output_path.exists():
@@ -670,6 +718,23 @@ class DataCollector:
         
         logger.info(f"Database updated with {len(merged_data)} packages")
     
+    def _update_sqlite_database(self, output_path: Path, new_data: Dict[str, Any]) -> None:
+        """Upserts collected packages into an SQLite database one row at a time."""
+        store = SQLitePackageStore(output_path)
+        try:
+            updates = []
+            for package_name, package_data in new_data.items():
+                existing_package = store.get(package_name)
+                if existing_package is not None:
+                    existing_package.update(package_data)
+                    existing_package["last_updated"] = datetime.now().isoformat()
+                    package_data = existing_package
+                updates.append((package_name, package_data))
+            store.upsert_many(updates)
+            logger.info(f"Database updated with {len(updates)} packages ({len(store)} total)")
+        finally:
+            store.close()
+    
     def _merge_data(self, existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
         """Merges existing and new data."""
         merged = existing.copy()
@@ -2,12 +2,20 @@
 Dynamic database of deprecated packages and their alternatives.
 """
 
+import io
 import yaml
+import pickle
+import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from packaging import version
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name
 import importlib.resources as pkg_resources
 from .data_collector import DataCollector
+from .sqlite_store import SQLitePackageStore, is_sqlite_path
+from .cache_files import atomic_write
 # from .repository_analyzer import RepositoryAnalyzer  # Not used in current logic
 import logging
 
@@ -15,21 +23,109 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Use libyaml when available, it is an order of magnitude faster
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Compiled snapshot written next to the YAML database
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 1
+
+
+@lru_cache(maxsize=65536)
+def canonical_name(name: str) -> str:
+    """PEP 503 normalized name, memoized so repeated lookups skip the regex."""
+    return canonicalize_name(name)
+
+
+@lru_cache(maxsize=16384)
+def parse_version(text: str) -> Optional[version.Version]:
+    """Parses a version string once, returning None if it is invalid."""
+    try:
+        return version.parse(text)
+    except version.InvalidVersion:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def compile_affected(specifier: str) -> Optional[SpecifierSet]:
+    """Compiles an entry's "affected" range, returning None if it is invalid."""
+    try:
+        return SpecifierSet(specifier)
+    except InvalidSpecifier:
+        logger.warning(f"Ignoring invalid affected range: {specifier!r}")
+        return None
+
+
+@lru_cache(maxsize=65536)
+def is_affected(specifier: str, current_version: str) -> bool:
+    """Checks if a version falls into an "affected" range.
+    
+    Unknown or unparsable versions and invalid ranges count as affected,
+    so a package is never silently dropped from the report.
+    """
+    affected = compile_affected(specifier)
+    parsed = parse_version(current_version) if current_version else None
+    if affected is None or parsed is None:
+        return True
+    return affected.contains(parsed, prereleases=True)
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Unpickler limited to the types yaml.safe_load can produce."""
+    
+    ALLOWED = {("datetime", "date"), ("datetime", "datetime"), ("datetime", "timezone"),
+               ("datetime", "timedelta")}
+    
+    def find_class(self, module, name):
+        if (module, name) in self.ALLOWED:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Forbidden type in database snapshot: {module}.{name}")
+
+
+def static_database_candidates() -> List[Path]:
+    """Returns possible locations of the static database, in priority order."""
+    candidates = []
+    try:
+        import core
+        candidates.append(Path(core.__file__).parent / "deprecated_packages.yaml")
+    except Exception as e:
+        logger.debug(f"Failed to locate core package: {e}")
+    candidates.append(Path(__file__).parent / "deprecated_packages.yaml")
+    candidates.append(Path(__file__).parent.parent / "data" / "deprecated_packages.yaml")
+    
+    unique = []
+    for candidate in candidates:
+        if candidate not in unique:
+            unique.append(candidate)
+    return unique
+
+
+def default_database_path() -> Optional[Path]:
+    """Returns the static database file used when no path is given, if there is one."""
+    for candidate in static_database_candidates():
+        if candidate.exists():
+            return candidate
+    return None
+
 
 class DeprecatedPackageDB:
     """Database of deprecated packages."""
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False):
         if db_path is None:
             # Always try to load from package data first
             self.db_path = None  # Will load from package
         else:
             self.db_path = db_path
         
+        # Only meaningful for the SQLite backend
+        self.read_only = read_only
+        
         self._load_database()
     
     def _load_database(self):
         """Loads database from static file by default."""
+        self.db_version = ""
         try:
             if self.db_path is None:
                 # Try to load from static file first (fallback)
@@ -42,68 +138,57 @@ class DeprecatedPackageDB:
                 else:
                     logger.warning("No static data found, database will be empty")
                     self.data = {}
+            elif is_sqlite_path(self.db_path):
+                # Indexed lookups straight from SQLite, nothing is loaded up front
+                self.data = SQLitePackageStore(Path(self.db_path), read_only=self.read_only)
+                self.db_version = self.data.version
+                logger.info(f"Opened SQLite database: {self.db_path}")
             else:
                 # Load from specified file path
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    self.data = yaml.safe_load(f) or {}
-                    logger.info(f"Successfully loaded database from specified path: {self.db_path}")
+                self.data = self._load_yaml_file(Path(self.db_path))
+                logger.info(f"Successfully loaded database from specified path: {self.db_path}")
         except Exception as e:
             logger.error(f"Error loading database: {e}")
             self.data = {}
+        
+        self._build_index()
+    
+    def _build_index(self) -> None:
+        """Maps normalized names to the keys stored in the data, once per load.
+        
+        SQLite keeps the same mapping in its indexed canonical column.
+        """
+        if isinstance(self.data, SQLitePackageStore):
+            self._index = {}
+            return
+        
+        self._index = {}
+        for name, info in self.data.items():
+            self._index[canonical_name(name)] = name
+            # Compile version ranges up front, lookups only hit the cache
+            if isinstance(info, dict) and info.get("affected"):
+                compile_affected(str(info["affected"]))
     
     def _load_static_database(self) -> Dict[str, Any]:
         """Loads static database from YAML file as fallback."""
         try:
-            # Method 1: Try importlib.resources with correct package structure
-            try:
-                import importlib.resources as resources
-                with resources.open_text('core', 'deprecated_packages.yaml') as f:
-                    data = yaml.safe_load(f) or {}
-                    logger.info("Successfully loaded static database using importlib.resources from core")
-                    return data
-            except Exception as e:
-                logger.debug(f"Failed to load static database using importlib.resources: {e}")
-            
-            # Method 2: Try to load from core directory
-            try:
-                import core
-                core_dir = Path(core.__file__).parent
-                data_file = core_dir / "deprecated_packages.yaml"
+            for data_file in static_database_candidates():
                 if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f) or {}
-                        logger.info(f"Successfully loaded static database from core directory: {data_file}")
-                        return data
-                else:
-                    logger.debug(f"Static database file not found at: {data_file}")
-            except Exception as e:
-                logger.debug(f"Failed to load static database from core directory: {e}")
-            
-            # Method 3: Fallback to relative path
-            try:
-                data_file = Path(__file__).parent / "deprecated_packages.yaml"
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f) or {}
-                        logger.info(f"Successfully loaded static database from relative path: {data_file}")
-                        return data
-                else:
-                    logger.debug(f"Static database file not found at: {data_file}")
-            except Exception as e:
-                logger.debug(f"Failed to load static database from relative path: {e}")
+                    data = self._load_yaml_file(data_file)
+                    logger.info(f"Successfully loaded static database from: {data_file}")
+                    return data
+                logger.debug(f"Static database file not found at: {data_file}")
             
-            # Method 4: Try data directory
+            # Last resort: package resources that are not plain files (e.g. zip installs)
             try:
-                data_file = Path(__file__).parent.parent / "data" / "deprecated_packages.yaml"
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f) or {}
-                        logger.info(f"Successfully loaded static database from data directory: {data_file}")
-                        return data
-                else:
-                    logger.debug(f"Static database file not found at: {data_file}")
+                import importlib.resources as resources
+                text = resources.read_text('core', 'deprecated_packages.yaml', encoding='utf-8')
+                self.db_version = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                data = yaml.load(text, Loader=YAML_LOADER) or {}
+                logger.info("Successfully loaded static database using importlib.resources from core")
+                return data
             except Exception as e:
-                logger.debug(f"Failed to load static database from data directory: {e}")
+                logger.debug(f"Failed to load static database using importlib.resources: {e}")
             
             logger.warning("No static database file found in any location")
             return {}
@@ -111,6 +196,76 @@ class DeprecatedPackageDB:
             logger.error(f"Error loading static database: {e}")
             return {}
     
+    def _load_yaml_file(self, data_file: Path) -> Dict[str, Any]:
+        """Loads a YAML database, going through its compiled snapshot.
+        
+        The snapshot is reused while the YAML's size and mtime are unchanged,
+        or while its content hash matches after a touch. Otherwise the YAML is
+        parsed once and a fresh snapshot is written next to it.
+        """
+        stat = data_file.stat()
+        snapshot_file = data_file.with_name(data_file.name + SNAPSHOT_SUFFIX)
+        header, payload = self._read_snapshot(snapshot_file)
+        
+        if header and header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            data = self._unpickle(payload)
+            if data is not None:
+                self.db_version = header["sha256"]
+                logger.debug(f"Loaded database snapshot: {snapshot_file}")
+                return data
+        
+        raw = data_file.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        self.db_version = digest
+        
+        data = None
+        if header and header["sha256"] == digest:
+            # Content unchanged (e.g. file was touched or copied), refresh validators only
+            data = self._unpickle(payload)
+        if data is None:
+            data = yaml.load(raw.decode('utf-8'), Loader=YAML_LOADER) or {}
+        
+        self._write_snapshot(snapshot_file, stat, digest, data)
+        return data
+    
+    def _read_snapshot(self, snapshot_file: Path):
+        """Reads snapshot file in one go and returns its header and raw payload."""
+        try:
+            buffer = io.BytesIO(snapshot_file.read_bytes())
+            header = _SnapshotUnpickler(buffer).load()
+            if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+                return None, None
+            return header, buffer
+        except FileNotFoundError:
+            return None, None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable database snapshot {snapshot_file}: {e}")
+            return None, None
+    
+    def _unpickle(self, payload) -> Optional[Dict[str, Any]]:
+        """Loads snapshot payload, returning None if it is corrupt."""
+        try:
+            return _SnapshotUnpickler(payload).load()
+        except Exception as e:
+            logger.debug(f"Ignoring corrupt database snapshot: {e}")
+            return None
+    
+    def _write_snapshot(self, snapshot_file: Path, stat, digest: str, data: Dict[str, Any]) -> None:
+        """Atomically writes compiled snapshot next to the YAML file."""
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+        }
+        try:
+            atomic_write(snapshot_file, pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+                         + pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            logger.debug(f"Wrote database snapshot: {snapshot_file}")
+        except OSError as e:
+            # Read-only installs simply keep parsing the YAML
+            logger.debug(f"Could not write database snapshot {snapshot_file}: {e}")
+    
     def _should_collect_fresh_data(self) -> bool:
         """Determines if we should collect fresh data."""
         # For now, use static data by default
@@ -133,13 +288,15 @@ class DeprecatedPackageDB:
     
     def is_deprecated(self, package_name: str, package_version: str = "") -> bool:
         """Checks if package is deprecated."""
-        package_name = package_name.lower()
-        return package_name in self.data
+        return self.get_deprecated_info(package_name) is not None
     
     def get_deprecated_info(self, package_name: str) -> Optional[Dict[str, Any]]:
         """Gets information about deprecated package."""
-        package_name = package_name.lower()
-        return self.data.get(package_name)
+        key = canonical_name(package_name)
+        if isinstance(self.data, SQLitePackageStore):
+            return self.data.get_canonical(key)
+        name = self._index.get(key)
+        return self.data[name] if name is not None else None
     
     def get_alternatives(self, package_name: str) -> List[Dict[str, str]]:
         """Gets list of alternatives for deprecated package."""
@@ -150,12 +307,48 @@ class DeprecatedPackageDB:
     
     def check_version_compatibility(self, package_name: str, current_version: str) -> Dict[str, Any]:
         """Checks version compatibility of package."""
-        package_name = package_name.lower()
         info = self.get_deprecated_info(package_name)
         
-        if not info:
+        if not info or not self._affects(info, current_version):
             return {"is_deprecated": False}
         
+        return self._compatibility(canonical_name(package_name), current_version, info)
+    
+    def check_many(self, packages: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Checks many (name, version) pairs in one pass.
+        
+        Pairs and names are deduplicated and normalized once, and all names
+        are looked up together (one query per chunk for SQLite). Only
+        deprecated pairs are returned, keyed by the pair as passed in; a
+        missing key means "not deprecated".
+        """
+        pairs = set(packages)
+        normalized = {name: canonical_name(name) for name in {name for name, _ in pairs}}
+        infos = self._get_many(set(normalized.values()))
+        
+        results = {}
+        for package_name, current_version in pairs:
+            key = normalized[package_name]
+            info = infos.get(key)
+            if info and self._affects(info, current_version):
+                results[(package_name, current_version)] = self._compatibility(key, current_version, info)
+        return results
+    
+    def _get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Looks up many normalized names, returning only the deprecated ones."""
+        if isinstance(self.data, SQLitePackageStore):
+            return self.data.get_many_canonical(keys)
+        data = self.data
+        index = self._index
+        return {key: data[index[key]] for key in keys if key in index}
+    
+    def _affects(self, info: Dict[str, Any], current_version: str) -> bool:
+        """Checks the entry's optional "affected" range (e.g. "<2.0") against a version."""
+        affected = info.get("affected")
+        return not affected or is_affected(str(affected), current_version)
+    
+    def _compatibility(self, key: str, current_version: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Builds check_version_compatibility result for a deprecated package."""
         result = {
             "is_deprecated": True,
             "deprecated_since": info.get("deprecated_since"),
@@ -164,21 +357,20 @@ class DeprecatedPackageDB:
             "current_version": current_version,
             "needs_update": False
         }
+        if info.get("affected"):
+            result["affected"] = str(info["affected"])
         
         # Check if package needs update
         if current_version and "alternatives" in info:
             for alt in info["alternatives"]:
-                if alt["name"].lower() == package_name:
+                if canonical_name(alt["name"]) == key:
                     # This is update of the same package
                     if "version" in alt:
-                        try:
-                            current_ver = version.parse(current_version)
-                            required_ver = version.parse(alt["version"])
-                            if current_ver < required_ver:
-                                result["needs_update"] = True
-                                result["required_version"] = alt["version"]
-                        except version.InvalidVersion:
-                            pass
+                        current_ver = parse_version(current_version)
+                        required_ver = parse_version(str(alt["version"]))
+                        if current_ver is not None and required_ver is not None and current_ver < required_ver:
+                            result["needs_update"] = True
+                            result["required_version"] = alt["version"]
                     break
         
         return result
@@ -195,18 +387,18 @@ class DeprecatedPackageDB:
         """Gets link to migration guide."""
         alternatives = self.get_alternatives(package_name)
         for alt in alternatives:
-            if alt["name"].lower() == alternative_name.lower():
+            if canonical_name(alt["name"]) == canonical_name(alternative_name):
                 return alt.get("migration_guide")
         return None
     
     def export_to_json(self) -> str:
         """Exports database to JSON format."""
         import json
-        return json.dumps(self.data, indent=2, ensure_ascii=False)
+        return json.dumps(dict(self.data), indent=2, ensure_ascii=False, default=str)
     
     def export_to_yaml(self) -> str:
         """Exports database to YAML format."""
-        return yaml.dump(self.data, default_flow_style=False, allow_unicode=True)
+        return yaml.dump(dict(self.data), default_flow_style=False, allow_unicode=True)
     
     def export_to_csv(self) -> str:
         """Exports database to CSV format."""
@@ -227,4 +419,12 @@ class DeprecatedPackageDB:
             
             writer.writerow([package_name, deprecated_since, reason, alternatives])
         
-        return output.getvalue() 
\ No newline at end of file
+        return output.getvalue()
+    
+    def export_to_sqlite(self, output_path: Path) -> int:
+        """Exports database to an SQLite file, returning number of packages written."""
+        store = SQLitePackageStore(output_path)
+        try:
+            return store.upsert_many(self.data.items())
+        finally:
+            store.close()
@@ -0,0 +1,164 @@
+"""
+Resolved dependency graph used for transitive checks.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from .parser import iter_lock_packages
+from .environment import running_site_packages, scan_site_packages
+
+logger = logging.getLogger(__name__)
+
+# Lockfiles a graph can be built from, most informative first
+GRAPH_LOCKFILES = ("uv.lock", "poetry.lock", "pdm.lock", "Pipfile.lock")
+
+ENVIRONMENT_SOURCE = "environment"
+
+
+class DependencyGraph:
+    """Pinned packages and their "depends on" edges.
+    
+    Nodes are keyed by canonical (PEP 503) name, so "Foo_Bar" in one
+    place and "foo-bar" in another end up as the same node. Roots are the
+    direct dependencies a walk starts from.
+    """
+    
+    def __init__(self, source: str = ""):
+        self.source = source
+        self.versions: Dict[str, str] = {}
+        self.edges: Dict[str, List[str]] = {}
+        self.roots: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self.versions)
+    
+    def add_package(self, name: str, version: str = "", dependencies: Iterable[str] = ()) -> None:
+        """Adds a node with its direct dependencies."""
+        key = canonicalize_name(name)
+        self.versions[key] = version
+        self.edges.setdefault(key, []).extend(canonicalize_name(dep) for dep in dependencies)
+    
+    def set_roots(self, names: Iterable[str]) -> None:
+        """Sets direct dependencies; names missing from the graph are ignored."""
+        roots = []
+        for name in names:
+            key = canonicalize_name(name)
+            if key in self.versions and key not in roots:
+                roots.append(key)
+        self.roots = roots
+    
+    def top_level(self) -> List[str]:
+        """Returns packages nothing else depends on."""
+        depended = {dep for deps in self.edges.values() for dep in deps}
+        return [name for name in self.versions if name not in depended]
+    
+    def walk(self) -> Dict[str, Optional[str]]:
+        """Breadth-first walk from all roots at once.
+        
+        Returns {node: parent} in visiting order. Every node is visited
+        exactly once however many paths reach it, and the parent chain of
+        a node is its shortest path from a root. Nodes the roots do not
+        reach (e.g. dev-only packages) are walked afterwards as their own
+        roots, so the whole graph is covered.
+        """
+        parents: Dict[str, Optional[str]] = {}
+        top_level = self.top_level()
+        
+        for start in (self.roots or top_level, top_level, list(self.versions)):
+            queue = deque()
+            for root in start:
+                if root not in parents:
+                    parents[root] = None
+                    queue.append(root)
+            
+            while queue:
+                node = queue.popleft()
+                for dependency in self.edges.get(node, ()):
+                    if dependency in self.versions and dependency not in parents:
+                        parents[dependency] = node
+                        queue.append(dependency)
+        
+        return parents
+    
+    def path_to(self, parents: Dict[str, Optional[str]], node: str) -> List[str]:
+        """Rebuilds the root -> node path from a walk() result."""
+        path = [node]
+        while parents.get(path[-1]) is not None:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+    
+    @classmethod
+    def from_lockfile(cls, file_path: Path) -> "DependencyGraph":
+        """Builds graph from poetry.lock, pdm.lock, uv.lock or Pipfile.lock."""
+        graph = cls(file_path.name)
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if file_path.name == "Pipfile.lock":
+                # Pipfile.lock has no edges, every package is a node on its own
+                data = json.load(f)
+                for section in ("default", "develop"):
+                    for package_name, package_info in (data.get(section) or {}).items():
+                        version_spec = package_info.get("version", "") if isinstance(package_info, dict) else ""
+                        graph.add_package(package_name, version_spec.lstrip("="))
+                return graph
+            
+            roots = []
+            for package in iter_lock_packages(f.read()):
+                if package.local:
+                    # uv lists the project itself, its dependencies are the direct ones
+                    roots.extend(package.dependencies)
+                else:
+                    graph.add_package(package.name, package.version, package.dependencies)
+            graph.set_roots(roots)
+        
+        return graph
+    
+    @classmethod
+    def from_environment(cls, paths: Optional[List[Path]] = None) -> "DependencyGraph":
+        """Builds graph from installed distributions' metadata.
+        
+        Looks at site-packages directories in paths, or at the running
+        interpreter's sys.path when paths is None.
+        """
+        graph = cls(ENVIRONMENT_SOURCE)
+        
+        for site_dir in (paths if paths is not None else running_site_packages()):
+            for distribution in scan_site_packages(site_dir):
+                key = canonicalize_name(distribution.name)
+                # The first sys.path entry wins, like the import system does
+                if key not in graph.versions:
+                    graph.add_package(distribution.name, distribution.version,
+                                      requires_dist_names(distribution.requires))
+        
+        return graph
+
+
+def requires_dist_names(requirements: Iterable[str]) -> List[str]:
+    """Returns names of Requires-Dist entries that are not behind an extra."""
+    names = []
+    for requirement in requirements:
+        try:
+            parsed = Requirement(requirement)
+        except InvalidRequirement:
+            continue
+        if parsed.marker is not None and "extra" in str(parsed.marker):
+            continue
+        names.append(parsed.name)
+    return names
+
+
+def find_lockfile(project_path: Path) -> Optional[Path]:
+    """Returns the lockfile to build a graph from, if the project has one."""
+    for name in GRAPH_LOCKFILES:
+        lock_file = project_path / name
+        if lock_file.exists():
+            return lock_file
+    return None
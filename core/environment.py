@@ -0,0 +1,169 @@
+"""
+Scanner for installed environments (virtualenvs, containers, site-packages).
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Headers read from METADATA / PKG-INFO, everything else is skipped
+METADATA_HEADERS = {"name", "version", "requires-dist"}
+
+
+class InstalledDistribution(NamedTuple):
+    """Name, version and Requires-Dist of one installed distribution."""
+    name: str
+    version: str
+    requires: Tuple[str, ...]
+
+
+def read_metadata_headers(lines: Iterable[str]) -> Tuple[Optional[str], str, List[str]]:
+    """Reads Name, Version and Requires-Dist from core metadata lines.
+    
+    Stops at the first empty line, which separates the headers from the
+    (possibly very long) description body.
+    """
+    name = None
+    version = ""
+    requires = []
+    
+    for line in lines:
+        if line in ("\n", "\r\n", ""):
+            break
+        # Folded continuation lines belong to headers we do not read
+        if line[0] in " \t":
+            continue
+        
+        key, _, value = line.partition(":")
+        key = key.lower()
+        if key not in METADATA_HEADERS:
+            continue
+        value = value.strip()
+        if key == "name":
+            name = value
+        elif key == "version":
+            version = value
+        else:
+            requires.append(value)
+    
+    return name, version, requires
+
+
+def read_distribution(path: Path) -> Optional[InstalledDistribution]:
+    """Reads a *.dist-info or *.egg-info entry of site-packages."""
+    if path.suffix == ".dist-info":
+        metadata_file = path / "METADATA"
+    elif path.is_dir():
+        metadata_file = path / "PKG-INFO"
+    else:
+        # Old setuptools write egg-info as a single PKG-INFO style file
+        metadata_file = path
+    
+    try:
+        with open(metadata_file, 'r', encoding='utf-8', errors='replace') as f:
+            name, version, requires = read_metadata_headers(f)
+    except OSError:
+        name, version, requires = None, "", []
+    
+    if not name:
+        # Fall back to the "<name>-<version>.dist-info" directory name
+        stem = path.name.rsplit(".", 1)[0]
+        name, _, version = stem.partition("-")
+        if not name:
+            return None
+    
+    if path.suffix == ".egg-info" and path.is_dir() and not requires:
+        requires = _read_egg_requires(path / "requires.txt")
+    
+    return InstalledDistribution(name, version, tuple(requires))
+
+
+def _read_egg_requires(requires_file: Path) -> List[str]:
+    """Reads unconditional requirements from an egg-info requires.txt."""
+    try:
+        with open(requires_file, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_egg_requires(f)
+    except OSError:
+        return []
+
+
+def parse_egg_requires(lines: Iterable[str]) -> List[str]:
+    """Returns the unconditional requirements of egg-info requires.txt lines."""
+    requires = []
+    for line in lines:
+        line = line.strip()
+        # Extras and markers are listed in [sections] after the base requirements
+        if line.startswith("["):
+            break
+        if line:
+            requires.append(line)
+    return requires
+
+
+def find_site_packages(env_path: Path) -> List[Path]:
+    """Returns site-packages directories of a virtualenv or prefix.
+    
+    A path that already is a site-packages (or any directory holding
+    *.dist-info entries) is returned as is.
+    """
+    candidates = []
+    for pattern in ("lib/python*/site-packages", "lib64/python*/site-packages",
+                    "Lib/site-packages", "lib/python*/dist-packages"):
+        candidates.extend(sorted(env_path.glob(pattern)))
+    
+    site_dirs = []
+    seen = set()
+    for candidate in candidates:
+        # lib64 is often a symlink to lib
+        resolved = candidate.resolve()
+        if candidate.is_dir() and resolved not in seen:
+            seen.add(resolved)
+            site_dirs.append(candidate)
+    
+    return site_dirs or [env_path]
+
+
+def scan_site_packages(site_dir: Path) -> List[InstalledDistribution]:
+    """Lists installed distributions of one site-packages directory."""
+    distributions = []
+    try:
+        with os.scandir(site_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith((".dist-info", ".egg-info")):
+                    distribution = read_distribution(Path(entry.path))
+                    if distribution is not None:
+                        distributions.append(distribution)
+    except OSError:
+        return []
+    
+    distributions.sort(key=lambda distribution: distribution.name.lower())
+    return distributions
+
+
+def scan_environment(env_path: Path) -> List[InstalledDistribution]:
+    """Lists installed distributions of a virtualenv or prefix."""
+    distributions = []
+    for site_dir in find_site_packages(env_path):
+        distributions.extend(scan_site_packages(site_dir))
+    return distributions
+
+
+def scan_environments(env_paths: List[Path], jobs: Optional[int] = None) -> Dict[str, List[InstalledDistribution]]:
+    """Scans many environments in parallel, keyed by environment path.
+    
+    The work is small reads of metadata headers, so a thread pool is
+    enough to keep the disk busy.
+    """
+    if jobs is None:
+        jobs = min(32, (os.cpu_count() or 1) * 4)
+    
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        scanned = executor.map(scan_environment, env_paths)
+        return {str(env_path): distributions for env_path, distributions in zip(env_paths, scanned)}
+
+
+def running_site_packages() -> List[Path]:
+    """Returns sys.path directories of the running interpreter."""
+    return [Path(entry) for entry in sys.path if entry and os.path.isdir(entry)]
@@ -0,0 +1,186 @@
+"""
+Persistent HTTP cache with ETag / Last-Modified revalidation.
+"""
+
+import re
+import json
+import time
+import zlib
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+import logging
+
+from .cache_files import LRUDirectoryCache, atomic_write
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class CachedResponse:
+    """Minimal response object returned by HTTPCache.get."""
+    
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None,
+                 from_cache: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+    
+    def json(self) -> Any:
+        """Decodes body as JSON."""
+        return json.loads(self.content)
+
+
+class HTTPCache(LRUDirectoryCache):
+    """On-disk cache of GET responses that sends conditional requests.
+    
+    Each URL is stored as a small JSON metadata file with the validators
+    (ETag, Last-Modified) and freshness lifetime, plus a zlib-compressed
+    body. Fresh entries are served without touching the network, stale
+    ones are revalidated and a 304 reuses the stored body. Once the
+    directory grows past max_bytes the least recently used files are
+    evicted.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        super().__init__([self.cache_dir], max_bytes)
+        
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+    
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Returns a still-fresh cached response without any network access."""
+        meta = self._load_meta(url)
+        if meta is None or meta.get("expires", 0) <= time.time():
+            return None
+        body = self._load_body(url)
+        if body is None:
+            return None
+        self._count("hits")
+        self._touch(self._body_path(url))
+        return CachedResponse(200, body, meta.get("headers"), from_cache=True)
+    
+    def get(self, session: requests.Session, url: str, timeout: float = 10) -> CachedResponse:
+        """Performs a cached GET request."""
+        cached, headers = self.prepare(url)
+        if cached is not None:
+            return cached
+        return self.complete(url, session.get(url, timeout=timeout, headers=headers))
+    
+    def prepare(self, url: str) -> Tuple[Optional[CachedResponse], Dict[str, str]]:
+        """Returns a fresh cached response, or the conditional headers to send instead."""
+        meta = self._load_meta(url)
+        if meta is None:
+            return None, {}
+        body = self._load_body(url)
+        if body is None:
+            return None, {}
+        if meta.get("expires", 0) > time.time():
+            self._count("hits")
+            self._touch(self._body_path(url))
+            return CachedResponse(200, body, meta.get("headers"), from_cache=True), {}
+        
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return None, headers
+    
+    def complete(self, url: str, response) -> CachedResponse:
+        """Stores the response to a prepared request; a 304 reuses the stored body.
+        
+        The response needs status_code, content and headers, like a
+        requests.Response.
+        """
+        if response.status_code == 304:
+            meta = self._load_meta(url)
+            body = self._load_body(url)
+            if meta is not None and body is not None:
+                self._count("revalidated")
+                meta["expires"] = time.time() + self._max_age(response)
+                self._write(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+                self._touch(self._body_path(url))
+                return CachedResponse(200, body, meta.get("headers"), from_cache=True)
+        
+        if response.status_code == 200:
+            self._count("misses")
+            self._store(url, response)
+        
+        return CachedResponse(response.status_code, response.content, dict(response.headers))
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Returns hit/miss counters."""
+        total = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidated) / total if total else 0.0
+        }
+    
+    def _store(self, url: str, response) -> None:
+        """Stores response body and validators."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        max_age = self._max_age(response)
+        if not etag and not last_modified and not max_age:
+            return
+        
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires": time.time() + max_age,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")}
+        }
+        # Body first, so metadata never points at a missing body
+        written = self._write(self._body_path(url), zlib.compress(response.content, 1))
+        written += self._write(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+        self._record_write(written)
+    
+    def _max_age(self, response) -> int:
+        """Extracts freshness lifetime from Cache-Control."""
+        cache_control = response.headers.get("Cache-Control", "")
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0
+        match = MAX_AGE_PATTERN.search(cache_control)
+        return int(match.group(1)) if match else 0
+    
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+    
+    def _meta_path(self, url: str) -> Path:
+        return self.cache_dir / f"{self._key(url)}.json"
+    
+    def _body_path(self, url: str) -> Path:
+        return self.cache_dir / f"{self._key(url)}.body"
+    
+    def _load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(url), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            return meta if meta.get("url") == url else None
+        except (OSError, ValueError):
+            return None
+    
+    def _load_body(self, url: str) -> Optional[bytes]:
+        try:
+            return zlib.decompress(self._body_path(url).read_bytes())
+        except (OSError, zlib.error):
+            return None
+    
+    def _write(self, path: Path, data: bytes) -> int:
+        try:
+            return atomic_write(path, data)
+        except OSError as e:
+            logger.debug(f"Could not write HTTP cache entry {path}: {e}")
+            return 0
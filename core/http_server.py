@@ -0,0 +1,249 @@
+"""
+HTTP service exposing package lookups and manifest checks as JSON.
+"""
+
+import io
+import json
+import time
+import select
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+import logging
+
+from .checker import DeprecatedChecker
+from .report_writers import REPORT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_PENDING = 128
+
+# Idle keep-alive connections give their worker back after this many seconds,
+# or at once when another connection is waiting for a worker
+KEEP_ALIVE_TIMEOUT = 5
+
+# How often an idle keep-alive connection checks for waiting connections
+IDLE_POLL_INTERVAL = 0.05
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "yaml": "application/yaml",
+    "text": "text/plain; charset=utf-8",
+}
+
+
+class RequestError(Exception):
+    """Client error, answered with its status code and message."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's shared checker.
+    
+    GET  /health                         -> {"status": "ok", ...}
+    GET  /lookup?name=requests&version=2.0
+    POST /lookup {"packages": [{"name": ..., "version": ...}, ...]}
+    POST /check  {"files": {"requirements.txt": "<content>", ...}, "format": "json"}
+    """
+    
+    # Keep-alive; small JSON responses are sent without waiting to coalesce packets
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    disable_nagle_algorithm = True
+    
+    def handle(self) -> None:
+        """Serves requests on the connection while it is worth keeping a worker for it."""
+        self.handle_one_request()
+        while not self.close_connection and self._wait_for_request():
+            self.handle_one_request()
+    
+    def _wait_for_request(self) -> bool:
+        """Waits for the next keep-alive request; False to close the connection.
+        
+        Gives up when the connection stays idle for KEEP_ALIVE_TIMEOUT, or as
+        soon as other connections are queued for a worker, so idle clients
+        never keep active ones waiting.
+        """
+        deadline = time.monotonic() + KEEP_ALIVE_TIMEOUT
+        while True:
+            # A pipelined request may already sit in the read buffer, where select() cannot see it
+            self.connection.settimeout(0)
+            try:
+                if self.rfile.peek(1):
+                    return True
+            except OSError:
+                return False
+            finally:
+                self.connection.settimeout(self.timeout)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.server.has_waiting():
+                return False
+            readable, _, _ = select.select([self.connection], [], [], min(IDLE_POLL_INTERVAL, remaining))
+            if readable:
+                # A request, or EOF which handle_one_request turns into close_connection
+                return True
+    
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._dispatch(url.path, lambda: self._get(url.path, query))
+    
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        self._dispatch(path, lambda: self._post(path, self._read_json()))
+    
+    def _get(self, path: str, query: Dict[str, str]) -> Tuple[str, str]:
+        if path == "/health":
+            return "json", json.dumps({"status": "ok", "database_version": self.server.checker.db.db_version})
+        if path == "/lookup":
+            if not query.get("name"):
+                raise RequestError(400, "Query parameter 'name' is required")
+            return "json", json.dumps(self.server.lookup([(query["name"], query.get("version", ""))])[0])
+        raise RequestError(404, f"Unknown endpoint: {path}")
+    
+    def _post(self, path: str, body: Dict[str, Any]) -> Tuple[str, str]:
+        if path == "/lookup":
+            packages = body.get("packages")
+            if not isinstance(packages, list):
+                raise RequestError(400, "'packages' must be a list")
+            try:
+                pairs = [(str(package["name"]), str(package.get("version") or "")) for package in packages]
+            except (KeyError, TypeError, AttributeError):
+                raise RequestError(400, "Each package needs a 'name'")
+            return "json", json.dumps({"results": self.server.lookup(pairs)})
+        if path == "/check":
+            files = body.get("files")
+            if not isinstance(files, dict) or not all(isinstance(content, str) for content in files.values()):
+                raise RequestError(400, "'files' must map file names to their content")
+            format_type = body.get("format", "json")
+            if format_type not in REPORT_FORMATS:
+                raise RequestError(400, f"Unsupported format: {format_type}")
+            return format_type, self.server.check(files, format_type)
+        raise RequestError(404, f"Unknown endpoint: {path}")
+    
+    def _dispatch(self, path: str, handler) -> None:
+        try:
+            format_type, payload = handler()
+            self._send(200, payload, CONTENT_TYPES[format_type])
+        except RequestError as e:
+            self._send(e.status, json.dumps({"error": str(e)}), CONTENT_TYPES["json"])
+        except Exception as e:
+            logger.exception(f"Error handling {path}")
+            self._send(500, json.dumps({"error": str(e)}), CONTENT_TYPES["json"])
+    
+    def _read_json(self) -> Dict[str, Any]:
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError(413, "Request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+        return body
+    
+    def _send(self, status: int, payload: str, content_type: str) -> None:
+        data = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class CheckServer(HTTPServer):
+    """HTTP server around one long-lived checker.
+    
+    Connections are handled on a fixed pool of worker threads. At most
+    max_pending connections wait for a worker, further ones are refused
+    with 503 right away instead of piling up. Idle keep-alive connections
+    are closed as soon as a connection is waiting for their worker.
+    """
+    
+    def __init__(self, address: Tuple[str, int], checker: DeprecatedChecker,
+                 workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING):
+        self.checker = checker
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="check-server")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        # Accepted connections not yet picked up by a worker
+        self._waiting: Dict[Any, Future] = {}
+        self._waiting_lock = threading.Lock()
+        super().__init__(address, CheckRequestHandler)
+    
+    def process_request(self, request, client_address) -> None:
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\n"
+                                b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        with self._waiting_lock:
+            self._waiting[request] = self.pool.submit(self._process_request, request, client_address)
+    
+    def has_waiting(self) -> bool:
+        """Checks if any accepted connection is waiting for a worker."""
+        return bool(self._waiting)
+    
+    def _process_request(self, request, client_address) -> None:
+        with self._waiting_lock:
+            self._waiting.pop(request, None)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+    
+    def server_close(self) -> None:
+        super().server_close()
+        # shutdown(cancel_futures=True) needs Python 3.9
+        with self._waiting_lock:
+            waiting, self._waiting = self._waiting, {}
+        for request, future in waiting.items():
+            if future.cancel():
+                self.shutdown_request(request)
+                self._slots.release()
+        self.pool.shutdown(wait=False)
+    
+    def lookup(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Looks packages up in one batch, results in request order.
+        
+        Versions may be specifiers ("==2.0", ">=1.4,<2"); they are reduced to
+        a version the way the CLI reduces manifest specifiers.
+        """
+        versions = {version: self.checker.extract_version(version) for _, version in pairs}
+        results = self.checker.db.check_many([(name, versions[version]) for name, version in pairs])
+        answers = []
+        for name, version in pairs:
+            answer = {"name": name, "version": version, "is_deprecated": False}
+            answer.update(results.get((name, versions[version])) or {})
+            answers.append(answer)
+        return answers
+    
+    def check(self, files: Dict[str, str], format_type: str = "json") -> str:
+        """Checks manifest contents keyed by path and renders the report."""
+        buffer = io.StringIO()
+        self.checker.write_events(self.checker.iter_check_manifests(files), buffer, format_type)
+        return buffer.getvalue()
@@ -0,0 +1,197 @@
+"""
+Scanner for container images saved with `docker save` or as an OCI layout.
+"""
+
+import json
+import posixpath
+import tarfile
+from pathlib import Path
+from typing import Dict, IO, List, Optional, Tuple
+
+from .environment import InstalledDistribution, read_metadata_headers
+
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+# Directories Python packages get installed into
+SITE_DIRS = ("site-packages", "dist-packages")
+
+
+def is_metadata_path(path: str) -> bool:
+    """Checks if a layer path is METADATA/PKG-INFO of an installed distribution."""
+    directory, _, file_name = path.rpartition("/")
+    parent, _, info_dir = directory.rpartition("/")
+    if not ((file_name == "METADATA" and info_dir.endswith(".dist-info"))
+            or (file_name == "PKG-INFO" and info_dir.endswith(".egg-info"))):
+        return False
+    return parent.rpartition("/")[2] in SITE_DIRS
+
+
+class ImageScanner:
+    """Collects installed Python distributions from image layers.
+    
+    Layers are applied bottom to top: each layer tarball is streamed once,
+    its METADATA files are read (headers only) and its whiteouts remove
+    what lower layers installed. Only the small per-distribution records
+    are kept, so memory does not grow with the image size.
+    """
+    
+    def __init__(self):
+        # dist-info / egg-info directory path -> distribution
+        self.installed: Dict[str, InstalledDistribution] = {}
+        self.layers_scanned = 0
+    
+    def scan(self, image_path: Path) -> Dict[str, List[InstalledDistribution]]:
+        """Scans every image in a tarball or OCI layout directory, keyed by image name."""
+        images = {}
+        with _ImageSource(image_path) as source:
+            for image_name, layers in source.images():
+                self.installed = {}
+                for layer in layers:
+                    with source.open(layer) as layer_file:
+                        self.apply_layer(layer_file)
+                images[image_name] = sorted(self.installed.values(), key=lambda dist: dist.name.lower())
+        return images
+    
+    def apply_layer(self, layer_file: IO[bytes]) -> None:
+        """Streams one layer tarball (plain or compressed) on top of the current state."""
+        added: Dict[str, InstalledDistribution] = {}
+        # (path, opaque) of each whiteout
+        removed: List[Tuple[str, bool]] = []
+        
+        with tarfile.open(fileobj=layer_file, mode="r|*") as layer:
+            for member in layer:
+                path = _normalize(member.name)
+                directory, _, file_name = path.rpartition("/")
+                
+                if file_name.startswith(WHITEOUT_PREFIX):
+                    if file_name == OPAQUE_WHITEOUT:
+                        removed.append((directory, True))
+                    else:
+                        removed.append((posixpath.join(directory, file_name[len(WHITEOUT_PREFIX):]), False))
+                    continue
+                
+                if not member.isfile() or not is_metadata_path(path):
+                    continue
+                
+                stream = layer.extractfile(member)
+                if stream is None:
+                    continue
+                name, version, requires = read_metadata_headers(
+                    line.decode("utf-8", errors="replace") for line in iter(stream.readline, b"")
+                )
+                if name:
+                    added[directory] = InstalledDistribution(name, version, tuple(requires))
+        
+        # Whiteouts only hide lower layers, entries of this layer stay
+        for target, opaque in removed:
+            self._remove(target, opaque)
+        self.installed.update(added)
+        self.layers_scanned += 1
+    
+    def _remove(self, target: str, opaque: bool) -> None:
+        """Applies a whiteout to the distributions of lower layers.
+        
+        An opaque whiteout hides everything below its directory ("" is the
+        image root). Any other whiteout hides the path and everything below
+        it; inside a dist-info directory only a whited-out METADATA (or
+        PKG-INFO) hides the distribution, RECORD and the like do not.
+        """
+        for directory in list(self.installed):
+            if opaque:
+                hidden = not target or directory.startswith(target + "/")
+            else:
+                hidden = (directory == target or directory.startswith(target + "/")
+                          or (is_metadata_path(target) and target.rpartition("/")[0] == directory))
+            if hidden:
+                del self.installed[directory]
+
+
+class _ImageSource:
+    """Gives access to manifests and layer blobs of a saved image.
+    
+    Accepts a `docker save` tarball (manifest.json), an OCI layout tarball
+    (index.json) or either one already unpacked into a directory. The
+    outer tarball is indexed once and each layer is read through it.
+    """
+    
+    def __init__(self, image_path: Path):
+        self.image_path = image_path
+        self.archive: Optional[tarfile.TarFile] = None
+        self.members: Dict[str, tarfile.TarInfo] = {}
+    
+    def __enter__(self) -> "_ImageSource":
+        if not self.image_path.is_dir():
+            # Reads member headers only, layer data is skipped until opened
+            self.archive = tarfile.open(self.image_path, mode="r:*")
+            self.members = {_normalize(member.name): member for member in self.archive.getmembers()}
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        if self.archive is not None:
+            self.archive.close()
+    
+    def open(self, name: str) -> IO[bytes]:
+        """Opens a file of the image by its path inside the layout."""
+        if self.archive is None:
+            return open(self.image_path / name, 'rb')
+        member = self.members.get(_normalize(name))
+        stream = self.archive.extractfile(member) if member is not None else None
+        if stream is None:
+            raise ValueError(f"{name} is not a file in {self.image_path.name}")
+        return stream
+    
+    def exists(self, name: str) -> bool:
+        """Checks if the layout contains a file."""
+        if self.archive is None:
+            return (self.image_path / name).is_file()
+        return name in self.members
+    
+    def read_json(self, name: str):
+        """Reads a JSON document (manifest, index, blob) of the layout."""
+        with self.open(name) as f:
+            return json.load(f)
+    
+    def images(self) -> List[Tuple[str, List[str]]]:
+        """Returns (image name, layer paths bottom to top) for each image."""
+        if self.exists("manifest.json"):
+            images = []
+            for position, manifest in enumerate(self.read_json("manifest.json")):
+                tags = manifest.get("RepoTags") or [f"image-{position}"]
+                images.append((tags[0], manifest.get("Layers", [])))
+            return images
+        
+        if self.exists("index.json"):
+            images = []
+            for position, descriptor in enumerate(self.read_json("index.json").get("manifests", [])):
+                manifest = self._oci_manifest(descriptor)
+                annotations = descriptor.get("annotations") or {}
+                name = annotations.get("org.opencontainers.image.ref.name", f"image-{position}")
+                images.append((name, [_blob_path(layer["digest"]) for layer in manifest.get("layers", [])]))
+            return images
+        
+        raise ValueError(f"{self.image_path.name} has neither manifest.json nor index.json")
+    
+    def _oci_manifest(self, descriptor: dict) -> dict:
+        """Follows an image index down to the first image manifest."""
+        manifest = self.read_json(_blob_path(descriptor["digest"]))
+        while "manifests" in manifest and manifest["manifests"]:
+            manifest = self.read_json(_blob_path(manifest["manifests"][0]["digest"]))
+        return manifest
+
+
+def _blob_path(digest: str) -> str:
+    algorithm, _, value = digest.partition(":")
+    return f"blobs/{algorithm}/{value}"
+
+
+def _normalize(path: str) -> str:
+    """Strips "./" and "/" prefixes tar writers put on member names."""
+    while path.startswith(("./", "/")):
+        path = path[1:] if path[0] == "/" else path[2:]
+    return path.rstrip("/")
+
+
+def scan_image(image_path: Path) -> Dict[str, List[InstalledDistribution]]:
+    """Lists installed Python distributions of every image in a saved image."""
+    return ImageScanner().scan(image_path)
@@ -0,0 +1,97 @@
+"""
+Event-driven job timer: one thread sleeps exactly until the next job is due.
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class Job:
+    """A callback due at a point on the scheduler's clock."""
+    due: float
+    seq: int
+    name: str = field(compare=False)
+    callback: Callable[[], Any] = field(compare=False, repr=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class JobScheduler:
+    """Runs callbacks at their due times on the thread calling run().
+    
+    Jobs are kept in a heap ordered by due time. The loop waits on a
+    condition until the earliest job is due, so an idle scheduler never
+    wakes up, and schedule() and stop() notify it to re-check at once.
+    Jobs run one at a time; a failing job is logged and the loop goes on.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.current: Optional[Job] = None
+        self._heap: List[Job] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+    
+    def schedule(self, delay: float, callback: Callable[[], Any], name: str = "job") -> Job:
+        """Schedules callback to run after delay seconds."""
+        with self._condition:
+            job = Job(self.clock() + max(0.0, delay), next(self._counter), name, callback)
+            heapq.heappush(self._heap, job)
+            self._condition.notify()
+        return job
+    
+    def cancel(self, job: Job) -> None:
+        """Cancels a pending job, it is dropped when it comes up."""
+        with self._condition:
+            job.cancelled = True
+    
+    def pending(self) -> List[Tuple[str, float]]:
+        """Returns (name, seconds until due) of pending jobs, soonest first."""
+        with self._condition:
+            now = self.clock()
+            return [(job.name, job.due - now) for job in sorted(self._heap) if not job.cancelled]
+    
+    def stop(self) -> None:
+        """Makes run() return once the job running now, if any, is done."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+    
+    def run(self) -> None:
+        """Runs jobs as they come due until stop() is called."""
+        while True:
+            with self._condition:
+                job = self._wait_for_job()
+                if job is None:
+                    return
+                self.current = job
+            
+            try:
+                job.callback()
+            except Exception:
+                logger.exception(f"Job {job.name} failed")
+            finally:
+                with self._condition:
+                    self.current = None
+    
+    def _wait_for_job(self) -> Optional[Job]:
+        """Waits until a job is due and pops it; None once stopped. Holds the condition."""
+        while not self._stopped:
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+            
+            timeout = None
+            if self._heap:
+                timeout = self._heap[0].due - self.clock()
+                if timeout <= 0:
+                    return heapq.heappop(self._heap)
+            self._condition.wait(timeout)
+        return None
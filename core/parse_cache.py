@@ -0,0 +1,135 @@
+"""
+Persistent cache of parsed dependency manifests.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+from .cache_files import LRUDirectoryCache, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever parser output for the same input changes
+PARSE_CACHE_VERSION = 3
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ParseProbe(NamedTuple):
+    """Result of a cache lookup.
+    
+    On a miss, content holds the text that was hashed, so the caller
+    parses exactly what the cache entry will be keyed by.
+    """
+    dependencies: Optional[List[Tuple[str, str]]]
+    content: Optional[str]
+    digest: str
+    size: int
+    mtime_ns: int
+
+
+class ParseCache(LRUDirectoryCache):
+    """Caches parsed (name, spec) tuples per manifest.
+    
+    A per-path index maps (size, mtime_ns) to a content hash, so unchanged
+    files are answered from a stat() call. When the stat changes, the file
+    is hashed and entries keyed by content are reused (e.g. after a fresh
+    checkout, or for identical files in other repositories). All files are
+    written atomically, so parallel CI jobs can share one directory. Once
+    the directory grows past max_bytes the least recently used files are
+    evicted.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.index_dir = self.cache_dir / "index"
+        self.entries_dir = self.cache_dir / "entries"
+        super().__init__([self.index_dir, self.entries_dir], max_bytes)
+        
+        self.hits = 0
+        self.content_hits = 0
+        self.misses = 0
+    
+    def lookup(self, file_path: Path, kind: str) -> ParseProbe:
+        """Looks up parsed dependencies of a manifest.
+        
+        Raises UnicodeDecodeError on a miss for a file that is not UTF-8.
+        """
+        stat = file_path.stat()
+        index = self._read_json(self._index_path(file_path))
+        
+        if index and index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+            dependencies = self._read_entry(index["digest"])
+            if dependencies is not None:
+                self._count("hits")
+                return ParseProbe(dependencies, None, index["digest"], stat.st_size, stat.st_mtime_ns)
+        
+        raw = file_path.read_bytes()
+        digest = self._digest(kind, raw)
+        dependencies = self._read_entry(digest)
+        
+        if dependencies is not None:
+            self._count("content_hits")
+            self._write_index(file_path, digest, stat.st_size, stat.st_mtime_ns)
+            return ParseProbe(dependencies, None, digest, stat.st_size, stat.st_mtime_ns)
+        
+        self._count("misses")
+        return ParseProbe(None, raw.decode("utf-8"), digest, stat.st_size, stat.st_mtime_ns)
+    
+    def store(self, file_path: Path, probe: ParseProbe, dependencies: List[Tuple[str, str]]) -> None:
+        """Stores dependencies parsed from probe.content."""
+        written = self._write_json(self.entries_dir / f"{probe.digest}.json", [list(dep) for dep in dependencies])
+        written += self._write_index(file_path, probe.digest, probe.size, probe.mtime_ns)
+        self._record_write(written)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Returns hit/miss counters."""
+        total = self.hits + self.content_hits + self.misses
+        return {
+            "hits": self.hits,
+            "content_hits": self.content_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.content_hits) / total if total else 0.0
+        }
+    
+    def _digest(self, kind: str, raw: bytes) -> str:
+        hasher = hashlib.sha256(f"{PARSE_CACHE_VERSION}:{kind}:".encode("utf-8"))
+        hasher.update(raw)
+        return hasher.hexdigest()
+    
+    def _index_path(self, file_path: Path) -> Path:
+        key = hashlib.sha256(str(file_path.resolve()).encode("utf-8")).hexdigest()
+        return self.index_dir / f"{key}.json"
+    
+    def _read_entry(self, digest: str) -> Optional[List[Tuple[str, str]]]:
+        entry_path = self.entries_dir / f"{digest}.json"
+        entry = self._read_json(entry_path)
+        if not isinstance(entry, list):
+            return None
+        self._touch(entry_path)
+        return [(name, spec) for name, spec in entry]
+    
+    def _write_index(self, file_path: Path, digest: str, size: int, mtime_ns: int) -> int:
+        return self._write_json(self._index_path(file_path), {
+            "digest": digest,
+            "size": size,
+            "mtime_ns": mtime_ns
+        })
+    
+    def _read_json(self, path: Path) -> Any:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_json(self, path: Path, data: Any) -> int:
+        """Writes a JSON file; returns its size, 0 if it could not be written."""
+        try:
+            return atomic_write(path, json.dumps(data).encode("utf-8"))
+        except OSError as e:
+            logger.debug(f"Could not write parse cache entry {path}: {e}")
+            return 0
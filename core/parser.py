@@ -2,96 +2,299 @@
 Parser for different Python project dependency files.
 """
 
+import os
 import re
 import ast
+import json
+import fnmatch
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Optional
 import yaml
 import toml
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+try:
+    # Python 3.11+; much faster than the toml package on big lockfiles
+    import tomllib as _fast_toml
+except ImportError:
+    try:
+        import tomli as _fast_toml
+    except ImportError:
+        _fast_toml = None
+
+from .parse_cache import ParseCache, ParseProbe
+
+
+# Directories that never contain project manifests worth checking
+PRUNED_DIRS = {
+    ".git", ".hg", ".svn", ".venv", "venv", "node_modules",
+    "__pycache__", ".tox", ".nox", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".eggs", "build", "dist", "site-packages",
+}
+
+# Below this number of manifests a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+_worker_parser = None
+
+# Multiprocessing context of worker pools, None for the platform default
+_pool_context = None
+
+# Fast path for the overwhelmingly common "name<op>version" form
+SIMPLE_REQUIREMENT = re.compile(
+    r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(===|==|~=|!=|<=|>=|<|>)\s*([A-Za-z0-9][A-Za-z0-9.*+!_-]*)$'
+)
+
+# Inline comment: '#' at line start or preceded by whitespace (keeps URL fragments)
+INLINE_COMMENT = re.compile(r'(^|\s)#.*$')
+
+# Per-requirement options such as --hash emitted by pip-compile
+REQUIREMENT_OPTIONS = re.compile(r'\s--?[A-Za-z].*$')
+
+# Manifests checked at a project root, before its lockfiles
+PROJECT_MANIFESTS = ("requirements.txt", "requirements-dev.txt", "setup.py", "pyproject.toml")
+
+# TOML lockfiles with a [[package]] array of tables (poetry, pdm, uv)
+TOML_LOCKFILES = ("poetry.lock", "pdm.lock", "uv.lock")
+
+@lru_cache(maxsize=65536)
+def parse_requirement(requirement: str) -> Optional[Tuple[str, str]]:
+    """Parses a PEP 508 requirement string into (name, specifier).
+    
+    Extras, environment markers and URLs are accepted and dropped from the
+    result. Returns None for strings that are not valid requirements.
+    Memoized, since the same strings repeat across many manifests.
+    """
+    requirement = requirement.strip()
+    match = SIMPLE_REQUIREMENT.match(requirement)
+    if match:
+        return match.group(1).lower(), match.group(2) + match.group(3)
+    
+    try:
+        parsed = Requirement(requirement)
+    except InvalidRequirement:
+        return None
+    
+    # Keep lower bounds / pins first, extract_version reads the first one
+    specifiers = sorted(
+        (str(spec) for spec in parsed.specifier),
+        key=lambda spec: (not spec.startswith(("==", "~=", ">=")), spec)
+    )
+    return parsed.name.lower(), ",".join(specifiers)
+
+
+class LockedPackage(NamedTuple):
+    """One [[package]] entry of a TOML lockfile."""
+    name: str
+    version: str
+    dependencies: Tuple[str, ...]
+    local: bool
+
+
+def load_toml(content: str) -> Dict:
+    """Parses a TOML document with tomllib/tomli when available, else the toml package."""
+    if _fast_toml is not None:
+        return _fast_toml.loads(content)
+    return toml.loads(content)
+
+
+def iter_lock_packages(content: str) -> Iterator[LockedPackage]:
+    """Yields each [[package]] of a poetry, pdm or uv lockfile.
+    
+    Dependencies come from poetry's [package.dependencies] table (its
+    keys), pdm's array of requirement strings or uv's array of
+    { name = ... } tables. The project's own editable/virtual entry (uv)
+    is yielded with local=True. Raises ValueError (or toml's decode error)
+    on malformed TOML.
+    """
+    packages = load_toml(content).get("package") or []
+    if not isinstance(packages, list):
+        raise ValueError("[package] must be an array of tables")
+    
+    for package in packages:
+        if not isinstance(package, dict) or not package.get("name"):
+            continue
+        source = package.get("source")
+        local = isinstance(source, dict) and ("editable" in source or "virtual" in source)
+        yield LockedPackage(
+            str(package["name"]), str(package.get("version") or ""),
+            tuple(_lock_dependency_names(package.get("dependencies"))), local
+        )
+
+
+def _lock_dependency_names(dependencies) -> List[str]:
+    """Extracts canonical dependency names from a [[package]]'s dependencies value."""
+    if isinstance(dependencies, dict):
+        # poetry: [package.dependencies] foo = ">=1.0"
+        return [canonicalize_name(name) for name in dependencies]
+    
+    names = []
+    for dependency in dependencies or []:
+        if isinstance(dependency, dict):
+            # uv: { name = "foo", marker = "..." }
+            if dependency.get("name"):
+                names.append(canonicalize_name(str(dependency["name"])))
+        elif isinstance(dependency, str):
+            # pdm: "foo[extra]>=1.0; marker"
+            parsed = parse_requirement(dependency)
+            if parsed:
+                names.append(canonicalize_name(parsed[0]))
+    return names
+
+
+def _worker() -> "DependencyParser":
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = DependencyParser()
+    return _worker_parser
+
+
+def _parse_manifest(file_path: str) -> List[Tuple[str, str]]:
+    """Parses one manifest inside a worker process."""
+    return _worker().parse_file(Path(file_path))
+
+
+def _parse_manifest_content(job: Tuple[str, str]) -> List[Tuple[str, str]]:
+    """Parses already read (file name, content) inside a worker process."""
+    return _worker().parse_content(*job)
+
+
+def set_pool_start_method(method: Optional[str]) -> None:
+    """Sets how worker pools start their processes ("spawn", "fork", None for the default).
+    
+    Long-running threaded processes such as the daemon use "spawn": forking
+    copies locks held by other threads into the workers.
+    """
+    global _pool_context
+    _pool_context = multiprocessing.get_context(method) if method else None
+
+
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    """Creates a worker pool with the configured start method."""
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context)
+
+
+def _map_chunk(function, chunk: List) -> List:
+    return [function(arg) for arg in chunk]
+
+
+def _pool_map(function, args: List, jobs: int) -> Iterator:
+    """Maps function over args on a process pool, yielding results in order."""
+    chunksize = max(1, len(args) // (jobs * 4))
+    executor = process_pool(jobs)
+    futures = [
+        executor.submit(_map_chunk, function, args[start:start + chunksize])
+        for start in range(0, len(args), chunksize)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # A consumer that stops early does not wait for the rest to be parsed
+        # (shutdown(cancel_futures=True) needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
 
 
 class DependencyParser:
     """Parser for Python project dependency files."""
     
-    def __init__(self):
-        self.requirement_pattern = re.compile(
-            r'^([a-zA-Z0-9._-]+)\s*([<>=!~]+)\s*([0-9.]+)$'
-        )
+    def __init__(self, cache: Optional[ParseCache] = None):
+        self.cache = cache
     
     def parse_requirements_txt(self, file_path: Path) -> List[Tuple[str, str]]:
         """Parses requirements.txt file."""
+        if not file_path.exists():
+            return []
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"Error parsing {file_path.name}: {e}")
+            return []
+        
+        return self.parse_requirements_content(content)
+    
+    def parse_requirements_content(self, content: str) -> List[Tuple[str, str]]:
+        """Parses requirements.txt content."""
         dependencies = []
+        pending = ""
         
-        if not file_path.exists():
-            return dependencies
+        for line in content.splitlines():
+            # Join backslash continuations (pip-compile puts hashes on them)
+            if line.endswith('\\'):
+                pending += line[:-1] + " "
+                continue
+            line = (pending + line).strip()
+            pending = ""
             
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Remove comments at the end of the line
-                if '#' in line:
-                    line = line.split('#')[0].strip()
-                
-                # Parse dependency
-                match = self.requirement_pattern.match(line)
-                if match:
-                    package_name = match.group(1).lower()
-                    version_spec = match.group(2) + match.group(3)
-                    dependencies.append((package_name, version_spec))
-                else:
-                    # Simple dependency without version
-                    package_name = line.lower()
-                    dependencies.append((package_name, ""))
+            # Skip comments, empty lines and pip options (-r, -e, --index-url, ...)
+            if not line or line.startswith(('#', '-')):
+                continue
+            
+            # Remove comments and per-requirement options at the end of the line
+            if '#' in line:
+                line = INLINE_COMMENT.sub('', line).strip()
+            if '-' in line:
+                line = REQUIREMENT_OPTIONS.sub('', line).strip()
+            
+            # Parse dependency
+            dependency = parse_requirement(line)
+            if dependency:
+                dependencies.append(dependency)
         
         return dependencies
     
     def parse_setup_py(self, file_path: Path) -> List[Tuple[str, str]]:
         """Parses setup.py file."""
-        dependencies = []
-        
         if not file_path.exists():
-            return dependencies
-            
+            return []
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
+        except Exception as e:
+            print(f"Error parsing setup.py: {e}")
+            return []
+        
+        return self.parse_setup_content(content)
+    
+    def parse_setup_content(self, content: str) -> List[Tuple[str, str]]:
+        """Parses setup.py content."""
+        dependencies = []
+        
+        try:
             # Parse AST for finding install_requires
             tree = ast.parse(content)
             
             for node in ast.walk(tree):
-                if isinstance(node, ast.Call):
-                    # Find setup() call
-                    if isinstance(node.func, ast.Name) and node.func.id == 'setup':
-                        for keyword in node.keywords:
-                            if keyword.arg == 'install_requires':
-                                if isinstance(keyword.value, ast.List):
-                                    for item in keyword.value.elts:
-                                        if isinstance(item, ast.Constant):
-                                            dep_str = item.value
-                                            match = self.requirement_pattern.match(dep_str)
-                                            if match:
-                                                package_name = match.group(1).lower()
-                                                version_spec = match.group(2) + match.group(3)
-                                                dependencies.append((package_name, version_spec))
-                                            else:
-                                                package_name = dep_str.lower()
-                                                dependencies.append((package_name, ""))
-                                        elif isinstance(item, ast.Str):  # For Python < 3.8
-                                            dep_str = item.s
-                                            match = self.requirement_pattern.match(dep_str)
-                                            if match:
-                                                package_name = match.group(1).lower()
-                                                version_spec = match.group(2) + match.group(3)
-                                                dependencies.append((package_name, version_spec))
-                                            else:
-                                                package_name = dep_str.lower()
-                                                dependencies.append((package_name, ""))
+                if not isinstance(node, ast.Call):
+                    continue
+                
+                # Find setup() or setuptools.setup() call
+                func = node.func
+                func_name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+                if func_name != 'setup':
+                    continue
+                
+                for keyword in node.keywords:
+                    if keyword.arg != 'install_requires':
+                        continue
+                    if isinstance(keyword.value, (ast.List, ast.Tuple)):
+                        items = keyword.value.elts
+                    else:
+                        items = [keyword.value]
+                    
+                    for item in items:
+                        if isinstance(item, ast.Constant) and isinstance(item.value, str):
+                            # A single string may hold several newline-separated requirements
+                            dependencies.extend(self.parse_requirements_content(item.value))
         except Exception as e:
             print(f"Error parsing setup.py: {e}")
         
@@ -99,33 +302,41 @@ class DependencyParser:
     
     def parse_pyproject_toml(self, file_path: Path) -> List[Tuple[str, str]]:
         """Parses pyproject.toml file."""
-        dependencies = []
-        
         if not file_path.exists():
-            return dependencies
-            
+            return []
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
+        except Exception as e:
+            print(f"Error parsing pyproject.toml: {e}")
+            return []
+        
+        return self.parse_pyproject_content(content)
+    
+    def parse_pyproject_content(self, content: str) -> List[Tuple[str, str]]:
+        """Parses pyproject.toml content."""
+        dependencies = []
+        
+        try:
             data = toml.loads(content)
             
             # Check [project.dependencies]
             if 'project' in data and 'dependencies' in data['project']:
                 for dep in data['project']['dependencies']:
-                    match = self.requirement_pattern.match(dep)
-                    if match:
-                        package_name = match.group(1).lower()
-                        version_spec = match.group(2) + match.group(3)
-                        dependencies.append((package_name, version_spec))
-                    else:
-                        package_name = dep.lower()
-                        dependencies.append((package_name, ""))
+                    dependency = parse_requirement(dep)
+                    if dependency:
+                        dependencies.append(dependency)
             
             # Check [tool.poetry.dependencies]
             if 'tool' in data and 'poetry' in data['tool'] and 'dependencies' in data['tool']['poetry']:
                 for package_name, version_info in data['tool']['poetry']['dependencies'].items():
-                    if isinstance(version_info, str):
+                    # Poetry lists the interpreter constraint among dependencies
+                    if package_name.lower() == "python":
+                        continue
+                    if isinstance(version_info, dict):
+                        version_info = version_info.get("version", "")
+                    if isinstance(version_info, str) and version_info != "*":
                         dependencies.append((package_name.lower(), version_info))
                     else:
                         dependencies.append((package_name.lower(), ""))
@@ -135,28 +346,214 @@ class DependencyParser:
         
         return dependencies
     
+    def parse_lockfile(self, file_path: Path) -> List[Tuple[str, str]]:
+        """Parses poetry.lock, pdm.lock or uv.lock file."""
+        if not file_path.exists():
+            return []
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return self._lock_dependencies(f.read())
+        except Exception as e:
+            print(f"Error parsing {file_path.name}: {e}")
+            return []
+    
+    def parse_lockfile_content(self, content: str) -> List[Tuple[str, str]]:
+        """Parses poetry.lock, pdm.lock or uv.lock content."""
+        try:
+            return self._lock_dependencies(content)
+        except Exception as e:
+            print(f"Error parsing lockfile: {e}")
+            return []
+    
+    def _lock_dependencies(self, content: str) -> List[Tuple[str, str]]:
+        """Turns locked packages into exact (name, "==version") pins."""
+        return [
+            (package.name.lower(), f"=={package.version}" if package.version else "")
+            for package in iter_lock_packages(content)
+            if not package.local
+        ]
+    
+    def parse_pipfile_lock(self, file_path: Path) -> List[Tuple[str, str]]:
+        """Parses Pipfile.lock file."""
+        if not file_path.exists():
+            return []
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return self._pipfile_lock_dependencies(json.load(f))
+        except Exception as e:
+            print(f"Error parsing Pipfile.lock: {e}")
+            return []
+    
+    def parse_pipfile_lock_content(self, content: str) -> List[Tuple[str, str]]:
+        """Parses Pipfile.lock content."""
+        try:
+            return self._pipfile_lock_dependencies(json.loads(content))
+        except Exception as e:
+            print(f"Error parsing Pipfile.lock: {e}")
+            return []
+    
+    def _pipfile_lock_dependencies(self, data: Dict) -> List[Tuple[str, str]]:
+        """Extracts pins from the "default" and "develop" sections."""
+        dependencies = []
+        for section in ("default", "develop"):
+            for package_name, package_info in (data.get(section) or {}).items():
+                # VCS and path entries carry no version
+                version_spec = package_info.get("version", "") if isinstance(package_info, dict) else ""
+                dependencies.append((package_name.lower(), version_spec))
+        return dependencies
+    
     def parse_all_files(self, project_path: Path) -> Dict[str, List[Tuple[str, str]]]:
         """Parses all dependency files in the project."""
-        results = {}
+        return dict(self.iter_all_files(project_path))
+    
+    def iter_all_files(self, project_path: Path) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+        """Yields (file name, dependencies) for each project manifest as it is parsed."""
+        for file_path in self.project_manifest_files(project_path):
+            yield file_path.name, self.parse_file(file_path)
+    
+    def project_manifest_files(self, project_path: Path) -> List[Path]:
+        """Returns manifests present at the project root, in checking order."""
+        # requirements.txt, requirements-dev.txt, setup.py, pyproject.toml, then
+        # lockfiles, which hold the exact versions of the whole resolved set
+        return [
+            project_path / file_name
+            for file_name in PROJECT_MANIFESTS + TOML_LOCKFILES + ("Pipfile.lock",)
+            if (project_path / file_name).exists()
+        ]
+    
+    def manifest_kind(self, file_name: str) -> Optional[str]:
+        """Returns parser kind for a manifest file name, or None if unsupported."""
+        if file_name == "setup.py":
+            return "setup"
+        if file_name == "pyproject.toml":
+            return "pyproject"
+        if file_name in TOML_LOCKFILES:
+            return "lock"
+        if file_name == "Pipfile.lock":
+            return "pipfile-lock"
+        if fnmatch.fnmatch(file_name, "requirements*.txt"):
+            return "requirements"
+        return None
+    
+    def is_manifest(self, file_name: str) -> bool:
+        """Checks if file name is a supported dependency manifest."""
+        return self.manifest_kind(file_name) is not None
+    
+    def parse_content(self, file_name: str, content: str) -> List[Tuple[str, str]]:
+        """Parses manifest content, choosing the parser by file name."""
+        kind = self.manifest_kind(file_name)
+        if kind == "setup":
+            return self.parse_setup_content(content)
+        if kind == "pyproject":
+            return self.parse_pyproject_content(content)
+        if kind == "lock":
+            return self.parse_lockfile_content(content)
+        if kind == "pipfile-lock":
+            return self.parse_pipfile_lock_content(content)
+        return self.parse_requirements_content(content)
+    
+    def parse_file(self, file_path: Path) -> List[Tuple[str, str]]:
+        """Parses a single manifest, going through the parse cache if enabled."""
+        if self.cache is None:
+            kind = self.manifest_kind(file_path.name)
+            if kind == "setup":
+                return self.parse_setup_py(file_path)
+            if kind == "pyproject":
+                return self.parse_pyproject_toml(file_path)
+            if kind == "lock":
+                return self.parse_lockfile(file_path)
+            if kind == "pipfile-lock":
+                return self.parse_pipfile_lock(file_path)
+            return self.parse_requirements_txt(file_path)
+        
+        probe = self._probe(file_path)
+        if probe is None:
+            return []
+        if probe.dependencies is not None:
+            return probe.dependencies
+        
+        dependencies = self.parse_content(file_path.name, probe.content)
+        self.cache.store(file_path, probe, dependencies)
+        return dependencies
+    
+    def find_manifest_files(self, root_path: Path) -> List[Path]:
+        """Recursively finds dependency manifests, pruning vendored directories."""
+        manifests = []
+        stack = [str(root_path)]
         
-        # requirements.txt
-        req_file = project_path / "requirements.txt"
-        if req_file.exists():
-            results["requirements.txt"] = self.parse_requirements_txt(req_file)
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in PRUNED_DIRS and not entry.name.endswith(".egg-info"):
+                                    stack.append(entry.path)
+                            elif entry.is_file() and self.is_manifest(entry.name):
+                                manifests.append(Path(entry.path))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
         
-        # requirements-dev.txt
-        req_dev_file = project_path / "requirements-dev.txt"
-        if req_dev_file.exists():
-            results["requirements-dev.txt"] = self.parse_requirements_txt(req_dev_file)
+        manifests.sort()
+        return manifests
+    
+    def parse_tree(self, root_path: Path, jobs: Optional[int] = None) -> Dict[str, List[Tuple[str, str]]]:
+        """Parses every manifest below root_path on a worker pool.
+        
+        Results are keyed by the manifest path relative to root_path.
+        """
+        return dict(self.iter_tree(root_path, jobs))
+    
+    def iter_tree(self, root_path: Path, jobs: Optional[int] = None) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+        """Yields (relative path, dependencies) for every manifest below root_path.
+        
+        Manifests come in sorted order as soon as each one is parsed. Closing
+        the iterator early cancels the manifests the pool has not started.
+        """
+        manifests = self.find_manifest_files(root_path)
+        if jobs is None:
+            jobs = os.cpu_count() or 1
         
-        # setup.py
-        setup_file = project_path / "setup.py"
-        if setup_file.exists():
-            results["setup.py"] = self.parse_setup_py(setup_file)
+        if self.cache is not None:
+            parsed = self._parse_cached(manifests, jobs)
+        elif jobs <= 1 or len(manifests) < PARALLEL_THRESHOLD:
+            parsed = (self.parse_file(path) for path in manifests)
+        else:
+            parsed = _pool_map(_parse_manifest, [str(path) for path in manifests], jobs)
+        
+        for path, dependencies in zip(manifests, parsed):
+            yield path.relative_to(root_path).as_posix(), dependencies
+    
+    def _probe(self, file_path: Path) -> Optional[ParseProbe]:
+        """Looks a manifest up in the parse cache; None if it cannot be read as UTF-8."""
+        try:
+            return self.cache.lookup(file_path, self.manifest_kind(file_path.name) or "requirements")
+        except UnicodeDecodeError as e:
+            print(f"Error parsing {file_path.name}: {e}")
+            return None
+    
+    def _parse_cached(self, manifests: List[Path], jobs: int) -> Iterator[List[Tuple[str, str]]]:
+        """Answers manifests from the parse cache and parses only the misses."""
+        probes = [self._probe(path) for path in manifests]
         
-        # pyproject.toml
-        pyproject_file = project_path / "pyproject.toml"
-        if pyproject_file.exists():
-            results["pyproject.toml"] = self.parse_pyproject_toml(pyproject_file)
+        jobs_args = [(path.name, probe.content) for path, probe in zip(manifests, probes)
+                     if probe is not None and probe.dependencies is None]
+        if jobs <= 1 or len(jobs_args) < PARALLEL_THRESHOLD:
+            results = (self.parse_content(*job) for job in jobs_args)
+        else:
+            results = _pool_map(_parse_manifest_content, jobs_args, jobs)
         
-        return results 
\ No newline at end of file
+        for path, probe in zip(manifests, probes):
+            if probe is None:
+                yield []
+            elif probe.dependencies is not None:
+                yield probe.dependencies
+            else:
+                dependencies = next(results)
+                self.cache.store(path, probe, dependencies)
+                yield dependencies
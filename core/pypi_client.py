@@ -0,0 +1,456 @@
+"""
+Shared PyPI metadata client: concurrent fetching, rate limiting and caching.
+"""
+
+import re
+import time
+import asyncio
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from packaging.utils import canonicalize_name
+import logging
+
+from .http_cache import HTTPCache
+from .async_http import AsyncHTTPClient
+
+logger = logging.getLogger(__name__)
+
+PYPI_JSON_URL = "https://pypi.org/pypi/{package}/json"
+
+# Status codes that mean "slow down and try again"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Words in summary/keywords that mark a project as deprecated
+DEPRECATED_INDICATORS = re.compile(
+    r'\b(deprecated|deprecation|discontinued|legacy|outdated|obsolete|no longer maintained'
+    r'|no longer supported|end of life|eol|sunset|archived|use alternative|moved to|replaced by)\b'
+)
+
+# The only "info" fields the deprecation heuristic and database entries read
+INFO_FIELDS = ("name", "version", "summary", "keywords", "classifiers", "home_page", "project_url")
+
+_shared_clients: Dict[Path, "PyPIClient"] = {}
+_shared_lock = threading.Lock()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(30.0, 0.5 * (2 ** attempt)))
+
+
+def retry_after(response) -> Optional[float]:
+    """Parses a numeric Retry-After header of a response."""
+    value = response.headers.get("Retry-After")
+    try:
+        return min(60.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def is_deprecated_metadata(package_data: Dict[str, Any]) -> bool:
+    """Checks if PyPI JSON metadata marks a package as deprecated."""
+    info = package_data.get("info") or {}
+    summary = (info.get("summary") or "").lower()
+    keywords = info.get("keywords") or ""
+    if isinstance(keywords, list):
+        keywords = " ".join(keywords)
+    keywords = keywords.lower()
+    
+    if DEPRECATED_INDICATORS.search(summary) or DEPRECATED_INDICATORS.search(keywords):
+        return True
+    
+    for classifier in info.get("classifiers") or []:
+        classifier = classifier.lower()
+        if "deprecated" in classifier or "end of life" in classifier or "inactive" in classifier:
+            return True
+    
+    return False
+
+
+def slim_metadata(package_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps only the metadata fields the checker reads.
+    
+    Full documents list every release file and run to megabytes for big
+    projects; the in-memory LRU holds just these few fields.
+    """
+    info = package_data.get("info") or {}
+    return {"info": {field: info[field] for field in INFO_FIELDS if field in info}}
+
+
+def get_default_client(cache_dir: Optional[Path] = None, **kwargs) -> "PyPIClient":
+    """Returns the process-wide client for a cache directory.
+    
+    Everything running in one process (analyze-repository, update-db, the
+    scheduler) shares one connection pool, in-memory LRU and on-disk cache,
+    so a package's metadata is fetched at most once. Keyword arguments only
+    apply when the client is first created.
+    """
+    if cache_dir is None:
+        cache_dir = Path(__file__).parent.parent / "cache"
+    cache_dir = Path(cache_dir).resolve()
+    
+    with _shared_lock:
+        client = _shared_clients.get(cache_dir)
+        if client is None:
+            client = PyPIClient(cache=HTTPCache(cache_dir / "http"), **kwargs)
+            _shared_clients[cache_dir] = client
+        return client
+
+
+class TokenBucket:
+    """Thread-safe token bucket with adaptive (AIMD) rate.
+    
+    The rate is halved whenever the server pushes back and creeps back
+    up towards the configured rate after each successful request.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Blocks until a token is available."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+    
+    async def acquire_async(self) -> None:
+        """Waits on the event loop until a token is available."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+    
+    def _take(self) -> float:
+        """Takes a token, or returns how long to wait for the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+    
+    def slow_down(self) -> None:
+        """Halves the rate after a 429/5xx response."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+    
+    def recover(self) -> None:
+        """Increases the rate a little after a successful response."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class PyPIClient:
+    """Fetches package metadata from the PyPI JSON API on a bounded thread pool."""
+    
+    def __init__(self, timeout: int = 10, rate_limit: float = 0.1, max_workers: int = 8,
+                 max_retries: int = 3, cache: Optional[HTTPCache] = None, memory_size: int = 256):
+        """
+        Args:
+            timeout: Per-request timeout in seconds.
+            rate_limit: Minimum average interval between requests in seconds
+                (0.1 means 10 requests per second, 0 disables limiting).
+            max_workers: Number of concurrent requests and pooled connections.
+            max_retries: Retries for 429/5xx responses and connection errors.
+            cache: Optional persistent HTTP cache used for conditional requests.
+            memory_size: Number of packages' slimmed metadata kept in the in-memory LRU.
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._memory_lock = threading.Lock()
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(1.0 / rate_limit, capacity=self.max_workers) if rate_limit > 0 else None
+        
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'deprecated-checker/1.0'
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self.requests_made = 0
+        self._stats_lock = threading.Lock()
+    
+    def get_json(self, package: str) -> Optional[Dict[str, Any]]:
+        """Gets JSON metadata for a package, or None if it does not exist (404).
+        
+        Raises requests.RequestException when PyPI cannot be reached or
+        keeps failing; failures are never memoized.
+        
+        Only the "info" fields in INFO_FIELDS are kept. Results are memoized
+        in an LRU and concurrent calls for the same package are coalesced
+        into a single fetch.
+        """
+        key = canonicalize_name(package)
+        
+        with self._memory_lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            data = self._fetch_json(key)
+        except BaseException as e:
+            with self._memory_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        with self._memory_lock:
+            self._memory[key] = data
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(data)
+        return data
+    
+    def _fetch_json(self, package: str) -> Optional[Dict[str, Any]]:
+        """Fetches JSON metadata through the disk cache and rate limiter."""
+        url = PYPI_JSON_URL.format(package=package)
+        
+        if self.cache:
+            # Fresh entries cost neither a request nor a rate-limit token
+            cached = self.cache.lookup(url)
+            if cached is not None:
+                return slim_metadata(cached.json())
+        
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                self.bucket.acquire()
+            
+            try:
+                if self.cache:
+                    response = self.cache.get(self.session, url, timeout=self.timeout)
+                else:
+                    response = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.debug(f"Request for {package} failed ({e}), retrying")
+                time.sleep(backoff_delay(attempt))
+                continue
+            finally:
+                with self._stats_lock:
+                    self.requests_made += 1
+            
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                if self.bucket:
+                    self.bucket.slow_down()
+                delay = retry_after(response) or backoff_delay(attempt)
+                logger.debug(f"PyPI returned {response.status_code} for {package}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            if self.bucket:
+                self.bucket.recover()
+            
+            if response.status_code == 200:
+                return slim_metadata(response.json())
+            if response.status_code == 404:
+                return None
+            # Not a verdict: callers must not cache this as "not deprecated"
+            raise requests.HTTPError(f"PyPI returned {response.status_code} for {package}", response=response)
+    
+    def fetch_many(self, packages: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+        """Fetches metadata concurrently, yielding (package, data) as requests complete.
+        
+        Data is None only for packages that do not exist; packages that fail
+        after all retries are yielded with the exception instead.
+        """
+        packages = list(packages)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.get_json, package): package for package in packages}
+            for future in as_completed(futures):
+                package = futures[future]
+                try:
+                    yield package, future.result()
+                except Exception as e:
+                    logger.warning(f"Error checking {package}: {e}")
+                    yield package, e
+
+
+class AsyncPyPIClient:
+    """Fetches package metadata on the event loop, without a thread per request.
+    
+    Behaves like PyPIClient: same adaptive rate limit, retries, persistent
+    HTTP cache, in-memory LRU and coalescing of concurrent fetches of one
+    package. Cache files are read and written in the loop's executor. Use
+    one instance per event loop.
+    """
+    
+    def __init__(self, timeout: int = 10, rate_limit: float = 0.1, max_connections: int = 8,
+                 max_retries: int = 3, cache: Optional[HTTPCache] = None, memory_size: int = 256):
+        """
+        Args:
+            timeout: Per-request timeout in seconds.
+            rate_limit: Minimum average interval between requests in seconds
+                (0 disables limiting).
+            max_connections: Number of concurrent requests and pooled connections.
+            max_retries: Retries for 429/5xx responses, connection errors and timeouts.
+            cache: Optional persistent HTTP cache used for conditional requests.
+            memory_size: Number of packages' slimmed metadata kept in the in-memory LRU.
+        """
+        self.http = AsyncHTTPClient(max_connections, timeout)
+        self.cache = cache
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self.max_connections = self.http.max_connections
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(1.0 / rate_limit, capacity=self.max_connections) if rate_limit > 0 else None
+        
+        self.requests_made = 0
+    
+    async def __aenter__(self) -> "AsyncPyPIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        """Closes pooled connections."""
+        await self.http.close()
+    
+    async def get_json(self, package: str) -> Optional[Dict[str, Any]]:
+        """Gets JSON metadata for a package, or None if it does not exist (404).
+        
+        Raises ConnectionError or asyncio.TimeoutError when PyPI cannot be
+        reached or keeps failing; failures are never memoized.
+        
+        Only the "info" fields in INFO_FIELDS are kept. Concurrent calls for
+        one package share a single fetch, which is cancelled only once every
+        caller waiting for it is cancelled.
+        """
+        key = canonicalize_name(package)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        
+        fetch = self._inflight.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_json(key))
+            self._inflight[key] = fetch
+            fetch.add_done_callback(lambda done: self._fetched(key, done))
+        
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(fetch)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not fetch.done():
+                    fetch.cancel()
+    
+    def _fetched(self, key: str, fetch: asyncio.Future) -> None:
+        """Memoizes a finished fetch."""
+        self._inflight.pop(key, None)
+        if fetch.cancelled() or fetch.exception() is not None:
+            return
+        self._memory[key] = fetch.result()
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    async def _fetch_json(self, package: str) -> Optional[Dict[str, Any]]:
+        """Fetches JSON metadata through the disk cache and rate limiter."""
+        url = PYPI_JSON_URL.format(package=package)
+        loop = asyncio.get_running_loop()
+        
+        headers: Dict[str, str] = {}
+        if self.cache:
+            # Fresh entries cost neither a request nor a rate-limit token
+            cached, headers = await loop.run_in_executor(None, self.cache.prepare, url)
+            if cached is not None:
+                return await loop.run_in_executor(None, lambda: slim_metadata(cached.json()))
+        
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                await self.bucket.acquire_async()
+            
+            try:
+                response = await self.http.get(url, headers)
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.debug(f"Request for {package} failed ({e!r}), retrying")
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            finally:
+                self.requests_made += 1
+            
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                if self.bucket:
+                    self.bucket.slow_down()
+                delay = retry_after(response) or backoff_delay(attempt)
+                logger.debug(f"PyPI returned {response.status_code} for {package}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if self.bucket:
+                self.bucket.recover()
+            
+            if self.cache:
+                response = await loop.run_in_executor(None, self.cache.complete, url, response)
+            if response.status_code == 200:
+                # Documents of big projects run to megabytes
+                return await loop.run_in_executor(None, lambda: slim_metadata(response.json()))
+            if response.status_code == 404:
+                return None
+            raise ConnectionError(f"PyPI returned {response.status_code} for {package}")
+    
+    async def fetch_many(self, packages: Iterable[str]) -> AsyncIterator[Tuple[str, Any]]:
+        """Fetches metadata concurrently, yielding (package, data) as requests complete.
+        
+        Data is None only for packages that do not exist; packages that fail
+        after all retries are yielded with the exception instead. Leaving
+        the loop early cancels the fetches still running.
+        """
+        async def fetch(package: str) -> Tuple[str, Any]:
+            try:
+                return package, await self.get_json(package)
+            except Exception as e:
+                logger.warning(f"Error checking {package}: {e!r}")
+                return package, e
+        
+        tasks = [asyncio.ensure_future(fetch(package)) for package in packages]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,286 @@
+"""
+Incremental report writers (text, JSON, YAML, NDJSON).
+"""
+
+import abc
+import json
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, TextIO
+
+import yaml
+
+# Safe rows are kept in memory up to this size, then spilled to a temporary file
+SPOOL_MAX_SIZE = 1024 * 1024
+
+REPORT_FORMATS = ("text", "json", "yaml", "ndjson")
+
+
+def report_summary(result) -> Dict[str, Any]:
+    """Builds the "summary" section of a report from a CheckResult."""
+    return build_summary(result.total_deprecated, result.total_safe, result.files_checked, result.projects,
+                         result.errors)
+
+
+def build_summary(deprecated_count: int, safe_count: int, files_checked: List[str],
+                  projects: Dict[str, List[str]], errors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Builds the "summary" section of a report from its counts.
+    
+    Sources that could not be checked are listed under "errors", if any.
+    """
+    summary = {
+        "total_packages": deprecated_count + safe_count,
+        "deprecated_count": deprecated_count,
+        "safe_count": safe_count,
+        "files_checked": files_checked,
+        "projects": projects
+    }
+    if errors:
+        summary["errors"] = errors
+    return summary
+
+
+def deprecated_record(pkg) -> Dict[str, Any]:
+    """Turns a DeprecatedPackage into its report record."""
+    return {
+        "name": pkg.name,
+        "current_version": pkg.current_version,
+        "file_source": pkg.file_source,
+        "deprecated_since": pkg.deprecated_since,
+        "reason": pkg.reason,
+        "alternatives": pkg.alternatives,
+        "needs_update": pkg.needs_update,
+        "required_version": pkg.required_version,
+        "dependency_path": pkg.dependency_path
+    }
+
+
+class ReportWriter(abc.ABC):
+    """Writes a report to a stream one package at a time.
+    
+    Call begin(), then deprecated() / safe() in any order, then end().
+    Deprecated packages are written as they arrive; safe ones are spooled
+    (to disk once large) and copied after them, so memory does not grow
+    with the number of packages. The summary goes first when it is known
+    up front (begin(summary)), otherwise it is written by end().
+    """
+    
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.deprecated_count = 0
+        self.safe_count = 0
+        self._summary_written = False
+        self._safe_spool = tempfile.SpooledTemporaryFile(
+            max_size=SPOOL_MAX_SIZE, mode='w+', encoding='utf-8'
+        )
+    
+    def begin(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        """Starts the report."""
+        if summary is not None:
+            self._write_summary(summary)
+            self._summary_written = True
+    
+    def deprecated(self, pkg) -> None:
+        """Writes one deprecated package."""
+        self._write_deprecated(deprecated_record(pkg), self.deprecated_count)
+        self.deprecated_count += 1
+    
+    def safe(self, pkg: Dict[str, str]) -> None:
+        """Adds one safe package."""
+        self._write_safe(pkg, self.safe_count)
+        self.safe_count += 1
+    
+    def end(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        """Finishes the report and flushes the stream."""
+        self._finish_deprecated()
+        self._safe_spool.seek(0)
+        shutil.copyfileobj(self._safe_spool, self.stream)
+        self._safe_spool.close()
+        self._finish_safe()
+        if not self._summary_written and summary is not None:
+            self._write_summary(summary)
+        self._finish()
+        self.stream.flush()
+    
+    def write_result(self, result) -> None:
+        """Writes a complete CheckResult."""
+        summary = report_summary(result)
+        self.begin(summary if self.summary_first else None)
+        for pkg in result.deprecated_packages:
+            self.deprecated(pkg)
+        for pkg in result.safe_packages:
+            self.safe(pkg)
+        self.end(summary)
+    
+    # Whether write_result puts the summary before the packages
+    summary_first = True
+    
+    @abc.abstractmethod
+    def _write_summary(self, summary: Dict[str, Any]) -> None:
+        """Writes the summary section."""
+    
+    @abc.abstractmethod
+    def _write_deprecated(self, record: Dict[str, Any], index: int) -> None:
+        """Writes one deprecated package record to the stream."""
+    
+    @abc.abstractmethod
+    def _write_safe(self, pkg: Dict[str, str], index: int) -> None:
+        """Writes one safe package, usually to the spool."""
+    
+    def _finish_deprecated(self) -> None:
+        pass
+    
+    def _finish_safe(self) -> None:
+        pass
+    
+    def _finish(self) -> None:
+        pass
+
+
+class TextReportWriter(ReportWriter):
+    """Plain text report."""
+    
+    def begin(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        self.stream.write("Report on checking deprecated dependencies\n")
+        self.stream.write("=" * 50 + "\n")
+        super().begin(summary)
+    
+    def _write_summary(self, summary: Dict[str, Any]) -> None:
+        if self._summary_written or self.safe_count:
+            self.stream.write("\n")
+        if len(summary["projects"]) > 1:
+            self.stream.write(f"Checked projects: {len(summary['projects'])}\n")
+            self.stream.write(f"Checked files: {len(summary['files_checked'])}\n")
+        else:
+            self.stream.write(f"Checked files: {', '.join(summary['files_checked'])}\n")
+        self.stream.write(f"Total packages: {summary['total_packages']}\n")
+        self.stream.write(f"Deprecated: {summary['deprecated_count']}\n")
+        self.stream.write(f"Safe: {summary['safe_count']}\n")
+        if self.deprecated_count == 0 and self.safe_count == 0:
+            self.stream.write("\n")
+    
+    def _write_deprecated(self, record: Dict[str, Any], index: int) -> None:
+        lines = ["Found deprecated packages:"] if index == 0 else []
+        lines.append(f"  • {record['name']}=={record['current_version']} ({record['file_source']})")
+        if len(record["dependency_path"]) > 1:
+            lines.append(f"    Via: {' -> '.join(record['dependency_path'])}")
+        lines.append(f"    Reason: {record['reason']}")
+        if record["alternatives"]:
+            lines.append("    Alternatives:")
+            for alt in record["alternatives"]:
+                lines.append(f"      - {alt['name']}: {alt['reason']}")
+                if alt.get('migration_guide'):
+                    lines.append(f"        Guide: {alt['migration_guide']}")
+        self.stream.write("\n".join(lines) + "\n\n")
+    
+    def _write_safe(self, pkg: Dict[str, str], index: int) -> None:
+        if index == 0:
+            self._safe_spool.write("Safe packages:\n")
+        self._safe_spool.write(f"  • {pkg['name']}=={pkg['version']} ({pkg['file_source']})\n")
+    
+    def _finish_deprecated(self) -> None:
+        if self.deprecated_count == 0:
+            self.stream.write("No deprecated packages found!\n\n")
+
+
+class JSONReportWriter(ReportWriter):
+    """Indented JSON document, written item by item."""
+    
+    def begin(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        self.stream.write("{")
+        self._sections = 0
+        super().begin(summary)
+        self._open_section("deprecated_packages")
+    
+    def _open_section(self, key: str) -> None:
+        self.stream.write(("," if self._sections else "") + f"\n  {json.dumps(key)}: ")
+        self._sections += 1
+    
+    def _write_summary(self, summary: Dict[str, Any]) -> None:
+        self._open_section("summary")
+        self.stream.write(self._dumps(summary))
+    
+    def _write_deprecated(self, record: Dict[str, Any], index: int) -> None:
+        self.stream.write(("," if index else "[") + "\n    " + self._dumps(record, 4))
+    
+    def _write_safe(self, pkg: Dict[str, str], index: int) -> None:
+        self._safe_spool.write(("," if index else "") + "\n    " + self._dumps(pkg, 4))
+    
+    def _finish_deprecated(self) -> None:
+        self.stream.write("\n  ]" if self.deprecated_count else "[]")
+        self._open_section("safe_packages")
+        self.stream.write("[" if self.safe_count else "[]")
+    
+    def _finish_safe(self) -> None:
+        if self.safe_count:
+            self.stream.write("\n  ]")
+    
+    def _finish(self) -> None:
+        self.stream.write("\n}")
+    
+    @staticmethod
+    def _dumps(value: Any, indent: int = 2) -> str:
+        return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + " " * indent)
+
+
+class YAMLReportWriter(ReportWriter):
+    """YAML document, written item by item with keys in yaml.dump order."""
+    
+    summary_first = False
+    
+    def _write_summary(self, summary: Dict[str, Any]) -> None:
+        self.stream.write(self._dump({"summary": summary}))
+    
+    def _write_deprecated(self, record: Dict[str, Any], index: int) -> None:
+        if index == 0:
+            self.stream.write("deprecated_packages:\n")
+        self.stream.write(self._dump([record]))
+    
+    def _write_safe(self, pkg: Dict[str, str], index: int) -> None:
+        if index == 0:
+            self._safe_spool.write("safe_packages:\n")
+        self._safe_spool.write(self._dump([pkg]))
+    
+    def _finish_deprecated(self) -> None:
+        if self.deprecated_count == 0:
+            self.stream.write("deprecated_packages: []\n")
+    
+    def _finish_safe(self) -> None:
+        if self.safe_count == 0:
+            self.stream.write("safe_packages: []\n")
+    
+    @staticmethod
+    def _dump(value: Any) -> str:
+        return yaml.dump(value, default_flow_style=False, allow_unicode=True)
+
+
+class NDJSONReportWriter(ReportWriter):
+    """One JSON object per line, tagged with "type"; the summary line comes last."""
+    
+    summary_first = False
+    
+    def _write_summary(self, summary: Dict[str, Any]) -> None:
+        self._write_line({"type": "summary", **summary})
+    
+    def _write_deprecated(self, record: Dict[str, Any], index: int) -> None:
+        self._write_line({"type": "deprecated", **record})
+    
+    def _write_safe(self, pkg: Dict[str, str], index: int) -> None:
+        # Lines need no grouping, so safe packages skip the spool
+        self._write_line({"type": "safe", **pkg})
+    
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+WRITERS = {
+    "text": TextReportWriter,
+    "json": JSONReportWriter,
+    "yaml": YAMLReportWriter,
+    "ndjson": NDJSONReportWriter,
+}
+
+
+def get_report_writer(format_type: str, stream: TextIO) -> ReportWriter:
+    """Returns writer for a format, unknown formats fall back to text."""
+    return WRITERS.get(format_type, TextReportWriter)(stream)
@@ -2,31 +2,35 @@
 Repository analyzer for collecting dependency information and building dynamic database.
 """
 
-import requests
 import yaml
 import json
-import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 import logging
 
 from .parser import DependencyParser
+from .pypi_client import get_default_client, is_deprecated_metadata
+from .verdict_cache import VerdictCache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Source name under which analysis verdicts are cached
+VERDICT_SOURCE = "pypi_analysis"
+
 
 class RepositoryAnalyzer:
     """Analyzes repository dependencies and builds dynamic database."""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Path] = None, verdict_ttl_hours: Optional[Dict[str, float]] = None):
+        if cache_dir is None:
+            cache_dir = Path(__file__).parent.parent / "cache"
+        
         self.parser = DependencyParser()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'deprecated-checker/1.0'
-        })
+        self.client = get_default_client(cache_dir)
+        self.verdicts = VerdictCache(cache_dir / "verdicts.json", verdict_ttl_hours)
     
     def analyze_repository(self, project_path: Path) -> Dict[str, Any]:
         """Analyzes repository and builds database for found dependencies."""
@@ -36,7 +40,7 @@ class RepositoryAnalyzer:
         dependencies_by_file = self.parser.parse_all_files(project_path)
         
         # Extract unique packages
-        unique_packages = self._extract_unique_packages(dependencies_by_file)
+        unique_packages = self.extract_unique_packages(dependencies_by_file)
         logger.info(f"Found {len(unique_packages)} unique packages in repository")
         
         # Build database for these packages
@@ -44,7 +48,7 @@ class RepositoryAnalyzer:
         
         return database
     
-    def _extract_unique_packages(self, dependencies_by_file: Dict[str, List[tuple]]) -> Set[str]:
+    def extract_unique_packages(self, dependencies_by_file: Dict[str, List[tuple]]) -> Set[str]:
         """Extracts unique package names from all dependency files."""
         unique_packages = set()
         
@@ -56,105 +60,84 @@ class RepositoryAnalyzer:
     
     def _build_database_for_packages(self, packages: Set[str]) -> Dict[str, Any]:
         """Builds database by checking each package for deprecation status."""
+        database, to_check = self.cached_verdicts(packages)
+        
+        # Metadata is fetched concurrently by the shared PyPI client
+        for package_name, package_data in self.client.fetch_many(to_check):
+            self.record_verdict(database, package_name, package_data)
+        
+        self.save_verdicts(database)
+        return database
+    
+    def cached_verdicts(self, packages: Set[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Returns the database built from unexpired verdicts and the packages left to check."""
         database = {}
+        to_check = []
         
-        for package_name in packages:
-            logger.info(f"Checking package: {package_name}")
-            
-            # Check package on PyPI
-            package_info = self._check_package_on_pypi(package_name)
-            
-            if package_info:
+        # Reuse unexpired verdicts, only new or expired packages go to PyPI
+        for package_name in sorted(packages):
+            found, package_info = self.verdicts.get(package_name, VERDICT_SOURCE)
+            if not found:
+                to_check.append(package_name)
+            elif package_info:
                 database[package_name] = package_info
-                logger.info(f"Added {package_name} to database")
-            else:
-                logger.debug(f"Package {package_name} not found or not deprecated")
         
+        logger.info(f"{len(packages) - len(to_check)} packages answered from verdict cache, "
+                    f"{len(to_check)} to check on PyPI")
+        return database, to_check
+    
+    def record_verdict(self, database: Dict[str, Any], package_name: str, package_data: Any) -> None:
+        """Adds a package's verdict from fetched metadata to the database and verdict cache."""
+        if isinstance(package_data, Exception):
+            # Failed lookups are not cached, they are retried next run
+            return
+        
+        package_info = self._package_entry(package_name, package_data)
+        self.verdicts.add(package_name, VERDICT_SOURCE, package_info)
+        
+        if package_info:
+            database[package_name] = package_info
+            logger.info(f"Added {package_name} to database")
+        else:
+            logger.debug(f"Package {package_name} not found or not deprecated")
+    
+    def save_verdicts(self, database: Dict[str, Any]) -> None:
+        """Saves the verdict cache after a run that built database."""
+        self.verdicts.save()
         logger.info(f"Built database with {len(database)} deprecated packages")
-        return database
     
     def _check_package_on_pypi(self, package_name: str) -> Optional[Dict[str, Any]]:
         """Checks package on PyPI for deprecation status."""
         try:
             # Get package information from PyPI
-            response = self.session.get(
-                f"https://pypi.org/pypi/{package_name}/json",
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                package_data = response.json()
-                
-                # Check if package is deprecated
-                if self._is_deprecated_package(package_data):
-                    alternatives = self._get_alternatives_for_package(package_name)
-                    
-                    return {
-                        "deprecated_since": self._extract_deprecation_date(package_data),
-                        "reason": self._extract_deprecation_reason(package_data),
-                        "alternatives": alternatives,
-                        "source": "pypi_analysis",
-                        "last_updated": datetime.now().isoformat(),
-                        "package_info": {
-                            "latest_version": package_data.get("info", {}).get("version", ""),
-                            "summary": package_data.get("info", {}).get("summary", ""),
-                            "home_page": package_data.get("info", {}).get("home_page", ""),
-                            "project_url": package_data.get("info", {}).get("project_url", "")
-                        }
-                    }
-            
-            time.sleep(0.1)  # Don't overload API
-            
+            return self._package_entry(package_name, self.client.get_json(package_name))
         except Exception as e:
             logger.warning(f"Error checking package {package_name}: {e}")
         
         return None
     
+    def _package_entry(self, package_name: str, package_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Builds database entry from PyPI metadata, or None if not deprecated."""
+        if not package_data or not self._is_deprecated_package(package_data):
+            return None
+        
+        return {
+            "deprecated_since": self._extract_deprecation_date(package_data),
+            "reason": self._extract_deprecation_reason(package_data),
+            "alternatives": self._get_alternatives_for_package(package_name),
+            "source": "pypi_analysis",
+            "last_updated": datetime.now().isoformat(),
+            "package_info": {
+                "latest_version": package_data.get("info", {}).get("version", ""),
+                "summary": package_data.get("info", {}).get("summary", ""),
+                "home_page": package_data.get("info", {}).get("home_page", ""),
+                "project_url": package_data.get("info", {}).get("project_url", "")
+            }
+        }
+    
     def _is_deprecated_package(self, package_data: Dict[str, Any]) -> bool:
         """Checks if package is deprecated based on PyPI data."""
-        info = package_data.get("info", {})
-        
-        # Check different indicators of deprecation
-        description = info.get("summary", "")
-        keywords = info.get("keywords", "")
-        classifiers = info.get("classifiers", [])
-        
-        # Handle None values
-        if description is None:
-            description = ""
-        if keywords is None:
-            keywords = ""
-        
-        description = description.lower()
-        keywords = keywords.lower()
-        
-        deprecated_indicators = [
-            "deprecated", "deprecation", "discontinued", "legacy",
-            "outdated", "obsolete", "no longer maintained", "end of life",
-            "eol", "sunset", "archived"
-        ]
-        
-        # Check description and keywords
-        for indicator in deprecated_indicators:
-            if indicator in description or indicator in keywords:
-                return True
-        
-        # Check classifiers for deprecation
-        for classifier in classifiers:
-            if "deprecated" in classifier.lower() or "end of life" in classifier.lower():
-                return True
-        
-        # Check for specific patterns in description
-        if any(pattern in description for pattern in [
-            "this package is deprecated",
-            "use alternative",
-            "no longer supported",
-            "moved to",
-            "replaced by"
-        ]):
-            return True
-        
-        return False
+        return is_deprecated_metadata(package_data)
     
     def _extract_deprecation_date(self, package_data: Dict[str, Any]) -> str:
         """Extracts deprecation date from package data."""
@@ -0,0 +1,93 @@
+"""
+Content-addressed cache of whole check results.
+"""
+
+import gzip
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from . import __version__
+from .parse_cache import PARSE_CACHE_VERSION
+from .cache_files import LRUDirectoryCache, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the stored result layout changes
+RESULT_CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def result_key(manifests: Iterable[Tuple[str, Path]], db_version: str, mode: str) -> Optional[str]:
+    """Hashes (relative name, path) manifests, the database version and the check mode.
+    
+    The package and parser versions are part of the key, so an upgrade that
+    changes how manifests are parsed or checked never reuses old results.
+    Returns None when a manifest cannot be read, the result is not cached then.
+    """
+    code_version = f"{__version__}:{PARSE_CACHE_VERSION}:{RESULT_CACHE_VERSION}"
+    hasher = hashlib.sha256(f"{code_version}:{db_version}:{mode}".encode("utf-8"))
+    for name, path in sorted(manifests):
+        try:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            return None
+        hasher.update(f"\0{name}\0{digest}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class ResultCache(LRUDirectoryCache):
+    """Stores check results keyed by what they were computed from.
+    
+    The key covers the relative paths and content of every manifest, the
+    code, database version and the check mode, so identical manifests give a hit
+    in any checkout of any repository. Entries are gzipped JSON written
+    atomically; a hit marks the entry as used and the least recently used
+    entries are evicted once the directory grows past max_bytes.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        super().__init__([self.cache_dir], max_bytes)
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored result for key, if any."""
+        entry = self._entry_path(key)
+        try:
+            with gzip.open(entry, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError, EOFError):
+            self._count("misses")
+            return None
+        
+        self._touch(entry)
+        self._count("hits")
+        return data
+    
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """Stores a result and evicts least recently used entries over the size limit."""
+        entry = self._entry_path(key)
+        try:
+            written = atomic_write(entry, gzip.compress(json.dumps(data).encode("utf-8")))
+        except OSError as e:
+            logger.debug(f"Could not write result cache entry {entry}: {e}")
+            return
+        self._record_write(written)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Returns hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json.gz"
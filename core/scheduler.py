@@ -2,19 +2,62 @@
 Scheduler for automatic database updates.
 """
 
-import schedule
+import os
 import time
+import random
 import threading
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Any, Dict, Optional, Callable
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
 from .data_collector import DataCollector
+from .job_scheduler import Job, JobScheduler
+from .daemon import CheckDaemon, default_socket_path
+from .sqlite_store import SQLitePackageStore, is_sqlite_path
 
 logger = logging.getLogger(__name__)
 
+SCHEDULER_SOCKET_ENV = "DEPRECATED_CHECKER_SCHEDULER_SOCKET"
+
+
+def scheduler_pid_file(socket_path: Path) -> Path:
+    """Returns the pid file that belongs to a scheduler control socket."""
+    return socket_path.with_suffix(".pid")
+
+
+def read_pid_file(pid_file: Path) -> Optional[int]:
+    """Returns the pid recorded in pid_file if that process is still alive."""
+    try:
+        pid = int(pid_file.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        # Alive, but owned by someone else
+        pass
+    return pid
+
+
+def is_scheduler_process(pid: int, socket_path: Path) -> bool:
+    """Checks if pid is a `scheduler run` process serving socket_path.
+    
+    A stale pid file may name a process that reused the pid. The command
+    line is read from /proc; where there is none the process cannot be
+    identified and False is returned.
+    """
+    try:
+        arguments = Path(f"/proc/{pid}/cmdline").read_bytes().decode("utf-8", "replace").split("\0")
+    except OSError:
+        return False
+    return "scheduler" in arguments and "run" in arguments and str(socket_path) in arguments
+
 
 @dataclass
 class UpdateConfig:
@@ -28,18 +71,32 @@ class UpdateConfig:
 
 
 class DatabaseScheduler:
-    """Scheduler for automatic database updates."""
+    """Scheduler for automatic database updates.
     
-    def __init__(self, config: Optional[UpdateConfig] = None):
+    Updates run on one background thread driven by a JobScheduler, which
+    sleeps until the next update or retry is due. Failed updates are
+    retried as future jobs with exponential backoff, never by sleeping.
+    """
+    
+    def __init__(self, config: Optional[UpdateConfig] = None, cache_dir: Optional[Path] = None,
+                 state_dir: Optional[Path] = None):
         self.config = config or UpdateConfig()
-        self.collector = DataCollector()
+        self.collector = DataCollector(cache_dir)
+        # Backups go to the collector's cache, the status file to state_dir if given
+        self.cache_dir = self.collector.cache_dir
         self.is_running = False
         self.last_update = None
         self.update_thread = None
+        self.jobs: Optional[JobScheduler] = None
+        self.current_run_started: Optional[datetime] = None
+        self.last_run_duration: Optional[float] = None
+        self._retry_job: Optional[Job] = None
+        # Scheduled and forced updates never write the database at the same time
+        self._update_lock = threading.Lock()
         
         # Path to file with information about last update
-        self.status_file = Path(__file__).parent.parent / "cache" / "update_status.json"
-        self.status_file.parent.mkdir(exist_ok=True)
+        self.status_file = (state_dir or self.cache_dir) / "update_status.json"
+        self.status_file.parent.mkdir(parents=True, exist_ok=True)
     
     def start(self) -> None:
         """Starts the scheduler."""
@@ -48,61 +105,100 @@ class DatabaseScheduler:
             return
         
         self.is_running = True
-        
-        # Setup schedule
-        schedule.every(self.config.interval_hours).hours.do(self._update_database)
+        self.jobs = JobScheduler()
+        self.jobs.schedule(self._interval_seconds(), self._scheduled_update, "update")
         
         # Start in separate thread
-        self.update_thread = threading.Thread(target=self._run_scheduler, daemon=True)
+        self.update_thread = threading.Thread(target=self.jobs.run, daemon=True, name="database-scheduler")
         self.update_thread.start()
         
         logger.info(f"Scheduler started with {self.config.interval_hours}h interval")
     
     def stop(self) -> None:
-        """Stops the scheduler."""
+        """Stops the scheduler; an update in progress is finished first."""
         self.is_running = False
-        schedule.clear()
+        if self.jobs is not None:
+            self.jobs.stop()
         logger.info("Scheduler stopped")
     
-    def _run_scheduler(self) -> None:
-        """Runs the scheduler loop."""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+    def trigger_update(self) -> None:
+        """Runs an update on the scheduler thread right away."""
+        if not self.is_running:
+            raise RuntimeError("Scheduler is not running")
+        self.jobs.schedule(0, self._update_database, "forced update")
     
-    def _update_database(self) -> None:
-        """Performs database update with error handling."""
-        logger.info("Starting scheduled database update...")
+    def _scheduled_update(self) -> None:
+        """Runs a regular update and schedules the next one."""
+        # The interval counts from the start of this update, not its end
+        self.jobs.schedule(self._interval_seconds(), self._scheduled_update, "update")
+        self._update_database()
+    
+    def _update_database(self, attempt: int = 0) -> None:
+        """Performs one database update attempt; a failure schedules the next attempt."""
+        if attempt == 0:
+            logger.info("Starting scheduled database update...")
+            # A fresh update supersedes the retries of an earlier one
+            if self._retry_job is not None:
+                self.jobs.cancel(self._retry_job)
+                self._retry_job = None
+            
+            # Create backup
+            if self.config.backup_before_update:
+                self._create_backup()
         
-        # Create backup
-        if self.config.backup_before_update:
-            self._create_backup()
+        try:
+            self._run_update()
+            self._update_status(success=True)
+            logger.info("Database update completed successfully")
+            return
+        except Exception as e:
+            logger.error(f"Database update attempt {attempt + 1} failed: {e}")
+            error = str(e)
         
-        # Try to update database
-        for attempt in range(self.config.retry_attempts):
+        if attempt < self.config.retry_attempts - 1 and self.is_running:
+            delay = self._retry_delay(attempt)
+            logger.info(f"Retrying in {delay / 60:.1f} minutes...")
+            self._retry_job = self.jobs.schedule(
+                delay, lambda: self._update_database(attempt + 1), f"retry {attempt + 1}"
+            )
+        else:
+            self._retry_job = None
+            self._update_status(success=False, error=error)
+            if self.config.notify_on_failure:
+                self._notify_failure(error)
+    
+    def _run_update(self) -> None:
+        """Runs the collector once, recording when it started and how long it took."""
+        with self._update_lock:
+            self.current_run_started = datetime.now()
+            started = time.monotonic()
             try:
                 self.collector.update_database()
-                self._update_status(success=True)
-                logger.info("Database update completed successfully")
-                return
-                
-            except Exception as e:
-                logger.error(f"Database update attempt {attempt + 1} failed: {e}")
-                
-                if attempt < self.config.retry_attempts - 1:
-                    logger.info(f"Retrying in {self.config.retry_delay_minutes} minutes...")
-                    time.sleep(self.config.retry_delay_minutes * 60)
-                else:
-                    self._update_status(success=False, error=str(e))
-                    if self.config.notify_on_failure:
-                        self._notify_failure(str(e))
+            finally:
+                self.last_run_duration = time.monotonic() - started
+                self.current_run_started = None
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Seconds before a retry: retry_delay_minutes doubled per attempt, with jitter."""
+        delay = self.config.retry_delay_minutes * 60 * (2 ** attempt)
+        # Jitter keeps schedulers that failed together from retrying together
+        return random.uniform(delay / 2, delay)
+    
+    def _interval_seconds(self) -> float:
+        return self.config.interval_hours * 3600
+    
+    def _next_update(self) -> datetime:
+        """Returns when the next update or retry is due."""
+        pending = self.jobs.pending() if self.is_running else []
+        if pending:
+            return datetime.now() + timedelta(seconds=pending[0][1])
+        return datetime.now() + timedelta(hours=self.config.interval_hours)
     
     def _create_backup(self) -> None:
         """Creates a backup of the current database."""
         db_path = Path(__file__).parent.parent / "data" / "deprecated_packages.yaml"
         if db_path.exists():
-            backup_path = Path(__file__).parent.parent / "cache" / f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
-            backup_path.parent.mkdir(exist_ok=True)
+            backup_path = self.cache_dir / f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
             
             import shutil
             shutil.copy2(db_path, backup_path)
@@ -114,7 +210,7 @@ class DatabaseScheduler:
             "last_update": datetime.now().isoformat(),
             "success": success,
             "error": error,
-            "next_update": (datetime.now() + timedelta(hours=self.config.interval_hours)).isoformat()
+            "next_update": self._next_update().isoformat()
         }
         
         import json
@@ -133,7 +229,7 @@ class DatabaseScheduler:
         logger.info("Forcing immediate database update...")
         
         try:
-            self.collector.update_database()
+            self._run_update()
             self._update_status(success=True)
             logger.info("Forced update completed successfully")
             return True
@@ -165,18 +261,75 @@ class DatabaseScheduler:
             except Exception as e:
                 logger.warning(f"Error reading status file: {e}")
         
+        if self.is_running:
+            status.update(self._live_status())
         return status
     
+    def _live_status(self) -> Dict[str, Any]:
+        """Returns the state of the running scheduler: current update, progress and queue."""
+        pending = self.jobs.pending()
+        current = self.jobs.current
+        started = self.current_run_started
+        return {
+            "state": "updating" if started else "idle",
+            "current_job": current.name if current else None,
+            "current_run_started": started.isoformat() if started else None,
+            "progress": dict(self.collector.progress) if started else None,
+            "last_run_duration": self.last_run_duration,
+            "queue_depth": len(pending),
+            "pending_jobs": [{"name": name, "due_in": due_in} for name, due_in in pending],
+            "next_update": self._next_update().isoformat()
+        }
+    
     def get_statistics(self) -> dict:
         """Gets statistics about the database."""
         return self.collector.get_statistics()
 
 
+class SchedulerDaemon(CheckDaemon):
+    """Control socket of a detached scheduler process.
+    
+    Answers "status" with the scheduler's live state, queues an update on
+    "force-update" and stops the scheduler and itself on "stop". The pid
+    file next to the socket exists while the process serves.
+    """
+    
+    def __init__(self, scheduler: DatabaseScheduler, socket_path: Optional[Path] = None):
+        self.scheduler = scheduler
+        super().__init__({}, socket_path or default_socket_path("scheduler", SCHEDULER_SOCKET_ENV))
+        self.pid_file = scheduler_pid_file(self.socket_path)
+    
+    def serve(self) -> None:
+        """Runs the scheduler and serves control requests until stopped."""
+        self.pid_file.write_text(f"{os.getpid()}\n")
+        self.scheduler.start()
+        try:
+            super().serve()
+        finally:
+            self.scheduler.stop()
+            # Never leave the database half written
+            self.scheduler.update_thread.join()
+            if read_pid_file(self.pid_file) == os.getpid():
+                self.pid_file.unlink()
+    
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("control") == "force-update":
+            self.scheduler.trigger_update()
+            return {"queued": True, "queue_depth": len(self.scheduler.jobs.pending())}
+        return super().respond(request)
+    
+    def status(self) -> Dict[str, Any]:
+        status = super().status()
+        status.update(self.scheduler.get_status())
+        return status
+
+
 class ManualUpdater:
     """Manual updater for one-time database updates."""
     
-    def __init__(self):
-        self.collector = DataCollector()
+    def __init__(self, db_path: Optional[Path] = None, cache_dir: Optional[Path] = None):
+        self.collector = DataCollector(cache_dir)
+        self.db_path = db_path or Path(__file__).parent.parent / "data" / "deprecated_packages.yaml"
     
     def update_from_source(self, source: str) -> bool:
         """Updates database from a specific source."""
@@ -195,20 +348,30 @@ class ManualUpdater:
                 logger.error(f"Unknown source: {source}")
                 return False
             
-            # Update database only with data from specified source
-            db_path = Path(__file__).parent.parent / "data" / "deprecated_packages.yaml"
+            for package_data in data.values():
+                package_data["source"] = source
+                package_data["last_updated"] = datetime.now().isoformat()
+            
+            db_path = self.db_path
+            if is_sqlite_path(db_path):
+                # Upsert only the changed rows instead of rewriting the whole file
+                store = SQLitePackageStore(db_path)
+                try:
+                    store.upsert_many(data.items())
+                finally:
+                    store.close()
+                logger.info(f"Updated {len(data)} packages from {source}")
+                return True
+            
+            import yaml
             existing_data = {}
             
             if db_path.exists():
-                import yaml
                 with open(db_path, 'r', encoding='utf-8') as f:
                     existing_data = yaml.safe_load(f) or {}
             
             # Update database only with data from specified source
-            for package_name, package_data in data.items():
-                package_data["source"] = source
-                package_data["last_updated"] = datetime.now().isoformat()
-                existing_data[package_name] = package_data
+            existing_data.update(data)
             
             # Save updated database
             with open(db_path, 'w', encoding='utf-8') as f:
@@ -223,15 +386,18 @@ class ManualUpdater:
     
     def validate_database(self) -> dict:
         """Validates the current database."""
-        db_path = Path(__file__).parent.parent / "data" / "deprecated_packages.yaml"
+        db_path = self.db_path
         
         if not db_path.exists():
             return {"valid": False, "error": "Database file not found"}
         
         try:
-            import yaml
-            with open(db_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            if is_sqlite_path(db_path):
+                data = SQLitePackageStore(db_path, read_only=True)
+            else:
+                import yaml
+                with open(db_path, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f)
             
             validation_result = {
                 "valid": True,
@@ -250,6 +416,16 @@ class ManualUpdater:
                         )
                         validation_result["valid"] = False
                 
+                affected = package_data.get("affected")
+                if affected:
+                    try:
+                        SpecifierSet(str(affected))
+                    except InvalidSpecifier:
+                        validation_result["errors"].append(
+                            f"Package {package_name} has invalid affected range: {affected}"
+                        )
+                        validation_result["valid"] = False
+                
                 # Count sources
                 source = package_data.get("source", "unknown")
                 validation_result["sources"][source] = validation_result["sources"].get(source, 0) + 1
@@ -0,0 +1,180 @@
+"""
+SQLite storage backend for the deprecated packages database.
+"""
+
+import json
+import uuid
+import sqlite3
+import threading
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import logging
+
+from packaging.utils import canonicalize_name
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+# Names per "WHERE name IN (...)" query, below SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    name TEXT PRIMARY KEY,
+    canonical TEXT,
+    source TEXT,
+    last_updated TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_packages_source ON packages(source);
+CREATE INDEX IF NOT EXISTS idx_packages_canonical ON packages(canonical);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def is_sqlite_path(path: Optional[Path]) -> bool:
+    """Checks if path points to an SQLite database file."""
+    return path is not None and Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+class SQLitePackageStore(Mapping):
+    """Read-mostly mapping of package name to package info stored in SQLite.
+    
+    Behaves like the dict DeprecatedPackageDB keeps in memory, but every
+    lookup is an indexed query, so the database never has to fit in RAM.
+    """
+    
+    def __init__(self, db_file: Path, read_only: bool = False):
+        self.db_file = Path(db_file)
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        
+        if read_only:
+            # URI mode=ro lets many CI readers share the file with a live writer (WAL)
+            uri = f"file:{self.db_file.resolve().as_posix()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+    
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM packages WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return json.loads(row[0])
+    
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM packages WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = [row[0] for row in self._conn.execute("SELECT name FROM packages ORDER BY name")]
+        return iter(names)
+    
+    def get_canonical(self, canonical: str) -> Optional[Dict[str, Any]]:
+        """Looks up a package by its PEP 503 normalized name."""
+        return self.get_many_canonical([canonical]).get(canonical)
+    
+    def get_many_canonical(self, canonicals: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Looks up many normalized names with one query per chunk, keyed by normalized name."""
+        canonicals = list(canonicals)
+        found = {}
+        for start in range(0, len(canonicals), LOOKUP_CHUNK_SIZE):
+            chunk = canonicals[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT canonical, data FROM packages WHERE canonical IN ({placeholders})", chunk
+                ).fetchall()
+            for key, data in rows:
+                found[key] = json.loads(data)
+        return found
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+    
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterates over all packages without loading the whole table at once."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT name, data FROM packages ORDER BY name")
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for name, data in rows:
+                yield name, json.loads(data)
+    
+    def values(self) -> Iterator[Dict[str, Any]]:
+        """Iterates over all package infos."""
+        for _, info in self.items():
+            yield info
+    
+    @property
+    def version(self) -> str:
+        """Identifier that changes on every write to the database."""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            except sqlite3.OperationalError:
+                return ""
+        return f"sqlite:{row[0]}" if row else "sqlite:empty"
+    
+    def upsert(self, name: str, info: Dict[str, Any]) -> None:
+        """Inserts or replaces a single package."""
+        self.upsert_many([(name, info)])
+    
+    def upsert_many(self, packages: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Inserts or replaces packages in a single transaction."""
+        if self.read_only:
+            raise PermissionError(f"Database {self.db_file} is opened read-only")
+        
+        rows = [
+            (name, canonicalize_name(name), info.get("source"), info.get("last_updated"),
+             json.dumps(info, default=str))
+            for name, info in packages
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO packages (name, canonical, source, last_updated, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET canonical = excluded.canonical, source = excluded.source, "
+                "last_updated = excluded.last_updated, data = excluded.data",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (uuid.uuid4().hex,)
+            )
+        return len(rows)
+    
+    def delete(self, name: str) -> bool:
+        """Deletes a package, returning True if it existed."""
+        if self.read_only:
+            raise PermissionError(f"Database {self.db_file} is opened read-only")
+        
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM packages WHERE name = ?", (name,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (uuid.uuid4().hex,)
+            )
+        return cursor.rowcount > 0
+    
+    def close(self) -> None:
+        """Closes the underlying connection."""
+        self._conn.close()
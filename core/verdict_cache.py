@@ -0,0 +1,90 @@
+"""
+TTL cache of per-package deprecation verdicts.
+"""
+
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from .cache_files import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# How long a verdict stays valid, per source, in hours
+DEFAULT_TTL_HOURS = {
+    "pypi": 24,
+    "pypi_analysis": 24 * 7,
+}
+DEFAULT_TTL_FALLBACK_HOURS = 24
+
+
+class VerdictCache:
+    """Remembers "checked, not deprecated, as of T" (and deprecated entries).
+    
+    A missing or expired verdict means the package has to be looked up
+    again. Negative verdicts are stored with a None entry; deprecated
+    packages keep the database entry that was built for them, so a repeat
+    run over unchanged dependencies needs no network at all.
+    """
+    
+    def __init__(self, cache_file: Path, ttl_hours: Optional[Dict[str, float]] = None):
+        self.cache_file = Path(cache_file)
+        self.ttl_hours = dict(DEFAULT_TTL_HOURS)
+        if ttl_hours:
+            self.ttl_hours.update(ttl_hours)
+        
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = self._read()
+    
+    def get(self, package: str, source: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Returns (found, entry); entry is None for "not deprecated"."""
+        with self._lock:
+            record = self._data.get(source, {}).get(package)
+        if record is None or time.time() - record["checked_at"] > self._ttl_seconds(source):
+            return False, None
+        return True, record.get("entry")
+    
+    def add(self, package: str, source: str, entry: Optional[Dict[str, Any]] = None) -> None:
+        """Records a verdict; pass entry=None for "not deprecated"."""
+        with self._lock:
+            self._data.setdefault(source, {})[package] = {
+                "checked_at": time.time(),
+                "entry": entry
+            }
+            self._dirty = True
+    
+    def save(self) -> None:
+        """Merges verdicts with the file on disk and writes it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Keep whatever other processes stored meanwhile, newest verdict wins
+            merged = self._read()
+            for source, packages in self._data.items():
+                target = merged.setdefault(source, {})
+                for package, record in packages.items():
+                    if package not in target or target[package]["checked_at"] < record["checked_at"]:
+                        target[package] = record
+            self._data = merged
+            self._dirty = False
+        
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.cache_file, json.dumps(merged, default=str).encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"Could not save verdict cache {self.cache_file}: {e}")
+    
+    def _ttl_seconds(self, source: str) -> float:
+        return self.ttl_hours.get(source, DEFAULT_TTL_FALLBACK_HOURS) * 3600
+    
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
@@ -14,12 +14,7 @@ from pathlib import Path
 # Add current directory to path for import modules
 sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.cli import app
-
-
-def main():
-    """Main function to run CLI."""
-    app()
+from utils.launcher import main
 
 
 if __name__ == "__main__":
@@ -3,15 +3,47 @@
 Tests for Deprecated Checker.
 """
 
+import io
+import os
+import http.client
 import unittest
+import threading
 from pathlib import Path
 import tempfile
 import shutil
+import tarfile
 import yaml
+import requests
+from unittest import mock
 
-from core.checker import DeprecatedChecker
+from core.checker import DeprecatedChecker, DeprecatedFinding, FileChecked, SafeFinding
 from core.parser import DependencyParser
+from core.parse_cache import ParseCache
+from core.result_cache import ResultCache
+from core.report_writers import ReportWriter
+from core.daemon import CheckDaemon, default_socket_path, forward_to_daemon, send_request
+from core.http_server import CheckServer
+from core.job_scheduler import JobScheduler
+from core.scheduler import DatabaseScheduler, SchedulerDaemon, UpdateConfig, read_pid_file, scheduler_pid_file
+from core.scheduler import SCHEDULER_SOCKET_ENV, is_scheduler_process
 from core.database import DeprecatedPackageDB
+from core.http_cache import HTTPCache
+from core.image_scanner import ImageScanner
+from core.repository_analyzer import RepositoryAnalyzer
+from core.async_api import AsyncChecker
+from core.pypi_client import AsyncPyPIClient, PyPIClient, TokenBucket, get_default_client, is_deprecated_metadata
+
+
+def _layer_tar(files, compression=""):
+    """Builds an image layer tarball from (path, content) pairs."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=f"w:{compression}") as layer:
+        for name, content in files:
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            layer.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
 
 
 class TestDeprecatedChecker(unittest.TestCase):
@@ -85,10 +117,11 @@ class TestDeprecatedChecker(unittest.TestCase):
         """Test extracting version."""
         checker = DeprecatedChecker()
         
-        self.assertEqual(checker._extract_version("==2.31.0"), "2.31.0")
-        self.assertEqual(checker._extract_version(">=2.0.0"), "2.0.0")
-        self.assertEqual(checker._extract_version("~=1.0"), "1.0")
-        self.assertEqual(checker._extract_version(""), "")
+        self.assertEqual(checker.extract_version("==2.31.0"), "2.31.0")
+        self.assertEqual(checker.extract_version(">=2.0.0"), "2.0.0")
+        self.assertEqual(checker.extract_version("~=1.0"), "1.0")
+        self.assertEqual(checker.extract_version("<3,>=2.1"), "2.1")
+        self.assertEqual(checker.extract_version(""), "")
     
     def test_generate_report(self):
         """Test generating report."""
@@ -112,7 +145,277 @@ class TestDeprecatedChecker(unittest.TestCase):
         # Test YAML report
         yaml_report = self.checker.generate_report(result, "yaml")
         self.assertIn("requests", yaml_report)
+    
+    def test_write_report_streams(self):
+        """Test streamed reports parse back to the same data."""
+        import json
+        with open(self.project_path / "requirements.txt", 'w', encoding='utf-8') as f:
+            f.write("requests==2.31.0\nfastapi==0.104.0\nhttpx==0.25.0\n")
+        result = self.checker.check_project(self.project_path)
+        
+        report_file = self.project_path / "report.json"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            self.checker.write_report(result, f, "json")
+        data = json.loads(report_file.read_text(encoding='utf-8'))
+        self.assertEqual(data["summary"]["safe_count"], 2)
+        self.assertEqual(len(data["safe_packages"]), 2)
+        self.assertEqual(data["deprecated_packages"][0]["name"], "requests")
+        self.assertEqual(yaml.safe_load(self.checker.generate_report(result, "yaml")), data)
+        
+        records = [json.loads(line) for line in self.checker.generate_report(result, "ndjson").splitlines()]
+        self.assertEqual([record["type"] for record in records], ["deprecated", "safe", "safe", "summary"])
+        self.assertEqual(records[-1]["total_packages"], 3)
+        
+        # Written from check events, without a CheckResult
+        with open(report_file, 'w', encoding='utf-8') as f:
+            summary = self.checker.write_project_report(self.project_path, f, "json")
+        self.assertEqual(json.loads(report_file.read_text(encoding='utf-8')), data)
+        self.assertEqual(summary, data["summary"])
+        
+        with self.assertRaises(TypeError):
+            ReportWriter(io.StringIO())
+    
+    def test_check_project_recursive(self):
+        """Test recursive scan of a monorepo."""
+        for sub in ("svc/a", "svc/b", "node_modules/x"):
+            sub_path = self.project_path / sub
+            sub_path.mkdir(parents=True)
+            with open(sub_path / "requirements-dev.txt", 'w', encoding='utf-8') as f:
+                f.write("requests==2.31.0\n")
+        
+        result = self.checker.check_project(self.project_path, recursive=True, jobs=1)
+        
+        self.assertEqual(result.total_deprecated, 2)
+        self.assertEqual(set(result.projects), {"svc/a", "svc/b"})
+        self.assertIn("svc/a/requirements-dev.txt", result.files_checked)
+        self.assertEqual(result.deprecated_packages[0].file_source, "svc/a/requirements-dev.txt")
+    
+    def test_result_cache(self):
+        """Test unchanged manifests and database are answered from the result cache."""
+        with open(self.project_path / "requirements.txt", 'w', encoding='utf-8') as f:
+            f.write("requests==2.31.0\nfastapi==0.104.0\n")
+        cache = ResultCache(self.project_path / "results")
+        checker = DeprecatedChecker(self.db_path, result_cache=cache)
+        
+        first = checker.check_project(self.project_path)
+        with mock.patch.object(checker.parser, "parse_file") as parse:
+            second = checker.check_project(self.project_path)
+        parse.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual(cache.get_statistics()["hits"], 1)
+        
+        # Changed content is a different key
+        with open(self.project_path / "requirements.txt", 'a', encoding='utf-8') as f:
+            f.write("httpx==0.25.0\n")
+        self.assertEqual(checker.check_project(self.project_path).total_safe, 2)
+        
+        # So is a new parser version
+        key = checker.result_cache_key(self.project_path, False, False)
+        with mock.patch("core.result_cache.PARSE_CACHE_VERSION", -1):
+            self.assertNotEqual(checker.result_cache_key(self.project_path, False, False), key)
+        
+        cache.max_bytes = 0
+        self.assertEqual(cache.evict(), 2)
+    
+    def test_iter_check_project(self):
+        """Test events are yielded per file and closing the generator stops parsing."""
+        for sub in ("a", "b", "c"):
+            (self.project_path / sub).mkdir()
+            with open(self.project_path / sub / "requirements.txt", 'w', encoding='utf-8') as f:
+                f.write("fastapi==0.104.0\nrequests==2.31.0\n")
+        
+        events = self.checker.iter_check_project(self.project_path, recursive=True, jobs=1)
+        with mock.patch.object(self.checker.parser, "parse_file", wraps=self.checker.parser.parse_file) as parse:
+            first_file = next(events)
+            safe = next(events)
+            deprecated = next(events)
+            events.close()
+        
+        self.assertEqual(first_file, FileChecked("a/requirements.txt", 2))
+        self.assertIsInstance(safe, SafeFinding)
+        self.assertIsInstance(deprecated, DeprecatedFinding)
+        self.assertEqual(deprecated.package.name, "requests")
+        self.assertEqual(parse.call_count, 1)
+        
+        result = self.checker.check_project(self.project_path, recursive=True, jobs=1)
+        self.assertEqual((result.total_deprecated, result.total_safe), (3, 3))
+    
+    def test_check_transitive_from_lockfile(self):
+        """Test transitive check reports shortest path to deprecated node."""
+        with open(self.project_path / "pyproject.toml", 'w', encoding='utf-8') as f:
+            f.write("[tool.poetry.dependencies]\npython = '^3.9'\nflask = '^2.0'\nhttpx = '*'\n")
+        with open(self.project_path / "poetry.lock", 'w', encoding='utf-8') as f:
+            for name, deps in (("flask", ["werkzeug"]), ("werkzeug", ["requests"]),
+                               ("httpx", ["requests"]), ("requests", ["werkzeug"])):
+                f.write(f'[[package]]\nname = "{name}"\nversion = "1.0"\n\n[package.dependencies]\n')
+                f.writelines(f'{dep} = ">=1"\n' for dep in deps)
+                f.write("\n")
+        
+        with mock.patch.object(self.checker.db, "_get_many", wraps=self.checker.db._get_many) as lookup:
+            result = self.checker.check_project(self.project_path, transitive=True)
+        
+        lookup.assert_called_once()
+        self.assertEqual(sorted(lookup.call_args[0][0]), ["flask", "httpx", "requests", "werkzeug"])
+        self.assertEqual(result.total_deprecated, 1)
+        self.assertEqual(result.deprecated_packages[0].dependency_path, ["httpx", "requests"])
+        self.assertEqual(result.deprecated_packages[0].file_source, "poetry.lock")
+        self.assertIn("Via: httpx -> requests", self.checker.generate_report(result))
+    
+    def test_check_transitive_from_environment(self):
+        """Test transitive check over installed distributions metadata."""
+        site_packages = self.project_path / "site-packages"
+        for name, requires in (("app", ["flask>=2", "pytest; extra == 'test'"]),
+                               ("flask", ["requests"]), ("requests", []), ("pytest", [])):
+            dist_info = site_packages / f"{name}-1.0.dist-info"
+            dist_info.mkdir(parents=True)
+            with open(dist_info / "METADATA", 'w', encoding='utf-8') as f:
+                f.write(f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n")
+                f.writelines(f"Requires-Dist: {requirement}\n" for requirement in requires)
+        
+        result = self.checker.check_transitive(self.project_path, site_packages=[site_packages])
+        
+        self.assertEqual(result.files_checked, ["environment"])
+        self.assertEqual(result.total_deprecated + result.total_safe, 4)
+        self.assertEqual(result.deprecated_packages[0].dependency_path, ["app", "flask", "requests"])
+
 
+    def test_check_environments(self):
+        """Test scanning installed distributions of virtualenvs."""
+        envs = []
+        for env_name, packages in (("venv-a", ["requests", "fastapi"]), ("venv-b", ["fastapi"])):
+            site_packages = self.project_path / env_name / "lib" / "python3.11" / "site-packages"
+            for package in packages:
+                dist_info = site_packages / f"{package}-1.0.dist-info"
+                dist_info.mkdir(parents=True)
+                with open(dist_info / "METADATA", 'w', encoding='utf-8') as f:
+                    f.write(f"Metadata-Version: 2.1\nName: {package}\nVersion: 1.0\n"
+                            f"Requires-Dist: idna\n\nName: not-a-header\n")
+            envs.append(self.project_path / env_name)
+        egg_info = envs[1] / "lib" / "python3.11" / "site-packages" / "legacy.egg-info"
+        egg_info.mkdir()
+        with open(egg_info / "PKG-INFO", 'w', encoding='utf-8') as f:
+            f.write("Metadata-Version: 1.1\nName: legacy\nVersion: 0.1\n")
+        
+        result = self.checker.check_environments(envs, jobs=2)
+        
+        self.assertEqual(sorted(result.projects), [str(env) for env in envs])
+        self.assertEqual(result.total_deprecated, 1)
+        self.assertEqual(result.deprecated_packages[0].current_version, "1.0")
+        self.assertEqual(sorted(pkg["name"] for pkg in result.safe_packages), ["fastapi", "fastapi", "legacy"])
+    
+    def test_check_artifacts(self):
+        """Test reading Requires-Dist from wheels and sdists without unpacking."""
+        import io
+        import tarfile
+        import zipfile
+        
+        with zipfile.ZipFile(self.project_path / "app-1.0-py3-none-any.whl", 'w') as wheel:
+            wheel.writestr("app/__init__.py", "")
+            wheel.writestr("app-1.0.dist-info/METADATA",
+                           "Metadata-Version: 2.1\nName: app\nVersion: 1.0\n"
+                           "Requires-Dist: requests (>=2.0)\n"
+                           "Requires-Dist: pytest ; extra == 'test'\n\nRequires-Dist: body\n")
+        
+        # Old sdist: PKG-INFO without Requires-Dist, dependencies in egg-info
+        with tarfile.open(self.project_path / "lib-0.1.tar.gz", 'w:gz') as sdist:
+            for name, content in (("lib-0.1/PKG-INFO", "Metadata-Version: 1.1\nName: lib\nVersion: 0.1\n"),
+                                  ("lib-0.1/lib.egg-info/requires.txt", "fastapi>=0.100\n\n[dev]\nrequests\n")):
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                sdist.addfile(info, io.BytesIO(data))
+        
+        result = self.checker.check_artifacts([self.project_path])
+        
+        self.assertEqual(result.files_checked, ["app-1.0-py3-none-any.whl", "lib-0.1.tar.gz"])
+        self.assertEqual(result.deprecated_packages[0].name, "requests")
+        self.assertEqual(result.deprecated_packages[0].current_version, "2.0")
+        self.assertEqual(result.safe_packages, [
+            {"name": "fastapi", "version": "0.100", "file_source": "lib-0.1.tar.gz"}
+        ])
+        
+        # requires.txt holding only extras, and the same file name in two directories
+        for dist in ("one", "two"):
+            (self.project_path / dist).mkdir()
+            with zipfile.ZipFile(self.project_path / dist / "old-1.0.zip", 'w') as sdist:
+                sdist.writestr("old-1.0/old.egg-info/requires.txt", "[dev]\nrequests\n")
+        
+        result = self.checker.check_artifacts([self.project_path / "one", self.project_path / "two"])
+        
+        self.assertEqual(result.files_checked, ["one/old-1.0.zip", "two/old-1.0.zip"])
+        self.assertEqual(result.deprecated_packages, [])
+        
+        # Poetry sdist without Requires-Dist, next to a corrupt wheel
+        (self.project_path / "poetry").mkdir()
+        with zipfile.ZipFile(self.project_path / "poetry" / "poet-1.0.zip", 'w') as sdist:
+            sdist.writestr("poet-1.0/pyproject.toml",
+                           '[tool.poetry]\nname = "poet"\n[tool.poetry.dependencies]\n'
+                           'python = "^3.8"\nrequests = "^2.0"\nhttpx = "~0.25"\n')
+        (self.project_path / "poetry" / "broken-1.0-py3-none-any.whl").write_bytes(b"not a zip")
+        
+        result = self.checker.check_artifacts([self.project_path / "poetry"])
+        
+        self.assertEqual([(pkg.name, pkg.current_version) for pkg in result.deprecated_packages],
+                         [("requests", "2.0")])
+        self.assertEqual([pkg["name"] for pkg in result.safe_packages], ["httpx"])
+        self.assertEqual(list(result.errors), ["broken-1.0-py3-none-any.whl"])
+    
+    def test_check_image(self):
+        """Test scanning docker save layers with whiteouts."""
+        import json
+        
+        site = "usr/lib/python3.11/site-packages"
+        metadata = "Metadata-Version: 2.1\nName: {}\nVersion: {}\n\n"
+        base = _layer_tar([
+            (f"./{site}/requests-2.0.dist-info/METADATA", metadata.format("requests", "2.0")),
+            (f"./{site}/six-1.0.dist-info/METADATA", metadata.format("six", "1.0")),
+        ])
+        top = _layer_tar([
+            (f"{site}/.wh.six-1.0.dist-info", ""),
+            (f"{site}/fastapi-0.100.dist-info/METADATA", metadata.format("fastapi", "0.100")),
+            ("usr/share/doc/.wh..wh..opq", ""),
+        ], compression="gz")
+        manifest = json.dumps([{"RepoTags": ["app:latest"], "Layers": ["base/layer.tar", "top/layer.tar"]}])
+        
+        image_path = self.project_path / "image.tar"
+        with tarfile.open(image_path, 'w') as image:
+            # docker save writes manifest.json after the layers
+            for name, data in (("base/layer.tar", base), ("top/layer.tar", top),
+                               ("manifest.json", manifest.encode("utf-8"))):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                image.addfile(info, io.BytesIO(data))
+        
+        result = self.checker.check_image(image_path)
+        
+        self.assertEqual(result.files_checked, ["app:latest"])
+        self.assertEqual([pkg.name for pkg in result.deprecated_packages], ["requests"])
+        self.assertEqual([pkg["name"] for pkg in result.safe_packages], ["fastapi"])
+    
+    def test_image_whiteouts(self):
+        """Test which whiteouts hide installed distributions."""
+        site = "usr/lib/python3.11/site-packages"
+        metadata = "Metadata-Version: 2.1\nName: {}\nVersion: 1.0\n\n"
+        scanner = ImageScanner()
+        scanner.apply_layer(io.BytesIO(_layer_tar([
+            (f"{site}/{name}-1.0.dist-info/METADATA", metadata.format(name))
+            for name in ("six", "attrs", "idna")
+        ])))
+        
+        # A rewritten RECORD keeps the distribution, a removed METADATA does not
+        scanner.apply_layer(io.BytesIO(_layer_tar([
+            (f"{site}/six-1.0.dist-info/.wh.RECORD", ""),
+            (f"{site}/six-1.0.dist-info/.wh.direct_url.json", ""),
+            (f"{site}/attrs-1.0.dist-info/.wh.METADATA", ""),
+        ])))
+        self.assertEqual(sorted(dist.name for dist in scanner.installed.values()), ["idna", "six"])
+        
+        # An opaque whiteout at the root hides every lower layer
+        scanner.apply_layer(io.BytesIO(_layer_tar([
+            (".wh..wh..opq", ""),
+            (f"{site}/h11-1.0.dist-info/METADATA", metadata.format("h11")),
+        ])))
+        self.assertEqual([dist.name for dist in scanner.installed.values()], ["h11"])
 
 class TestDatabase(unittest.TestCase):
     """Tests for database."""
@@ -167,6 +470,86 @@ class TestDatabase(unittest.TestCase):
         packages = self.db.get_all_deprecated_packages()
         self.assertEqual(len(packages), 1)
         self.assertIn("requests", packages)
+    
+    def test_snapshot_invalidation(self):
+        """Test compiled snapshot is written and rebuilt when YAML changes."""
+        snapshot = self.db_path.with_name(self.db_path.name + ".snapshot")
+        self.assertTrue(snapshot.exists())
+        self.assertTrue(DeprecatedPackageDB(self.db_path).is_deprecated("requests"))
+        
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            yaml.dump({"six": {"deprecated_since": "2020-01-01", "reason": "py2", "alternatives": []}}, f)
+        
+        db = DeprecatedPackageDB(self.db_path)
+        self.assertTrue(db.is_deprecated("six"))
+        self.assertFalse(db.is_deprecated("requests"))
+    
+    def test_sqlite_backend(self):
+        """Test SQLite backend behind the same lookup API."""
+        sqlite_path = Path(self.temp_dir) / "test_db.sqlite"
+        self.assertEqual(self.db.export_to_sqlite(sqlite_path), 1)
+        
+        db = DeprecatedPackageDB(sqlite_path)
+        db.data.upsert("six", {"deprecated_since": "2020-01-01", "reason": "py2", "alternatives": []})
+        
+        reader = DeprecatedPackageDB(sqlite_path, read_only=True)
+        self.assertTrue(reader.is_deprecated("requests"))
+        self.assertTrue(reader.is_deprecated("six"))
+        self.assertFalse(reader.is_deprecated("fastapi"))
+        self.assertEqual(reader.get_alternatives("requests")[0]["name"], "httpx")
+        self.assertEqual(len(reader.get_all_deprecated_packages()), 2)
+        with self.assertRaises(PermissionError):
+            reader.data.upsert("nose", {})
+    
+    def test_canonical_name_lookups(self):
+        """Test PEP 503 normalized lookups keep display names on both backends."""
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            yaml.dump({
+                "PIL": {"reason": "Unmaintained", "alternatives": [{"name": "Pillow", "reason": "Fork",
+                                                                    "migration_guide": "https://pillow.example"}]},
+                "django-cors-headers": {"reason": "Old", "alternatives": []},
+            }, f)
+        db = DeprecatedPackageDB(self.db_path)
+        
+        sqlite_path = Path(self.temp_dir) / "test_db.sqlite"
+        db.export_to_sqlite(sqlite_path)
+        
+        for backend in (db, DeprecatedPackageDB(sqlite_path, read_only=True)):
+            for name in ("pil", "Django_CORS_headers", "django.cors.headers", "DJANGO-CORS-HEADERS"):
+                self.assertTrue(backend.is_deprecated(name), name)
+            self.assertEqual(backend.get_migration_guide("pil", "pillow"), "https://pillow.example")
+            self.assertIn("PIL", backend.get_all_deprecated_packages())
+            self.assertEqual(len(backend.check_many([("pil", ""), ("PIL", "1.0")])), 2)
+    
+    def test_check_many(self):
+        """Test batch lookup matches single lookups on both backends."""
+        sqlite_path = Path(self.temp_dir) / "test_db.sqlite"
+        self.db.export_to_sqlite(sqlite_path)
+        pairs = [("Requests", "2.0"), ("requests", "2.0"), ("Requests", "2.0"), ("fastapi", "")]
+        
+        for db in (self.db, DeprecatedPackageDB(sqlite_path, read_only=True)):
+            results = db.check_many(pairs)
+            self.assertEqual(sorted(results), [("Requests", "2.0"), ("requests", "2.0")])
+            self.assertEqual(results[("Requests", "2.0")], db.check_version_compatibility("Requests", "2.0"))
+    
+    def test_affected_version_range(self):
+        """Test versions outside the "affected" range are not reported."""
+        self.db.data["urllib3"] = {
+            "deprecated_since": "2023-04-26",
+            "reason": "1.x line is end of life",
+            "affected": "<2.0",
+            "alternatives": [{"name": "urllib3", "version": "2.0.0", "reason": "Upgrade"}],
+        }
+        self.db._build_index()
+        
+        self.assertFalse(self.db.check_version_compatibility("urllib3", "2.5.0")["is_deprecated"])
+        result = self.db.check_version_compatibility("urllib3", "1.26.18")
+        self.assertTrue(result["is_deprecated"])
+        self.assertEqual(result["affected"], "<2.0")
+        # Unknown versions are still reported
+        self.assertTrue(self.db.check_version_compatibility("urllib3", "")["is_deprecated"])
+        self.assertEqual(sorted(self.db.check_many([("urllib3", "2.5.0"), ("urllib3", "1.26.18")])),
+                         [("urllib3", "1.26.18")])
 
 
 class TestParser(unittest.TestCase):
@@ -210,6 +593,812 @@ setup(
         self.assertIn("setup.py", results)
         self.assertEqual(len(results["requirements.txt"]), 1)
         self.assertEqual(len(results["setup.py"]), 2)
+    
+    def test_parse_cache(self):
+        """Test parse cache answers unchanged and touched files."""
+        import os
+        
+        req_file = self.project_path / "requirements.txt"
+        with open(req_file, 'w', encoding='utf-8') as f:
+            f.write("requests==2.31.0\n")
+        
+        cache = ParseCache(self.project_path / "cache")
+        parser = DependencyParser(cache)
+        expected = [("requests", "==2.31.0")]
+        
+        self.assertEqual(parser.parse_file(req_file), expected)
+        self.assertEqual(parser.parse_file(req_file), expected)
+        os.utime(req_file, ns=(0, 0))
+        self.assertEqual(parser.parse_file(req_file), expected)
+        
+        stats = cache.get_statistics()
+        self.assertEqual((stats["misses"], stats["hits"], stats["content_hits"]), (1, 1, 1))
+        
+        with open(req_file, 'w', encoding='utf-8') as f:
+            f.write("fastapi==0.104.0\n")
+        self.assertEqual(parser.parse_file(req_file), [("fastapi", "==0.104.0")])
+    
+    def test_parse_cache_non_utf8_and_eviction(self):
+        """Test parse cache skips undecodable manifests and stays under its size cap."""
+        latin1 = self.project_path / "requirements.txt"
+        latin1.write_bytes("caf\xe9==1.0\n".encode("latin-1"))
+        
+        cache = ParseCache(self.project_path / "cache", max_bytes=4096)
+        parser = DependencyParser(cache)
+        self.assertEqual(parser.parse_file(latin1), [])
+        self.assertEqual(DependencyParser().parse_file(latin1), [])
+        
+        for i in range(200):
+            manifest = self.project_path / f"p{i}" / "requirements.txt"
+            manifest.parent.mkdir()
+            manifest.write_text(f"package{i}=={i}.0\n", encoding='utf-8')
+            self.assertEqual(parser.parse_file(manifest), [(f"package{i}", f"=={i}.0")])
+        
+        cache.evict()
+        size = sum(path.stat().st_size for path in (self.project_path / "cache").rglob("*") if path.is_file())
+        self.assertLessEqual(size, 4096)
+    
+    def test_parse_pep508_requirements(self):
+        """Test parsing extras, markers, URLs and pip-compile output."""
+        content = (
+            "-r base.txt\n"
+            "-e .\n"
+            "--index-url https://example.com/simple\n"
+            "requests[socks]>=2.0,<3 ; python_version >= '3.8'  # inline\n"
+            "Django==4.2rc1\n"
+            "pkg @ https://example.com/pkg-1.0.tar.gz#egg=pkg\n"
+            "certifi==2023.7.22 \\\n"
+            "    --hash=sha256:abc \\\n"
+            "    --hash=sha256:def\n"
+            "    # via requests\n"
+            "not a requirement!\n"
+        )
+        
+        deps = self.parser.parse_requirements_content(content)
+        
+        self.assertEqual(deps, [
+            ("requests", ">=2.0,<3"),
+            ("django", "==4.2rc1"),
+            ("pkg", ""),
+            ("certifi", "==2023.7.22"),
+        ])
+    
+    def test_parse_setup_and_pyproject_share_requirement_parser(self):
+        """Test setup.py and pyproject.toml go through the PEP 508 parser."""
+        setup_deps = self.parser.parse_setup_content(
+            "import setuptools\n"
+            "setuptools.setup(install_requires=('Flask[async]>=2.0; python_version>\"3\"',))\n"
+        )
+        pyproject_deps = self.parser.parse_pyproject_content(
+            "[project]\n"
+            "dependencies = ['httpx[http2]~=0.25']\n"
+            "[tool.poetry.dependencies]\n"
+            "python = '^3.9'\n"
+            "rich = {version = '>=13', extras = ['jupyter']}\n"
+        )
+        
+        self.assertEqual(setup_deps, [("flask", ">=2.0")])
+        self.assertEqual(pyproject_deps, [("httpx", "~=0.25"), ("rich", ">=13")])
+    
+    def test_parse_lockfiles(self):
+        """Test parsing poetry.lock, uv.lock and Pipfile.lock."""
+        with open(self.project_path / "poetry.lock", 'w', encoding='utf-8') as f:
+            f.write(
+                '[[package]]\n'
+                'name = "Six"\n'
+                'version = "1.16.0"\n'
+                'files = [\n'
+                '    {file = "six-1.16.0.tar.gz", hash = "sha256:abc"},\n'
+                ']\n'
+                '\n'
+                '[package.dependencies]\n'
+                'name = "not-a-package"\n'
+                '\n'
+                '[[package]]\n'
+                'name = "requests"\n'
+                'version = "2.31.0"\n'
+                '\n'
+                '[metadata]\n'
+                'content-hash = "abc"\n'
+            )
+        with open(self.project_path / "uv.lock", 'w', encoding='utf-8') as f:
+            f.write(
+                'version = 1\n'
+                '[[package]]\n'
+                'name = "myproject"\n'
+                'version = "0.1.0"\n'
+                'source = { editable = "." }\n'
+                '[[package]]\n'
+                'name = "pathlib2"\n'
+                'version = "2.3.7"\n'
+                'source = { registry = "https://pypi.org/simple" }\n'
+            )
+        with open(self.project_path / "Pipfile.lock", 'w', encoding='utf-8') as f:
+            f.write('{"_meta": {}, "default": {"enum34": {"version": "==1.1.10"}},'
+                    ' "develop": {"tool": {"git": "https://example.com/tool.git"}}}')
+        
+        results = self.parser.parse_all_files(self.project_path)
+        
+        self.assertEqual(results["poetry.lock"], [("six", "==1.16.0"), ("requests", "==2.31.0")])
+        self.assertEqual(results["uv.lock"], [("pathlib2", "==2.3.7")])
+        self.assertEqual(results["Pipfile.lock"], [("enum34", "==1.1.10"), ("tool", "")])
+        self.assertEqual(self.parser.find_manifest_files(self.project_path), sorted(
+            self.project_path / name for name in ("poetry.lock", "uv.lock", "Pipfile.lock")
+        ))
+
+    
+    def test_lockfile_dependency_arrays(self):
+        """Test lock parsing reads pdm/uv dependency arrays as TOML, not line by line."""
+        from core.parser import iter_lock_packages
+        
+        uv_lock = (
+            'version = 1\n'
+            '[[package]]\n'
+            'name = "app"\n'
+            'version = "0.1.0"\n'
+            'source = { virtual = "." }\n'
+            'dependencies = [{ name = "HTTPX" }, { name = "six", marker = "python_version < \'3\'" }]\n'
+            '[[package]]\n'
+            'name = "httpx"\n'
+            'version = "0.27.0"\n'
+            'description = """\n'
+            '[[package]]\n'
+            'name = "fake"\n'
+            '"""\n'
+            'dependencies = [\n'
+            '    { name = "anyio" },\n'
+            '    { name = "Certifi_Py" }, # trailing comment\n'
+            ']\n'
+        )
+        pdm_lock = (
+            '[[package]]\n'
+            'name = "requests"\n'
+            'version = "2.31.0"\n'
+            'dependencies = ["urllib3<3,>=1.21.1", "charset_normalizer[unicode]>=2; python_version >= \\"3.7\\""]\n'
+        )
+        
+        packages = list(iter_lock_packages(uv_lock))
+        self.assertEqual([(p.name, p.local) for p in packages], [("app", True), ("httpx", False)])
+        self.assertEqual(packages[0].dependencies, ("httpx", "six"))
+        self.assertEqual(packages[1].dependencies, ("anyio", "certifi-py"))
+        
+        requests_lock, = iter_lock_packages(pdm_lock)
+        self.assertEqual(requests_lock.dependencies, ("urllib3", "charset-normalizer"))
+        
+        self.assertEqual(self.parser.parse_lockfile_content('[[package]\nname = "broken"\n'), [])
+
+class TestPyPIClient(unittest.TestCase):
+    """Tests for concurrent PyPI client."""
+    
+    def _response(self, status_code, payload=None):
+        response = mock.Mock(status_code=status_code, headers={})
+        response.json.return_value = payload
+        return response
+    
+    def test_retries_on_rate_limit(self):
+        """Test 429 responses are retried and slow the bucket down."""
+        client = PyPIClient(rate_limit=0.01, max_retries=2)
+        client.session.get = mock.Mock(side_effect=[
+            self._response(429),
+            self._response(200, {"info": {"summary": "ok"}})
+        ])
+        
+        with mock.patch("core.pypi_client.backoff_delay", return_value=0):
+            self.assertEqual(client.get_json("six"), {"info": {"summary": "ok"}})
+        self.assertEqual(client.requests_made, 2)
+        self.assertLess(client.bucket.rate, client.bucket.max_rate)
+    
+    def test_fetch_many(self):
+        """Test concurrent fetch yields every package."""
+        client = PyPIClient(rate_limit=0, max_workers=4)
+        client.session.get = mock.Mock(side_effect=lambda url, timeout: self._response(
+            404 if "missing" in url else 200, {"info": {"summary": url}, "releases": {"1.0": []}}
+        ))
+        
+        results = dict(client.fetch_many(["six", "nose", "missing"]))
+        
+        self.assertEqual(set(results), {"six", "nose", "missing"})
+        self.assertIsNone(results["missing"])
+        self.assertIn("six", results["six"]["info"]["summary"])
+        self.assertNotIn("releases", client._memory["six"])
+    
+    def test_failed_fetch_is_not_a_verdict(self):
+        """Test exhausted retries raise and are neither memoized nor cached as verdicts."""
+        temp_dir = Path(tempfile.mkdtemp())
+        patch = mock.patch("core.pypi_client.backoff_delay", return_value=0)
+        patch.start()
+        try:
+            analyzer = RepositoryAnalyzer(temp_dir)
+            client = analyzer.client
+            client.bucket = None
+            client.session.get = mock.Mock(return_value=self._response(503))
+            
+            with self.assertRaises(requests.HTTPError):
+                client.get_json("six")
+            self.assertEqual(client.requests_made, client.max_retries + 1)
+            self.assertNotIn("six", client._memory)
+            
+            self.assertEqual(analyzer._build_database_for_packages({"six"}), {})
+            found, _ = analyzer.verdicts.get("six", "pypi_analysis")
+            self.assertFalse(found)
+            
+            client.session.get = mock.Mock(return_value=self._response(404))
+            self.assertIsNone(client.get_json("six"))
+            self.assertIn("six", client._memory)
+        finally:
+            patch.stop()
+            shutil.rmtree(temp_dir)
+    
+    def test_requests_are_coalesced_and_memoized(self):
+        """Test concurrent lookups of one package hit the network once."""
+        import threading
+        import time
+        
+        client = PyPIClient(rate_limit=0)
+        calls = []
+        
+        def slow_fetch(package):
+            calls.append(package)
+            time.sleep(0.05)
+            return {"info": {"name": package}}
+        
+        client._fetch_json = slow_fetch
+        threads = [threading.Thread(target=client.get_json, args=("Six",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(client.get_json("six"), {"info": {"name": "six"}})
+        self.assertEqual(calls, ["six"])
+    
+    def test_shared_client_and_heuristic(self):
+        """Test collector and analyzer share one client and heuristic."""
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            self.assertIs(get_default_client(temp_dir), get_default_client(temp_dir))
+        finally:
+            shutil.rmtree(temp_dir)
+        
+        self.assertTrue(is_deprecated_metadata({"info": {"summary": "This package is deprecated."}}))
+        self.assertFalse(is_deprecated_metadata({"info": {"summary": "Geolocation toolkit"}}))
+    
+    def test_token_bucket_adapts(self):
+        """Test bucket halves rate on pushback and recovers."""
+        bucket = TokenBucket(10)
+        bucket.slow_down()
+        self.assertEqual(bucket.rate, 5)
+        bucket.recover()
+        self.assertGreater(bucket.rate, 5)
+
+
+class TestHTTPCache(unittest.TestCase):
+    """Tests for persistent HTTP cache."""
+    
+    def setUp(self):
+        """Setup tests."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = HTTPCache(Path(self.temp_dir))
+        self.url = "https://pypi.org/pypi/six/json"
+    
+    def tearDown(self):
+        """Cleanup after tests."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_revalidation(self):
+        """Test 304 responses reuse cached body."""
+        session = mock.Mock()
+        session.get.side_effect = [
+            mock.Mock(status_code=200, content=b'{"info": {}}', headers={"ETag": '"abc"'}),
+            mock.Mock(status_code=304, content=b'', headers={})
+        ]
+        
+        self.assertEqual(self.cache.get(session, self.url).json(), {"info": {}})
+        response = self.cache.get(session, self.url)
+        
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), {"info": {}})
+        self.assertEqual(session.get.call_args[1]["headers"], {"If-None-Match": '"abc"'})
+        self.assertEqual(self.cache.get_statistics()["revalidated"], 1)
+        self.assertEqual(self.cache.get_statistics()["misses"], 1)
+    
+    def test_fresh_entry_skips_network(self):
+        """Test entries within max-age are served from disk."""
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(
+            status_code=200, content=b'{}', headers={"Cache-Control": "max-age=900"}
+        )
+        
+        self.cache.get(session, self.url)
+        
+        self.assertIsNotNone(HTTPCache(Path(self.temp_dir)).lookup(self.url))
+        self.cache.get(session, self.url)
+        self.assertEqual(session.get.call_count, 1)
+    
+    def test_size_limit_evicts_least_recently_used(self):
+        """Test bodies beyond max_bytes are evicted, oldest first."""
+        import time
+        
+        cache = HTTPCache(Path(self.temp_dir), max_bytes=6000)
+        session = mock.Mock()
+        session.get.side_effect = lambda url, **kwargs: mock.Mock(
+            status_code=200, content=os.urandom(4000), headers={"Cache-Control": "max-age=900"}
+        )
+        
+        old_url = "https://pypi.org/pypi/nose/json"
+        cache.get(session, old_url)
+        for path in Path(self.temp_dir).iterdir():
+            os.utime(path, (time.time() - 100, time.time() - 100))
+        cache.get(session, self.url)
+        
+        self.assertIsNone(cache.lookup(old_url))
+        self.assertIsNotNone(cache.lookup(self.url))
+
+
+class TestRepositoryAnalyzer(unittest.TestCase):
+    """Tests for repository analyzer."""
+    
+    def setUp(self):
+        """Setup tests."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = Path(self.temp_dir)
+    
+    def tearDown(self):
+        """Cleanup after tests."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_verdicts_avoid_network_on_repeat(self):
+        """Test repeat analysis answers from the verdict cache."""
+        metadata = {
+            "six": {"info": {"summary": "Python 2 and 3 compatibility utilities"}},
+            "nose": {"info": {"summary": "nose is deprecated, use pytest"}},
+        }
+        fetched = []
+        
+        def fake_fetch(package):
+            fetched.append(package)
+            return metadata.get(package)
+        
+        analyzer = RepositoryAnalyzer(self.cache_dir)
+        analyzer.client._fetch_json = fake_fetch
+        first = analyzer._build_database_for_packages({"six", "nose"})
+        
+        analyzer = RepositoryAnalyzer(self.cache_dir)
+        analyzer.client._memory.clear()
+        second = analyzer._build_database_for_packages({"six", "nose"})
+        
+        self.assertEqual(sorted(fetched), ["nose", "six"])
+        self.assertEqual(set(first), {"nose"})
+        self.assertEqual(set(second), {"nose"})
+        
+        expired = RepositoryAnalyzer(self.cache_dir, verdict_ttl_hours={"pypi_analysis": 0})
+        expired.client._memory.clear()
+        expired._build_database_for_packages({"six"})
+        self.assertEqual(fetched.count("six"), 2)
+
+
+
+class TestDaemon(unittest.TestCase):
+    """Tests for the check daemon and its client."""
+    
+    def setUp(self):
+        """Setup tests."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = Path(self.temp_dir) / "daemon.sock"
+    
+    def tearDown(self):
+        """Cleanup after tests."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_forward_to_daemon(self):
+        """Test commands are answered by a running daemon and fall back without one."""
+        self.assertIsNone(forward_to_daemon(["search", "requests"], self.socket_path))
+        
+        def search(args, request):
+            return f"searched {args[0]} in {request['cwd']}\n", 3
+        
+        server = CheckDaemon({"search": search}, self.socket_path)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                self.assertEqual(forward_to_daemon(["search", "requests"], self.socket_path), 3)
+            self.assertEqual(stdout.getvalue(), f"searched requests in {os.getcwd()}\n")
+            # Not forwardable, runs locally
+            self.assertIsNone(forward_to_daemon(["list-db"], self.socket_path))
+            self.assertEqual(send_request({"control": "status"}, self.socket_path)["requests"], 1)
+        finally:
+            send_request({"control": "stop"}, self.socket_path)
+            thread.join(5)
+        
+        self.assertFalse(self.socket_path.exists())
+    
+    def test_socket_directory_must_be_private(self):
+        """Test the daemon refuses, and clients ignore, sockets in directories others can reach."""
+        os.chmod(self.temp_dir, 0o755)
+        with self.assertRaises(RuntimeError):
+            CheckDaemon({}, self.socket_path)
+        
+        os.chmod(self.temp_dir, 0o700)
+        server = CheckDaemon({}, self.socket_path)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            self.assertIsNotNone(send_request({"control": "status"}, self.socket_path))
+            os.chmod(self.temp_dir, 0o755)
+            self.assertIsNone(send_request({"control": "status"}, self.socket_path))
+        finally:
+            os.chmod(self.temp_dir, 0o700)
+            send_request({"control": "stop"}, self.socket_path)
+            thread.join(5)
+    
+    def test_daemon_commands(self):
+        """Test default database reloads and transitive checks use the client's packages."""
+        from utils.cli import DaemonCommands
+        from core.parser import set_pool_start_method
+        
+        temp_path = Path(self.temp_dir)
+        db_path = temp_path / "db.yaml"
+        db_path.write_text("oldlib:\n  reason: Unmaintained\n  alternatives: []\n", encoding='utf-8')
+        site_packages = temp_path / "site-packages"
+        (site_packages / "oldlib-1.0.dist-info").mkdir(parents=True)
+        (site_packages / "oldlib-1.0.dist-info" / "METADATA").write_text(
+            "Metadata-Version: 2.1\nName: oldlib\nVersion: 1.0\n", encoding='utf-8')
+        (temp_path / "requirements.txt").write_text("oldlib\n", encoding='utf-8')
+        
+        commands = DaemonCommands()
+        try:
+            with mock.patch("utils.cli.default_database_path", return_value=db_path):
+                first = commands.checker(None, True)
+                self.assertIs(commands.checker(None, True), first)
+                os.utime(db_path, ns=(0, 0))
+                self.assertIsNot(commands.checker(None, True), first)
+            
+            request = {"cwd": self.temp_dir, "sys_path": [str(site_packages)]}
+            output, exit_code = commands.check(
+                ["--transitive", "--no-cache", "--db", str(db_path), "--export", "ndjson"], request)
+        finally:
+            set_pool_start_method(None)
+        
+        self.assertEqual(exit_code, 0)
+        self.assertIn('"type": "deprecated", "name": "oldlib"', output)
+
+
+class TestHTTPServer(unittest.TestCase):
+    """Tests for the HTTP service."""
+    
+    def setUp(self):
+        """Setup tests."""
+        self.temp_dir = tempfile.mkdtemp()
+        db_path = Path(self.temp_dir) / "test_db.yaml"
+        with open(db_path, 'w', encoding='utf-8') as f:
+            yaml.dump({"requests": {"deprecated_since": "2023-01-01", "reason": "Test reason",
+                                    "alternatives": []}}, f)
+        self.server = CheckServer(("127.0.0.1", 0), DeprecatedChecker(db_path), workers=2)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def tearDown(self):
+        """Cleanup after tests."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_lookup_and_check(self):
+        """Test endpoints answer JSON over one keep-alive connection."""
+        import json
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        
+        connection.request("GET", "/lookup?name=Requests&version=2.31.0")
+        self.assertTrue(json.loads(connection.getresponse().read())["is_deprecated"])
+        
+        connection.request("POST", "/lookup", body=json.dumps({"packages": [{"name": "httpx"}]}))
+        self.assertFalse(json.loads(connection.getresponse().read())["results"][0]["is_deprecated"])
+        
+        files = {"svc/requirements.txt": "requests==2.31.0\nhttpx==0.25.0\n"}
+        connection.request("POST", "/check", body=json.dumps({"files": files}))
+        report = json.loads(connection.getresponse().read())
+        self.assertEqual(report["summary"]["deprecated_count"], 1)
+        self.assertEqual(report["deprecated_packages"][0]["file_source"], "svc/requirements.txt")
+        
+        connection.request("POST", "/check", body=b"[]")
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 400)
+        connection.close()
+    
+    def test_lookup_extracts_version(self):
+        """Test version specifiers are reduced like the CLI reduces them."""
+        import json
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        with mock.patch.object(self.server.checker.db, "check_many", wraps=self.server.checker.db.check_many) as check_many:
+            connection.request("GET", "/lookup?name=requests&version=%3E%3D2.0%2C%3C3")
+            answer = json.loads(connection.getresponse().read())
+        self.assertEqual(check_many.call_args[0][0], [("requests", "2.0")])
+        self.assertEqual(answer["version"], ">=2.0,<3")
+        self.assertTrue(answer["is_deprecated"])
+        connection.close()
+    
+    def test_idle_connections_free_workers(self):
+        """Test idle keep-alive connections give their worker to a waiting client."""
+        import time
+        
+        idle = []
+        for _ in range(2):
+            connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+            connection.request("GET", "/lookup?name=httpx")
+            connection.getresponse().read()
+            idle.append(connection)
+        
+        started = time.monotonic()
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        connection.request("GET", "/lookup?name=httpx")
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 200)
+        self.assertLess(time.monotonic() - started, 2)
+        for connection in idle + [connection]:
+            connection.close()
+
+
+class TestAsyncAPI(unittest.TestCase):
+    """Tests for the asyncio checker and PyPI client."""
+    
+    def setUp(self):
+        """Setup tests."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_path = Path(self.temp_dir)
+    
+    def tearDown(self):
+        """Cleanup after tests."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_check_project_concurrently(self):
+        """Test many checks share one loop and a timeout cancels a check."""
+        import asyncio
+        
+        db_path = self.project_path / "test_db.yaml"
+        with open(db_path, 'w', encoding='utf-8') as f:
+            yaml.dump({"requests": {"deprecated_since": "2023-01-01", "reason": "Test reason",
+                                    "alternatives": []}}, f)
+        with open(self.project_path / "requirements.txt", 'w', encoding='utf-8') as f:
+            f.write("requests==2.31.0\nhttpx==0.25.0\n")
+        checker = AsyncChecker(DeprecatedChecker(db_path))
+        
+        async def run():
+            results = await asyncio.gather(*(checker.check_project(self.project_path) for _ in range(20)))
+            
+            async def stalled(*args):
+                await asyncio.sleep(10)
+            
+            with mock.patch("core.async_api.parse_manifests", stalled):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await checker.check_project(self.project_path, timeout=0.05)
+            return results
+        
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        self.assertEqual([package.name for package in results[0].deprecated_packages], ["requests"])
+        self.assertEqual(results[-1].files_checked, ["requirements.txt"])
+    
+    def test_async_pypi_client(self):
+        """Test metadata comes over keep-alive HTTP, chunked and gzipped, fetched once per package."""
+        import asyncio
+        import gzip
+        import json
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        requested = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                package = self.path.split("/")[2]
+                requested.append(package)
+                if package in ("missing", "broken"):
+                    self.send_response(404 if package == "missing" else 503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = gzip.compress(json.dumps({"info": {"name": package}}).encode("utf-8"))
+                self.send_response(200)
+                self.send_header("Content-Encoding", "gzip")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(body), body))
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/pypi/{{package}}/json"
+        
+        async def run():
+            async with AsyncPyPIClient(rate_limit=0, max_connections=2, max_retries=1) as client:
+                coalesced = await asyncio.gather(*(client.get_json("Six") for _ in range(5)))
+                results = {package: data async for package, data in
+                           client.fetch_many(["six", "nose", "missing", "broken"])}
+                self.assertNotIn("broken", client._memory)
+                return coalesced, results
+        
+        try:
+            with mock.patch("core.pypi_client.PYPI_JSON_URL", url), \
+                    mock.patch("core.pypi_client.backoff_delay", return_value=0):
+                coalesced, results = asyncio.run(run())
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertEqual(coalesced, [{"info": {"name": "six"}}] * 5)
+        self.assertEqual(results["nose"], {"info": {"name": "nose"}})
+        self.assertIsNone(results["missing"])
+        self.assertIsInstance(results["broken"], ConnectionError)
+        self.assertEqual(sorted(requested), ["broken", "broken", "missing", "nose", "six"])
+    
+    def test_async_http_proxy_and_redirects(self):
+        """Test HTTP_PROXY / NO_PROXY are honored and redirects stay on the origin."""
+        import asyncio
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from core.async_http import AsyncHTTPClient
+        
+        requested = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_GET(self):
+                requested.append(self.path)
+                locations = {"same": "/ok", "elsewhere": "http://other.test/ok"}
+                location = locations.get(self.path.rpartition("/")[2])
+                self.send_response(302 if location else 200)
+                if location:
+                    self.send_header("Location", location)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        proxy_env = {"http_proxy": f"http://127.0.0.1:{server.server_port}", "no_proxy": "127.0.0.1"}
+        proxy_env.update({name.upper(): value for name, value in proxy_env.items()})
+        
+        async def run():
+            async with AsyncHTTPClient() as client:
+                self.assertEqual((await client.get("http://pypi.test/same")).status_code, 200)
+                with self.assertRaises(ConnectionError):
+                    await client.get("http://pypi.test/elsewhere")
+                await client.get(f"http://127.0.0.1:{server.server_port}/direct")
+        
+        try:
+            with mock.patch.dict(os.environ, proxy_env):
+                asyncio.run(run())
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertEqual(requested, ["http://pypi.test/same", "http://pypi.test/ok",
+                                     "http://pypi.test/elsewhere", "/direct"])
+
+class TestScheduler(unittest.TestCase):
+    """Tests for the event-driven update scheduler."""
+    
+    def test_jobs_run_in_due_order_and_stop_wakes_loop(self):
+        """Test jobs run when due and an idle loop stops at once."""
+        import time
+        
+        jobs = JobScheduler()
+        ran = []
+        jobs.schedule(0.05, lambda: ran.append("late"), "late")
+        jobs.schedule(0.01, lambda: ran.append("early"), "early")
+        cancelled = jobs.schedule(0.02, lambda: ran.append("cancelled"))
+        jobs.cancel(cancelled)
+        jobs.schedule(3600, lambda: ran.append("idle"), "idle")
+        thread = threading.Thread(target=jobs.run)
+        thread.start()
+        
+        time.sleep(0.2)
+        self.assertEqual(ran, ["early", "late"])
+        self.assertEqual([name for name, _ in jobs.pending()], ["idle"])
+        
+        started = time.monotonic()
+        jobs.stop()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - started, 1)
+    
+    def test_failed_update_is_retried_as_a_job(self):
+        """Test retries are scheduled with backoff instead of blocking."""
+        import time
+        
+        temp_dir = tempfile.mkdtemp()
+        scheduler = DatabaseScheduler(UpdateConfig(retry_attempts=3, retry_delay_minutes=0.001,
+                                                   backup_before_update=False, notify_on_failure=False),
+                                      Path(temp_dir))
+        scheduler.collector = mock.Mock()
+        scheduler.collector.update_database.side_effect = [RuntimeError("PyPI down"), RuntimeError("PyPI down"), None]
+        try:
+            scheduler.start()
+            scheduler.trigger_update()
+            deadline = time.monotonic() + 5
+            while scheduler.collector.update_database.call_count < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            scheduler.stop()
+            scheduler.update_thread.join(5)
+            
+            self.assertEqual(scheduler.collector.update_database.call_count, 3)
+            self.assertTrue(scheduler.get_status()["success"])
+            self.assertLessEqual(scheduler._retry_delay(1), 0.12)
+            self.assertGreaterEqual(scheduler._retry_delay(1), 0.06)
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_scheduler_daemon_control(self):
+        """Test status, force-update and stop reach the live scheduler process."""
+        import time
+        
+        temp_dir = tempfile.mkdtemp()
+        socket_path = Path(temp_dir) / "scheduler.sock"
+        scheduler = DatabaseScheduler(UpdateConfig(backup_before_update=False), Path(temp_dir) / "cache",
+                                      Path(temp_dir) / "state")
+        scheduler.collector = mock.Mock(progress={})
+        self.assertEqual(scheduler.status_file, Path(temp_dir) / "state" / "update_status.json")
+        server = SchedulerDaemon(scheduler, socket_path)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            status = send_request({"control": "status"}, socket_path)
+            self.assertEqual(status["pid"], os.getpid())
+            self.assertEqual(status["state"], "idle")
+            self.assertEqual(status["queue_depth"], 1)
+            self.assertEqual(read_pid_file(scheduler_pid_file(socket_path)), os.getpid())
+            
+            self.assertTrue(send_request({"control": "force-update"}, socket_path)["queued"])
+            deadline = time.monotonic() + 5
+            while send_request({"control": "status"}, socket_path)["last_run_duration"] is None:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+            self.assertEqual(scheduler.collector.update_database.call_count, 1)
+        finally:
+            send_request({"control": "stop"}, socket_path)
+            thread.join(5)
+            shutil.rmtree(temp_dir)
+        
+        self.assertFalse(scheduler.is_running)
+        self.assertFalse(socket_path.exists())
+        self.assertFalse(scheduler_pid_file(socket_path).exists())
+    
+    def test_scheduler_socket_and_process_identity(self):
+        """Test the scheduler socket shares the daemon's private directory and stop only signals a scheduler."""
+        import subprocess
+        import sys
+        import time
+        
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1000"}):
+            os.environ.pop(SCHEDULER_SOCKET_ENV, None)
+            os.environ.pop("DEPRECATED_CHECKER_SOCKET", None)
+            socket_path = default_socket_path("scheduler", SCHEDULER_SOCKET_ENV)
+            self.assertEqual(socket_path.parent, default_socket_path().parent)
+            self.assertEqual(socket_path.name, "scheduler.sock")
+        
+        if not Path(f"/proc/{os.getpid()}/cmdline").exists():
+            self.skipTest("needs /proc")
+        self.assertFalse(is_scheduler_process(os.getpid(), socket_path))
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)",
+                                    "scheduler", "run", "--socket", str(socket_path)])
+        try:
+            # The child shows its own command line once it has exec'd
+            deadline = time.monotonic() + 5
+            while not is_scheduler_process(process.pid, socket_path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(is_scheduler_process(process.pid, socket_path))
+            self.assertFalse(is_scheduler_process(process.pid, socket_path.with_name("other.sock")))
+        finally:
+            process.kill()
+            process.wait()
 
 
 if __name__ == "__main__":
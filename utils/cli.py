@@ -2,10 +2,16 @@
 CLI interface for deprecated dependencies checker.
 """
 
+import io
+import os
 import sys
+import time
 import yaml
+import signal
+import threading
+import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import typer
 from rich.console import Console
 from rich.table import Table
@@ -16,10 +22,32 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 # Add the project root to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.checker import DeprecatedChecker
+from core.checker import DeprecatedChecker, DeprecatedFinding
+from core.database import canonical_name, default_database_path
 from core.data_collector import DataCollector
-from core.scheduler import DatabaseScheduler, ManualUpdater, UpdateConfig
+from core.scheduler import DatabaseScheduler, ManualUpdater, SchedulerDaemon, UpdateConfig
+from core.scheduler import SCHEDULER_SOCKET_ENV, is_scheduler_process, read_pid_file, scheduler_pid_file
 from core.repository_analyzer import RepositoryAnalyzer
+from core.parse_cache import ParseCache
+from core.result_cache import ResultCache
+from core.daemon import CheckDaemon, default_socket_path, send_request
+from core.http_server import CheckServer, DEFAULT_MAX_PENDING, DEFAULT_WORKERS
+from core.environment import find_site_packages
+from core.dependency_graph import find_lockfile
+from core.parser import set_pool_start_method
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Installed, PROJECT_ROOT is site-packages, so writable data goes to the user's directories
+USER_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+USER_STATE_DIR = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+
+# Shared cache directory used by the collector, analyzer and parse cache
+CACHE_DIR = USER_CACHE_DIR / "deprecated-checker"
+
+# Scheduler status file and the output of the detached scheduler process
+STATE_DIR = USER_STATE_DIR / "deprecated-checker"
+SCHEDULER_LOG = STATE_DIR / "scheduler.log"
 
 
 app = typer.Typer(
@@ -41,7 +69,7 @@ def check(
     export: Optional[str] = typer.Option(
         None,
         "--export", "-e",
-        help="Export format (json, yaml, text)"
+        help="Export format (json, yaml, ndjson, text)"
     ),
     output: Optional[Path] = typer.Option(
         None,
@@ -52,6 +80,51 @@ def check(
         False,
         "--verbose", "-v",
         help="Verbose output"
+    ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive", "-r",
+        help="Scan every manifest below the path (monorepo mode)"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs", "-j",
+        help="Number of worker processes for recursive scan (default: CPU count)"
+    ),
+    db: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        help="Database file to use (.yaml or .sqlite)"
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Do not use the persistent parse and result caches"
+    ),
+    transitive: bool = typer.Option(
+        False,
+        "--transitive", "-t",
+        help="Check the whole resolved dependency graph (lockfile or installed environment)"
+    ),
+    env: Optional[List[Path]] = typer.Option(
+        None,
+        "--env",
+        help="Check packages installed in a virtualenv/prefix instead (repeatable)"
+    ),
+    artifact: Optional[List[Path]] = typer.Option(
+        None,
+        "--artifact",
+        help="Check dependencies of a wheel/sdist or a directory of them (repeatable)"
+    ),
+    image: Optional[Path] = typer.Option(
+        None,
+        "--image",
+        help="Check packages installed in a `docker save` / OCI layout tarball"
+    ),
+    fail_fast: bool = typer.Option(
+        False,
+        "--fail-fast", "-x",
+        help="Stop at the first deprecated package and exit with code 1 (e.g. in pre-commit hooks)"
     )
 ):
     """Checks project for deprecated dependencies."""
@@ -69,45 +142,160 @@ def check(
         TextColumn("[progress.description]{task.description}"),
         console=console
     ) as progress:
-        task = progress.add_task("Checking dependencies...", total=None)
+        progress.add_task("Checking dependencies...", total=None)
         
         try:
-            # Create checker and check project
-            checker = DeprecatedChecker()
-            result = checker.check_project(project_path)
-            
-            progress.update(task, description="Generating report...")
-            
-            # Determine output format
-            format_type = export or "text"
-            
-            # Generate report
-            report = checker.generate_report(result, format_type)
-            
-            # Output result
-            if output:
-                with open(output, 'w', encoding='utf-8') as f:
-                    f.write(report)
-                console.print(f"[green]Report saved to {output}[/green]")
-            else:
-                if format_type == "text":
-                    display_text_report(result, checker, verbose)
-                else:
-                    console.print(report)
-                    
+            checker = create_checker(db, no_cache)
+            exit_code = run_check(
+                checker, console, project_path, export=export, output=output, verbose=verbose,
+                recursive=recursive, jobs=jobs, transitive=transitive, env=env, artifact=artifact,
+                image=image, fail_fast=fail_fast, progress=progress
+            )
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
             if verbose:
                 console.print_exception()
             sys.exit(1)
+    
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def create_checker(db: Optional[Path], no_cache: bool) -> DeprecatedChecker:
+    """Creates a read-only checker with the persistent caches unless disabled."""
+    parse_cache = None if no_cache else ParseCache(CACHE_DIR / "parse")
+    result_cache = None if no_cache else ResultCache(CACHE_DIR / "results")
+    return DeprecatedChecker(db, read_only=True, parse_cache=parse_cache, result_cache=result_cache)
+
+
+def run_check(checker: DeprecatedChecker, out: Console, project_path: Path,
+              export: Optional[str] = None, output: Optional[Path] = None, verbose: bool = False,
+              recursive: bool = False, jobs: Optional[int] = None, transitive: bool = False,
+              env: Optional[List[Path]] = None, artifact: Optional[List[Path]] = None,
+              image: Optional[Path] = None, fail_fast: bool = False,
+              progress: Optional[Progress] = None,
+              site_packages: Optional[List[Path]] = None) -> int:
+    """Runs the `check` command against a checker, printing to out; returns exit code.
+    
+    Shared by the CLI and the daemon, which renders into a buffer. The
+    daemon passes the client's site_packages for transitive checks of
+    projects without a lockfile.
+    """
+    if fail_fast:
+        # The first finding is only printed to the console
+        unsupported = [option for option, value in (("--env", env), ("--artifact", artifact),
+                                                     ("--image", image), ("--export", export),
+                                                     ("--output", output)) if value]
+        if unsupported:
+            out.print(f"[red]Error: --fail-fast cannot be combined with {', '.join(unsupported)}[/red]")
+            return 2
+    
+    # Determine output format
+    format_type = export or "text"
+    
+    result = None
+    if env and transitive:
+        # One graph over all given environments, like a combined sys.path
+        site_dirs = [site_dir for env_path in env for site_dir in find_site_packages(env_path)]
+        result = checker.check_transitive(project_path, site_packages=site_dirs)
+    elif env:
+        result = checker.check_environments(env, jobs=jobs)
+    elif artifact:
+        result = checker.check_artifacts(artifact, jobs=jobs)
+    elif image:
+        result = checker.check_image(image)
+    elif fail_fast:
+        if progress is not None:
+            progress.stop()
+        return check_fail_fast(checker, project_path, recursive, jobs, transitive, out, site_packages)
+    elif transitive and site_packages is not None:
+        result = checker.check_transitive(project_path, site_packages=site_packages)
+    elif not output and format_type == "text":
+        # The Rich report needs the whole result
+        result = checker.check_project(project_path, recursive=recursive, jobs=jobs,
+                                       transitive=transitive)
+    
+    def write(stream) -> None:
+        if result is not None:
+            checker.write_report(result, stream, format_type)
+        else:
+            # Findings go to the report as the project is checked
+            checker.write_project_report(project_path, stream, format_type, recursive=recursive,
+                                         jobs=jobs, transitive=transitive)
+    
+    if progress is not None and result is not None:
+        progress.update(progress.task_ids[0], description="Generating report...")
+    
+    # Output result, reports are streamed rather than built in memory
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            write(f)
+        out.print(f"[green]Report saved to {output}[/green]")
+    else:
+        if format_type == "text":
+            display_text_report(result, checker, verbose, out)
+        else:
+            # Machine-readable output goes to stdout as is, without the spinner
+            if progress is not None:
+                progress.stop()
+            write(out.file)
+    
+    parse_cache = checker.parser.cache
+    result_cache = checker.result_cache
+    if verbose and parse_cache is not None and (output or format_type == "text"):
+        if result_cache is not None and result_cache.hits:
+            out.print("Result cache: hit, nothing was parsed")
+        else:
+            cache_stats = parse_cache.get_statistics()
+            out.print(
+                f"Parse cache: {cache_stats['hit_rate']:.0%} hit rate "
+                f"({cache_stats['hits'] + cache_stats['content_hits']} hits, {cache_stats['misses']} misses)"
+            )
+    
+    if result is not None and result.errors:
+        # Something that could not be checked must not pass as clean
+        if output or format_type == "text":
+            for source, error in result.errors.items():
+                out.print(f"[red]Could not check {source}: {error}[/red]")
+        return 1
+    return 0
 
 
-def display_text_report(result, checker, verbose: bool):
+def check_fail_fast(checker: DeprecatedChecker, project_path: Path, recursive: bool,
+                    jobs: Optional[int], transitive: bool, out: Console = console,
+                    site_packages: Optional[List[Path]] = None) -> int:
+    """Checks project until the first deprecated package, returns exit code."""
+    if transitive and site_packages is not None:
+        events = checker.iter_check_transitive(project_path, site_packages)
+    else:
+        events = checker.iter_check_project(project_path, recursive=recursive, jobs=jobs, transitive=transitive)
+    try:
+        for event in events:
+            if isinstance(event, DeprecatedFinding):
+                pkg = event.package
+                out.print(
+                    f"[red]Deprecated package {pkg.name}=={pkg.current_version} "
+                    f"in {pkg.file_source}: {pkg.reason}[/red]"
+                )
+                return 1
+    finally:
+        # Stops parsing the remaining manifests
+        events.close()
+    
+    out.print("[green]No deprecated packages found![/green]")
+    return 0
+
+
+def display_text_report(result, checker, verbose: bool, out: Console = console):
     """Displays text report using Rich."""
     
     # Create panel with general statistics
     stats_text = Text()
-    stats_text.append(f"Checked files: {', '.join(result.files_checked)}\n")
+    if len(result.projects) > 1:
+        stats_text.append(f"Checked projects: {len(result.projects)}\n")
+        stats_text.append(f"Checked files: {len(result.files_checked)}\n")
+    else:
+        stats_text.append(f"Checked files: {', '.join(result.files_checked)}\n")
     stats_text.append(f"Total packages: {result.total_deprecated + result.total_safe}\n")
     stats_text.append(f"Deprecated: {result.total_deprecated}\n")
     stats_text.append(f"Safe: {result.total_safe}")
@@ -117,13 +305,13 @@ def display_text_report(result, checker, verbose: bool):
         title="Statistics",
         border_style="blue"
     )
-    console.print(stats_panel)
-    console.print()
+    out.print(stats_panel)
+    out.print()
     
     # Display deprecated packages
     if result.deprecated_packages:
-        console.print("[red]Found deprecated packages:[/red]")
-        console.print()
+        out.print("[red]Found deprecated packages:[/red]")
+        out.print()
         
         for pkg in result.deprecated_packages:
             # Create table for alternatives
@@ -139,7 +327,7 @@ def display_text_report(result, checker, verbose: bool):
                 table.add_column("Guide", style="blue")
                 
                 for alt in pkg.alternatives:
-                    action = "Update" if alt["name"].lower() == pkg.name.lower() else "Replace"
+                    action = "Update" if canonical_name(alt["name"]) == canonical_name(pkg.name) else "Replace"
                     guide = alt.get("migration_guide", "")
                     table.add_row(
                         alt["name"],
@@ -149,27 +337,30 @@ def display_text_report(result, checker, verbose: bool):
                     )
                 
                 # Package information
+                via = ""
+                if len(pkg.dependency_path) > 1:
+                    via = f"\n                Via: {' -> '.join(pkg.dependency_path)}"
                 pkg_info = f"""
                 [bold red]{pkg.name}[/bold red] (version: {pkg.current_version})
-                File: {pkg.file_source}
+                File: {pkg.file_source}{via}
                 Deprecation reason: {pkg.reason}
                 Deprecated since: {pkg.deprecated_since}
                 """
-                console.print(Panel(pkg_info, border_style="red"))
-                console.print(table)
-                console.print()
+                out.print(Panel(pkg_info, border_style="red"))
+                out.print(table)
+                out.print()
     else:
         success_panel = Panel(
             "No deprecated packages found!",
             title="Great job!",
             border_style="green"
         )
-        console.print(success_panel)
-        console.print()
+        out.print(success_panel)
+        out.print()
     
     # Display safe packages (if verbose mode is enabled)
     if verbose and result.safe_packages:
-        console.print("[green]Safe packages:[/green]")
+        out.print("[green]Safe packages:[/green]")
         
         safe_table = Table(
             title="Safe packages",
@@ -187,8 +378,8 @@ def display_text_report(result, checker, verbose: bool):
                 pkg["file_source"]
             )
         
-        console.print(safe_table)
-        console.print() 
+        out.print(safe_table)
+        out.print() 
 
 
 @app.command()
@@ -239,29 +430,38 @@ def list_db():
 
 @app.command()
 def search(
-    package: str = typer.Argument(..., help="Name of package to search")
+    package: str = typer.Argument(..., help="Name of package to search"),
+    db: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        help="Database file to use (.yaml or .sqlite)"
+    )
 ):
     """Finds information about a specific package."""
-    checker = DeprecatedChecker()
-    db = checker.db
-    
-    info = db.get_deprecated_info(package)
+    checker = DeprecatedChecker(db, read_only=True)
+    run_search(checker, console, package)
+
+
+def run_search(checker: DeprecatedChecker, out: Console, package: str) -> int:
+    """Runs the `search` command against a checker, printing to out; returns exit code."""
+    info = checker.db.get_deprecated_info(package)
     
     if not info:
-        console.print(f"[green]Package {package} is not deprecated[/green]")
-        return
+        out.print(f"[green]Package {package} is not deprecated[/green]")
+        return 0
     
-    console.print(f"[red]Package {package} is deprecated[/red]")
-    console.print(f"Deprecated since: {info.get('deprecated_since', 'unknown')}")
-    console.print(f"Reason: {info.get('reason', 'not specified')}")
+    out.print(f"[red]Package {package} is deprecated[/red]")
+    out.print(f"Deprecated since: {info.get('deprecated_since', 'unknown')}")
+    out.print(f"Reason: {info.get('reason', 'not specified')}")
     
     alternatives = info.get("alternatives", [])
     if alternatives:
-        console.print("\n[green]Alternatives:[/green]")
+        out.print("\n[green]Alternatives:[/green]")
         for alt in alternatives:
-            console.print(f"  • {alt['name']}: {alt['reason']}")
+            out.print(f"  • {alt['name']}: {alt['reason']}")
             if alt.get('migration_guide'):
-                console.print(f"    Guide: {alt['migration_guide']}")
+                out.print(f"    Guide: {alt['migration_guide']}")
+    return 0
 
 
 @app.command()
@@ -296,7 +496,7 @@ def analyze_repository(
         
         try:
             # Create analyzer and analyze repository
-            analyzer = RepositoryAnalyzer()
+            analyzer = RepositoryAnalyzer(CACHE_DIR)
             database = analyzer.analyze_repository(project_path)
             
             progress.update(task, description="Generating report...")
@@ -355,6 +555,11 @@ def update_db(
         False,
         "--comprehensive", "-c",
         help="Perform comprehensive update with all known packages"
+    ),
+    db: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        help="Database file to update (.yaml or .sqlite, default: data/deprecated_packages.yaml)"
     )
 ):
     """Updates the deprecated packages database."""
@@ -377,7 +582,7 @@ def update_db(
             
             try:
                 # Create comprehensive collector
-                collector = DataCollector()
+                collector = DataCollector(CACHE_DIR)
                 all_data = collector.collect_all_data()
                 
                 # Save comprehensive database
@@ -405,13 +610,13 @@ def update_db(
     elif source == "all" or source is None:
         # Update from all sources
         console.print("Updating database from all sources...")
-        collector = DataCollector()
-        collector.update_database()
+        collector = DataCollector(CACHE_DIR)
+        collector.update_database(db)
         console.print("[green]Database updated successfully[/green]")
     else:
         # Update from specific source
         console.print(f"Updating database from {source}...")
-        updater = ManualUpdater()
+        updater = ManualUpdater(db, CACHE_DIR)
         if updater.update_from_source(source):
             console.print(f"[green]Database updated from {source}[/green]")
         else:
@@ -420,47 +625,326 @@ def update_db(
 
 @app.command()
 def scheduler(
-    action: str = typer.Argument(..., help="Action (start, stop, status, force-update)"),
+    action: str = typer.Argument(..., help="Action (start, stop, status, force-update, run)"),
     interval: Optional[int] = typer.Option(
         24,
         "--interval", "-i",
         help="Update interval in hours"
+    ),
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        help="Control socket path (default: $DEPRECATED_CHECKER_SCHEDULER_SOCKET or the runtime directory)"
     )
 ):
-    """Manages the automatic database update scheduler."""
+    """Manages the automatic database update scheduler.
+    
+    `start` launches a detached scheduler process; `status`, `stop` and
+    `force-update` talk to it over its control socket. `run` keeps the
+    scheduler in the foreground.
+    """
     
+    socket_path = socket_path or default_socket_path("scheduler", SCHEDULER_SOCKET_ENV)
     config = UpdateConfig(interval_hours=interval)
-    scheduler = DatabaseScheduler(config)
     
     if action == "start":
+        status = send_request({"control": "status"}, socket_path)
+        if status is not None:
+            console.print(f"[yellow]Scheduler is already running (PID {status['pid']})[/yellow]")
+            return
         console.print("Starting scheduler...")
-        scheduler.start()
-        console.print("[green]Scheduler started[/green]")
+        status = spawn_scheduler(interval, socket_path)
+        if status is None:
+            console.print(f"[red]Scheduler did not start, see {SCHEDULER_LOG}[/red]")
+            sys.exit(1)
+        console.print(f"[green]Scheduler started (PID {status['pid']})[/green]")
         console.print(f"Updates will run every {interval} hours")
         
+    elif action == "run":
+        try:
+            server = SchedulerDaemon(DatabaseScheduler(config, CACHE_DIR, STATE_DIR), socket_path)
+        except (RuntimeError, OSError) as e:
+            console.print(f"[red]Error: {e}[/red]")
+            sys.exit(1)
+        # shutdown() waits for the serve loop, which runs on this thread
+        signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown).start())
+        console.print(f"Scheduler running with {interval}h interval, control socket {server.socket_path}")
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        console.print("Scheduler stopped")
+    
     elif action == "stop":
+        if send_request({"control": "stop"}, socket_path) is None:
+            pid_file = scheduler_pid_file(socket_path)
+            pid = read_pid_file(pid_file)
+            if pid is None:
+                console.print("Scheduler is not running")
+                sys.exit(1)
+            # The process is alive but its socket does not answer; the pid may
+            # have been reused since, so only a scheduler process is signalled
+            if not is_scheduler_process(pid, socket_path):
+                console.print(f"[red]PID {pid} from {pid_file} is not a scheduler serving {socket_path}, "
+                              f"not stopping it[/red]")
+                sys.exit(1)
+            os.kill(pid, signal.SIGTERM)
         console.print("Stopping scheduler...")
-        scheduler.stop()
-        console.print("[green]Scheduler stopped[/green]")
+        if wait_for_scheduler_exit(socket_path):
+            console.print("[green]Scheduler stopped[/green]")
+        else:
+            console.print("[yellow]Scheduler will stop once the running update finishes[/yellow]")
         
     elif action == "status":
-        status = scheduler.get_status()
-        console.print("Scheduler Status:")
-        console.print(f"  Running: {'Yes' if status['is_running'] else 'No'}")
-        console.print(f"  Last Update: {status.get('last_update', 'Never')}")
-        console.print(f"  Next Update: {status.get('next_update', 'Unknown')}")
-        console.print(f"  Interval: {status['config']['interval_hours']} hours")
+        status = send_request({"control": "status"}, socket_path)
+        if status is None:
+            status = DatabaseScheduler(config, CACHE_DIR, STATE_DIR).get_status()
+        display_scheduler_status(status)
         
     elif action == "force-update":
+        queued = send_request({"control": "force-update"}, socket_path)
+        if queued is not None:
+            console.print(f"[green]Update queued on the running scheduler[/green] "
+                          f"({queued['queue_depth']} jobs pending)")
+            return
         console.print("Forcing immediate update...")
-        if scheduler.force_update():
+        if DatabaseScheduler(config, CACHE_DIR, STATE_DIR).force_update():
             console.print("[green]Force update completed[/green]")
         else:
             console.print("[red]Force update failed[/red]")
             
     else:
         console.print(f"[red]Unknown action: {action}[/red]")
-        console.print("Available actions: start, stop, status, force-update")
+        console.print("Available actions: start, stop, status, force-update, run")
+
+
+def spawn_scheduler(interval: int, socket_path: Path, timeout: float = 10) -> Optional[Dict[str, Any]]:
+    """Starts `scheduler run` as a detached process; returns its status once it answers."""
+    SCHEDULER_LOG.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, str(Path(__file__).resolve()), "scheduler", "run",
+               "--interval", str(interval), "--socket", str(socket_path)]
+    with open(SCHEDULER_LOG, 'ab') as log:
+        # A new session detaches it from the terminal and this process
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                   cwd=str(PROJECT_ROOT), start_new_session=True)
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        status = send_request({"control": "status"}, socket_path)
+        if status is not None:
+            return status
+        time.sleep(0.1)
+    return None
+
+
+def wait_for_scheduler_exit(socket_path: Path, timeout: float = 10) -> bool:
+    """Waits until the scheduler process has removed its pid file."""
+    pid_file = scheduler_pid_file(socket_path)
+    deadline = time.monotonic() + timeout
+    while read_pid_file(pid_file) is not None:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def display_scheduler_status(status: Dict[str, Any]) -> None:
+    """Prints scheduler status, with live details when it comes from a running scheduler."""
+    console.print("Scheduler Status:")
+    console.print(f"  Running: {'Yes' if status['is_running'] else 'No'}")
+    if status.get("pid"):
+        console.print(f"  PID: {status['pid']}")
+        console.print(f"  Uptime: {status['uptime']:.0f} s")
+    if status.get("state"):
+        state = status["state"]
+        progress = status.get("progress") or {}
+        if state == "updating" and progress.get("total"):
+            state += f" ({progress['source']}: {progress['checked']}/{progress['total']} packages)"
+        elif state == "updating" and progress.get("source"):
+            state += f" ({progress['source']})"
+        console.print(f"  State: {state}")
+    console.print(f"  Last Update: {status.get('last_update', 'Never')}")
+    if status.get("last_run_duration") is not None:
+        console.print(f"  Last Run Duration: {status['last_run_duration']:.1f} s")
+    console.print(f"  Next Update: {status.get('next_update', 'Unknown')}")
+    if status.get("queue_depth") is not None:
+        jobs = ", ".join(job["name"] for job in status.get("pending_jobs", []))
+        console.print(f"  Queue Depth: {status['queue_depth']}" + (f" ({jobs})" if jobs else ""))
+    console.print(f"  Interval: {status['config']['interval_hours']} hours")
+
+
+class DaemonCommands:
+    """Command handlers of the daemon.
+    
+    Arguments are parsed with the same click definitions as the CLI, relative
+    paths are resolved against the client's working directory and output is
+    rendered into a buffer sized like the client's terminal. Checkers (with
+    their database and caches) are kept per --db and reloaded when the
+    database file changes.
+    """
+    
+    def __init__(self):
+        self._commands = typer.main.get_command(app).commands
+        self._checkers: Dict[Tuple[Optional[str], bool], Tuple[Optional[Tuple[int, int]], DeprecatedChecker]] = {}
+        self._lock = threading.Lock()
+        # Forking a process that serves on threads can copy locks held mid-request
+        set_pool_start_method("spawn")
+    
+    def handlers(self) -> Dict[str, Any]:
+        """Returns handlers for CheckDaemon keyed by command name."""
+        return {"check": self.check, "search": self.search}
+    
+    def check(self, args: List[str], request: Dict[str, Any]) -> Tuple[str, int]:
+        """Runs `check` for a client."""
+        def command(params: Dict[str, Any], out: Console) -> int:
+            project_path = params["path"] or Path(request["cwd"])
+            site_packages = None
+            if params["transitive"] and not params["env"] and find_lockfile(project_path) is None:
+                # Without a lockfile the graph comes from the client's interpreter, not the daemon's
+                site_packages = [Path(entry) for entry in request.get("sys_path") or []]
+            return run_check(
+                self.checker(params["db"], params["no_cache"]), out, project_path,
+                export=params["export"], output=params["output"], verbose=params["verbose"],
+                recursive=params["recursive"], jobs=params["jobs"], transitive=params["transitive"],
+                env=params["env"], artifact=params["artifact"], image=params["image"],
+                fail_fast=params["fail_fast"], site_packages=site_packages
+            )
+        
+        return self._run("check", args, request, command)
+    
+    def search(self, args: List[str], request: Dict[str, Any]) -> Tuple[str, int]:
+        """Runs `search` for a client."""
+        return self._run("search", args, request, lambda params, out: run_search(
+            self.checker(params["db"], False), out, params["package"]
+        ))
+    
+    def checker(self, db: Optional[Path], no_cache: bool) -> DeprecatedChecker:
+        """Returns a warm checker, reloading it if the database file changed."""
+        # Without --db the checker loads the default database, so that file is watched
+        db_file = db or default_database_path()
+        try:
+            stat = os.stat(db_file) if db_file else None
+            stamp = (stat.st_mtime_ns, stat.st_size) if stat else None
+        except OSError:
+            stamp = None
+        key = (str(db) if db else None, no_cache)
+        
+        with self._lock:
+            cached = self._checkers.get(key)
+            if cached is None or cached[0] != stamp:
+                cached = self._checkers[key] = (stamp, create_checker(db, no_cache))
+            return cached[1]
+    
+    def _run(self, name: str, args: List[str], request: Dict[str, Any], command) -> Tuple[str, int]:
+        buffer = io.StringIO()
+        out = Console(file=buffer, force_terminal=request.get("isatty", False),
+                      width=request.get("width") or 80)
+        try:
+            params = self._parse(name, args, Path(request["cwd"]))
+            if name == "check" and params["path"] is not None and not params["path"].exists():
+                out.print(f"[red]Error: Path {params['path']} does not exist[/red]")
+                return buffer.getvalue(), 1
+            exit_code = command(params, out)
+        except Exception as e:
+            # Usage errors from argument parsing carry their own message and exit code
+            message = e.format_message() if hasattr(e, "format_message") else str(e)
+            out.print(f"Error: {message}", style="red", markup=False)
+            exit_code = getattr(e, "exit_code", 1)
+        return buffer.getvalue(), exit_code
+    
+    def _parse(self, name: str, args: List[str], cwd: Path) -> Dict[str, Any]:
+        """Parses command arguments like the CLI would, paths relative to cwd."""
+        params = self._commands[name].make_context(name, list(args)).params
+        for key, value in params.items():
+            if isinstance(value, Path):
+                params[key] = cwd / value
+            elif isinstance(value, (list, tuple)) and value and isinstance(value[0], Path):
+                params[key] = [cwd / item for item in value]
+        return params
+
+
+@app.command()
+def daemon(
+    action: str = typer.Argument("run", help="Action (run, status, stop)"),
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        help="Unix socket path (default: $DEPRECATED_CHECKER_SOCKET or the runtime directory)"
+    )
+):
+    """Runs a daemon with a warm database; `check` and `search` are forwarded to it."""
+    
+    if action == "run":
+        commands = DaemonCommands()
+        # Load the default database before the first client asks
+        commands.checker(None, False)
+        try:
+            server = CheckDaemon(commands.handlers(), socket_path)
+        except (RuntimeError, OSError) as e:
+            console.print(f"[red]Error: {e}[/red]")
+            sys.exit(1)
+        console.print(f"[green]Daemon listening on {server.socket_path}[/green]")
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        console.print("Daemon stopped")
+        
+    elif action == "status":
+        status = send_request({"control": "status"}, socket_path)
+        if status is None:
+            console.print("Daemon is not running")
+            sys.exit(1)
+        console.print("Daemon Status:")
+        console.print(f"  PID: {status['pid']}")
+        console.print(f"  Socket: {status['socket']}")
+        console.print(f"  Uptime: {status['uptime']:.0f} s")
+        console.print(f"  Commands served: {status['requests']}")
+        
+    elif action == "stop":
+        if send_request({"control": "stop"}, socket_path) is None:
+            console.print("Daemon is not running")
+            sys.exit(1)
+        console.print("[green]Daemon stopped[/green]")
+        
+    else:
+        console.print(f"[red]Unknown action: {action}[/red]")
+        console.print("Available actions: run, status, stop")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8080, "--port", help="Port to listen on (0 picks a free one)"),
+    db: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        help="Database file to use (.yaml or .sqlite)"
+    ),
+    workers: int = typer.Option(DEFAULT_WORKERS, "--workers", "-w", help="Worker threads"),
+    max_pending: int = typer.Option(
+        DEFAULT_MAX_PENDING,
+        "--max-pending",
+        help="Connections allowed to wait for a worker before answering 503"
+    )
+):
+    """Serves lookups and manifest checks over HTTP (JSON)."""
+    checker = create_checker(db, no_cache=False)
+    try:
+        server = CheckServer((host, port), checker, workers, max_pending)
+    except OSError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    
+    console.print(f"[green]Serving on http://{host}:{server.server_port}[/green]")
+    console.print("Endpoints: GET /health, GET|POST /lookup, POST /check")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    console.print("Server stopped")
 
 
 @app.command()
@@ -468,7 +952,7 @@ def validate_db():
     """Validates the current database."""
     console.print("Validating database...")
     
-    updater = ManualUpdater()
+    updater = ManualUpdater(cache_dir=CACHE_DIR)
     result = updater.validate_database()
     
     if result["valid"]:
@@ -525,7 +1009,7 @@ def export_db(
     format: str = typer.Option(
         "json",
         "--format", "-f",
-        help="Export format (json, yaml, csv)"
+        help="Export format (json, yaml, csv, sqlite)"
     ),
     output: Path = typer.Option(
         None,
@@ -548,6 +1032,14 @@ def export_db(
     elif format == "csv":
         data = db.export_to_csv()
         ext = ".csv"
+    elif format == "sqlite":
+        output = output or Path("deprecated_packages.sqlite")
+        try:
+            count = db.export_to_sqlite(output)
+            console.print(f"[green]Exported {count} packages to {output}[/green]")
+        except Exception as e:
+            console.print(f"[red]Export failed: {e}[/red]")
+        return
     else:
         console.print(f"[red]Unsupported format: {format}[/red]")
         return
@@ -568,12 +1060,12 @@ def clear_cache():
     """Clears the cache directory."""
     import shutil
     
-    cache_dir = Path("cache")
+    cache_dir = CACHE_DIR
     if cache_dir.exists():
         try:
             shutil.rmtree(cache_dir)
-            cache_dir.mkdir(exist_ok=True)
-            console.print("[green]Cache cleared successfully[/green]")
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            console.print(f"[green]Cache cleared successfully: {cache_dir}[/green]")
         except Exception as e:
             console.print(f"[red]Failed to clear cache: {e}[/red]")
     else:
@@ -0,0 +1,17 @@
+"""
+Console entry point: forwards to a running daemon before loading the full CLI.
+"""
+
+import sys
+
+from core.daemon import forward_to_daemon
+
+
+def main():
+    """Runs a command on the daemon if one is listening, otherwise locally."""
+    exit_code = forward_to_daemon(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    from utils.cli import app
+    app()